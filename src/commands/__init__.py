@@ -1,15 +1,31 @@
-from challenge import ChallengeCommand
-from elo import EloCommand
-from elo_history import EloHistoryCommand
-from form import FormCommand
-from granny import GrannyCommand
-from head_to_head import HeadToHeadCommand
-from help import HelpCommand
-from leaderboard import LeaderboardCommand
-from odds import OddsCommand
-from profile import ProfileCommand
-from record import RecordCommand
-from record_nfc import RecordNFCCommand
-from stats import StatsCommand
-from spree import SpreeCommand
-from season import SeasonCommand
+"""
+Poolbot commands. Command modules are only imported the first time one of
+their terms is used, so the terms each command responds to are declared
+here rather than discovered by importing every module up front. Commands
+which schedule jobs are eager, and imported when poolbot starts instead.
+"""
+
+from registry import PluginSpec
+
+
+COMMANDS = (
+    PluginSpec('commands.challenge.ChallengeCommand', 'challenge'),
+    PluginSpec('commands.elo.EloCommand', 'elo', eager=True),
+    PluginSpec('commands.elo_history.EloHistoryCommand', 'elo-history'),
+    PluginSpec('commands.form.FormCommand', 'form'),
+    PluginSpec('commands.granny.GrannyCommand', 'grannies', eager=True),
+    PluginSpec('commands.head_to_head.HeadToHeadCommand', 'head-to-head', aliases=('h2h',)),
+    PluginSpec('commands.help.HelpCommand', 'help'),
+    PluginSpec('commands.leaderboard.LeaderboardCommand', 'leaderboard', eager=True),
+    PluginSpec('commands.nemesis.NemesisCommand', 'nemesis'),
+    PluginSpec('commands.odds.OddsCommand', 'odds'),
+    PluginSpec('commands.profile.ProfileCommand', 'profile'),
+    PluginSpec('commands.record.RecordCommand', 'record'),
+    PluginSpec('commands.record_nfc.RecordNFCCommand', 'nfc-red:'),
+    PluginSpec('commands.stats.StatsCommand', 'stats'),
+    PluginSpec('commands.spree.SpreeCommand', 'spree'),
+    PluginSpec('commands.status.StatusCommand', 'status'),
+    PluginSpec('commands.suggest.SuggestCommand', 'suggest'),
+    PluginSpec('commands.season.SeasonCommand', 'seasons'),
+    PluginSpec('commands.victim.VictimCommand', 'victim'),
+)
@@ -1,6 +1,5 @@
-import re
-
 from handler import Handler
+from parsing import MENTION_REGEX
 
 
 class BaseCommand(Handler):
@@ -8,13 +7,14 @@ class BaseCommand(Handler):
     help_message = 'No help available...'
     url_path = ''
     command_term = None
-    mention_regex = '<@[a-zA-Z0-9]+>'
+    aliases = ()
+    mention_regex = MENTION_REGEX
 
     def match_request(self, text):
         """Return a boolean to indicate if the message is a command directed
         at poolbot. The `@poolbot:` mention should already be stripped from the
-        beginning of the text passed as an argument, to avoid the overhead of
-        checking in each commands match_request() method."""
+        beginning of the text passed as an argument. Poolbot itself resolves
+        commands via its CommandRegistry rather than calling this method."""
         first_word = text.strip().split(' ')[0]
         return first_word == self.command_term
 
@@ -23,31 +23,42 @@ class BaseCommand(Handler):
         for message processing."""
         pass
 
+    def _parse(self, message):
+        """Return the parsed command for the message. Poolbot parses each
+        message before dispatching it, so this only tokenizes the text if the
+        handler was invoked directly."""
+        try:
+            return message['parsed']
+        except KeyError:
+            parsed = self.poolbot.tokenizer.parse(message['text'])
+            message['parsed'] = parsed
+            return parsed
+
     def _find_user_mentions(self, text):
-        """Parses the message text and returns all user ids mentioned excluding
-        poolbot."""
-        user_mentions = re.findall(self.mention_regex, text)
-        user_ids = [mention.strip('@<>') for mention in user_mentions]
+        """Parses the text and returns all user ids mentioned excluding
+        poolbot. Prefer _user_mentions() when handling a message."""
+        user_ids = self.mention_regex.findall(text)
         return [user_id for user_id in user_ids if user_id != self.poolbot.bot_id]
 
+    def _user_mentions(self, message):
+        """Return all user ids mentioned in the message excluding poolbot."""
+        return self._parse(message).mentions
+
     def _strip_poolbot_from_message(self, message):
         """Return the message text with the poolbot mention removed."""
-        return message['text'].lstrip(self.poolbot.bot_mention).strip()
+        return self._parse(message).text
 
     def _command_args(self, message, include_command_term=False, include_user_mentions=True):
         """Return an iterable of all args passed after the poolbot mention."""
-        stripped_message = self._strip_poolbot_from_message(message)
-        split_message = stripped_message.split()
+        parsed = self._parse(message)
+        args = list(parsed.tokens if include_user_mentions else parsed.args)
 
-        # we know the first argument is going to be the command_term,
-        # as we check this in the match_request() method
-        if not include_command_term:
-            del split_message[0]
+        if include_command_term:
+            args.insert(0, parsed.term)
 
-        # sometimes we are only interested in the extra arguments
-        if not include_user_mentions:
-            for value in split_message[:]:
-                if re.match(self.mention_regex, value):
-                    split_message.remove(value)
+        return args
 
-        return split_message
+    def _int_arg(self, message, default=None):
+        """Return the first integer argument passed with the command."""
+        int_args = self._parse(message).int_args
+        return int_args[0] if int_args else default
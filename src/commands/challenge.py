@@ -1,5 +1,13 @@
+import logging
+from threading import Lock
+from time import time
+
+from requests import RequestException
+
 from .base import BaseCommand
 
+from models import Challenge, ChallengeBoard
+
 
 class ChallengeCommand(BaseCommand):
     """Initiates a match, where the initiating player is looking for an
@@ -14,92 +22,212 @@ class ChallengeCommand(BaseCommand):
         'accept`.'
     )
 
+    # seconds until an open challenge expires, and until an accepted
+    # challenge is cleared so a new one can be opened
+    DEFAULT_TIMEOUT = 15 * 60
+    # seconds to wait before trying to load or expire challenges again, if
+    # the server could not be reached
+    RETRY_DELAY = 60
 
     def setup(self):
-        """Each channel poolbot is in requires a unique challenge instance.
-        To avoid the overhead when processing messages, POST to create the
-        missing ones when poolbot loads."""
-        # response = self.poolbot.session.get(self._generate_url())
-        # if response.status_code == 200:
-        #     challenge_channels = set(
-        #         [challenge['channel'] for challenge in response.json()]
-        #     )
-
-        # all_poolbot_channels = set(self.poolbot.poolbot_channels)
-        # missing_channels = all_poolbot_channels.difference(challenge_channels)
-
-        # for channel_id in missing_channels:
-        #     response = self.poolbot.session.post(
-        #         self._generate_url(),
-        #         data={
-        #             'channel': channel_id,
-        #         }
-        #     )
+        """The challenge of each channel is kept in memory, and loaded from
+        the server as soon as poolbot starts. Each change is only applied
+        once the server has accepted it."""
+        self.challenges = ChallengeBoard()
+        self.load_lock = Lock()
+        self.timeout = self.poolbot.config.get('challenge_timeout', self.DEFAULT_TIMEOUT)
+        self.scheduler = None
+
+    def schedule_jobs(self, scheduler):
+        # challenges expire on timers, which are set as they are opened. The
+        # challenges left open before poolbot started are loaded straight
+        # away, so they expire without waiting for the command to be used
+        self.scheduler = scheduler
+        scheduler.once('challenge.load', 0, self._load_challenges_job)
 
     def process_request(self, message):
         """The two main commands to interpret are:
             * @poolbot: challenge - which invokes a new challenge
             * @poolbot: challenge accept - which accepts an existing challenge
         """
+        if not self.challenges.ready:
+            try:
+                self._load_challenges()
+            except RequestException:
+                logging.exception('Unable to load the challenges.')
+                return self.reply(self.poolbot.SERVER_BUSY_MESSAGE)
+
         author = message['user']
         command_args = self._command_args(message)
-        channel_challenge = self._get_channel_challenge(message['channel'])
+        challenge = self.challenges.get(message['channel'])
 
         # create a invoke a new challenge
         if not command_args:
+            return self.reply(self._open_challenge(challenge, message['channel'], author))
 
-            # try and set the initiator to the message author
-            response = self.poolbot.session.patch(
-                self._get_detail_url(channel_challenge['id']),
+        # otherwise accept the open challenge of the channel
+        elif command_args[0] == 'accept':
+            return self.reply(self._accept_challenge(challenge, author))
+        else:
+            return self.reply('Sorry, something went wrong.')
+
+    def _open_challenge(self, challenge, channel, author):
+        """Open a new challenge in the channel, creating the channel's
+        challenge on the server if it does not have one yet."""
+        if challenge is None:
+            response = self.poolbot.session.post(
+                self._generate_url(),
                 data={
-                    'initiator': author
+                    'channel': channel,
+                    'initiator': author,
                 }
             )
-
-            if response.status_code == 200:
-                return self.reply(
-                    'New challenge created by {initiator}! Who wants to play?'
-                    .format(
-                        initiator=self.poolbot.get_username(author)
+            if response.status_code != 201:
+                return self._get_validation_error(response)
+            challenge = self.challenges.add(Challenge(response.json()['id'], channel))
+            with challenge.lock:
+                self._opened(challenge, author)
+            return self._open_message(author)
+
+        with challenge.lock:
+            if not challenge.can_become(Challenge.OPEN):
+                return (
+                    '{initiator} has already challenged everyone! Accept with '
+                    '`@poolbot challenge accept`.'.format(
+                        initiator=self.poolbot.get_username(challenge.initiator)
                     )
                 )
-            else:
-                return self.reply(self._get_validation_error(response))
 
-        # otherwise find the channel challenge instance and update the players
-        elif command_args[0] == 'accept':
+            # clear the challenger of the last challenge at the same time
+            response = self.poolbot.session.patch(
+                self._get_detail_url(challenge.pk),
+                data={
+                    'initiator': author,
+                    'challenger': '',
+                }
+            )
+            if response.status_code != 200:
+                return self._get_validation_error(response)
+            self._opened(challenge, author)
+        return self._open_message(author)
+
+    def _accept_challenge(self, challenge, author):
+        if challenge is None or challenge.state != Challenge.OPEN:
+            return (
+                'There is no open challenge to accept. Start one with '
+                '`@poolbot challenge`.'
+            )
+
+        with challenge.lock:
+            if challenge.state != Challenge.OPEN:
+                return 'Sorry, that challenge has just expired.'
+            if challenge.initiator == author:
+                return 'You cannot accept your own challenge!'
 
             # update the related players in the challenge object
             response = self.poolbot.session.patch(
-                self._get_detail_url(channel_challenge['id']),
+                self._get_detail_url(challenge.pk),
                 data={
                     'challenger': author
                 }
             )
+            if response.status_code != 200:
+                return self._get_validation_error(response)
+
+            challenge.accept(author, time() + self.timeout)
+            self._set_expiry_timer(challenge, self.timeout)
+            return 'To the baize! {initiator} vs {challenger}'.format(
+                initiator=self.poolbot.get_username(challenge.initiator),
+                challenger=self.poolbot.get_username(author)
+            )
 
-            if response.status_code == 200:
-                data = response.json()
-                return self.reply(
-                    'To the baize! {initiator} vs {challenger}'.format(
-                        initiator=self.poolbot.get_username(data['initiator']),
-                        challenger=self.poolbot.get_username(author)
-                    )
-                )
-            else:
-                return self.reply(self._get_validation_error(response))
-        else:
-            return self.reply('Sorry, something went wrong.')
+    def _opened(self, challenge, author):
+        challenge.open(author, time() + self.timeout)
+        self._set_expiry_timer(challenge, self.timeout)
 
-    def _get_channel_challenge(self, channel):
-        """Retrives the channel speicifc challenge instance."""
-        response = self.poolbot.session.get(
-            self._generate_url(),
-            params={
-                'channel': channel,
-            }
+    def _open_message(self, author):
+        return 'New challenge created by {initiator}! Who wants to play?'.format(
+            initiator=self.poolbot.get_username(author)
         )
-        if response.status_code == 200:
-            return response.json()[0]
+
+    def _load_challenges_job(self):
+        """Load the challenges when poolbot starts, trying again later if the
+        server could not be reached."""
+        try:
+            self._load_challenges()
+        except RequestException:
+            logging.exception('Unable to load the challenges.')
+            self.scheduler.once(
+                'challenge.load', self.RETRY_DELAY, self._load_challenges_job
+            )
+
+    def _load_challenges(self):
+        """Load the challenge of every channel. Challenges left open or
+        accepted before poolbot started expire a full timeout after the
+        server last changed them, or right away if that has already passed.
+        If the server does not say when that was, they are given a full
+        timeout from now. Requests arriving while the challenges load wait
+        for it, rather than loading them again."""
+        with self.load_lock:
+            if self.challenges.ready:
+                return
+
+            response = self.poolbot.session.get(self._generate_url())
+            response.raise_for_status()
+            self.challenges.load(response.json())
+
+            now = time()
+            for state in (Challenge.OPEN, Challenge.ACCEPTED):
+                for challenge in self.challenges.in_state(state):
+                    challenge.expires_at = (challenge.updated_at or now) + self.timeout
+                    self._set_expiry_timer(challenge, max(challenge.expires_at - now, 0))
+
+    def _set_expiry_timer(self, challenge, delay):
+        """Expire the challenge after `delay` seconds, replacing any timer
+        already set for it."""
+        if self.scheduler is None:
+            return
+        self.scheduler.once(
+            'challenge.expire.{}'.format(challenge.channel),
+            delay,
+            lambda: self._expire_challenge(challenge)
+        )
+
+    def _expire_challenge(self, challenge):
+        """Clear the players of the challenge on the server, then mark it as
+        expired. If nobody accepted it, the channel is told."""
+        with challenge.lock:
+            # the challenge may have changed just before the timer fired
+            if challenge.expires_at is None or challenge.expires_at > time():
+                return
+
+            try:
+                response = self.poolbot.session.patch(
+                    self._get_detail_url(challenge.pk),
+                    data={
+                        'initiator': '',
+                        'challenger': '',
+                    }
+                )
+                response.raise_for_status()
+            except RequestException:
+                logging.exception(
+                    'Unable to expire the challenge in %s.', challenge.channel
+                )
+                self._set_expiry_timer(challenge, self.RETRY_DELAY)
+                return
+
+            unanswered = challenge.state == Challenge.OPEN
+            initiator = challenge.initiator
+            challenge.expire()
+            self.poolbot.metrics.incr('challenge.expired')
+
+        if unanswered:
+            self.poolbot.outbox.put(challenge.channel, [
+                'Nobody accepted the challenge from {initiator} in time.'.format(
+                    initiator=self.poolbot.get_username(initiator)
+                )
+            ])
 
     def _get_detail_url(self, channel_pk):
         """Generate the detail URL of a challenge instance."""
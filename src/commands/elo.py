@@ -1,3 +1,7 @@
+import logging
+
+from requests import RequestException
+
 from .base import BaseCommand
 
 
@@ -11,8 +15,31 @@ class EloCommand(BaseCommand):
       'players. This always uses the season_elo score.'
     )
 
+    # the points at stake are calculated locally from the cached elo scores,
+    # but every so often a scheduled job asks the server too, to make sure
+    # the local engine still agrees with it. Until it does again, requests
+    # are answered by the server
+    DEFAULT_VERIFY_INTERVAL = 60 * 60
+    # the number of pairs of players checked on each verification
+    DEFAULT_VERIFY_PAIRS = 5
+
+    def setup(self):
+        self.verify_interval = self.poolbot.config.get(
+            'elo_verify_interval', self.DEFAULT_VERIFY_INTERVAL
+        )
+        self.verify_pairs = self.poolbot.config.get(
+            'elo_verify_pairs', self.DEFAULT_VERIFY_PAIRS
+        )
+        self.verified = True
+
+    def schedule_jobs(self, scheduler):
+        if self.verify_interval:
+            scheduler.every(
+                'elo.verify', self.verify_interval, self.verify_engine, delay=0
+            )
+
     def process_request(self, message):
-        mentioned_user_ids = self._find_user_mentions(message['text'])
+        mentioned_user_ids = self._user_mentions(message)
         if not len(mentioned_user_ids):
             return self.reply('Sorry, you must mention at least one user.')
 
@@ -23,35 +50,119 @@ class EloCommand(BaseCommand):
             player2 = player1
             player1 = message['user']
 
-        response = self.poolbot.session.get(
-            self._generate_url(),
-            params={
-                'player1': player1,
-                'player2': player2,
-            }
+        try:
+            data = self._calculate_stakes(player1, player2)
+        except KeyError:
+            return self.reply('Sorry, I was unable to fetch that data.')
+
+        if not self.verified:
+            data = self._fetch_stakes(player1, player2) or data
+
+        reply_text = (
+            '{player} currently has elo {elo} points. A win would be worth '
+            '{points_win} points, giving a new total of {elo_win}. A loss '
+            'would cost them {points_lose} points reducing them to '
+            '{elo_lose}.\n'
         )
+        ret = []
 
-        if response.status_code == 200:
-            data = response.json()
+        for player in data:
+            ret.append(reply_text.format(
+                player=self.poolbot.get_username(player['slack_id']),
+                elo=player['season_elo'],
+                elo_win=player['elo_win'],
+                elo_lose=player['elo_lose'],
+                points_win=player['points_win'],
+                points_lose=player['points_lose'],
+            ))
 
-            reply_text = (
-                '{player} currently has elo {elo} points. A win would be worth '
-                '{points_win} points, giving a new total of {elo_win}. A loss '
-                'would cost them {points_lose} points reducing them to '
-                '{elo_lose}.\n'
-            )
-            ret = []
-
-            for player in data:
-                ret.append(reply_text.format(
-                    player=self.poolbot.get_username(player['slack_id']),
-                    elo=player['season_elo'],
-                    elo_win=player['elo_win'],
-                    elo_lose=player['elo_lose'],
-                    points_win=player['points_win'],
-                    points_lose=player['points_lose'],
-                ))
-
-            return self.reply(' '.join(ret))
+        return self.reply(' '.join(ret))
+
+    def verify_engine(self):
+        """Compare the local calculation with the server's for a sample of
+        pairs spread across the season leaderboard. Requests are answered by
+        the server until every pair matches again."""
+        players = self.poolbot.leaderboards['season'].top()
+        mismatches = []
+        checked = 0
+        for pair in self._sample_pairs(players, self.verify_pairs):
+            data = self._calculate_stakes(*pair)
+            server_data = self._fetch_stakes(*pair)
+            if server_data is None:
+                continue
+            checked += 1
+            if server_data != data:
+                mismatches.append((data, server_data))
+
+        if not checked:
+            return
+
+        self.verified = not mismatches
+        if self.verified:
+            self.poolbot.metrics.incr('elo.verify.match')
         else:
-            return self.reply('Sorry, I was unable to fetch that data.')
+            for data, server_data in mismatches:
+                logging.warning(
+                    'Local elo calculation %s does not match the server %s.',
+                    data, server_data
+                )
+            self.poolbot.metrics.incr('elo.verify.mismatch')
+
+    def _sample_pairs(self, players, count):
+        """Return up to `count` pairs of neighbouring players, out of players
+        sampled at evenly spaced positions from the top of the leaderboard to
+        the bottom."""
+        size = min(count, len(players) - 1)
+        if size < 1:
+            return []
+        step = float(len(players) - 1) / size
+        sampled = [players[int(round(index * step))] for index in range(size + 1)]
+        return zip(sampled, sampled[1:])
+
+    def _calculate_stakes(self, player1, player2):
+        """Return the points at stake for both players, in the same format
+        as the server's elo endpoint."""
+        profiles = [
+            self.poolbot.get_player_profile(player1),
+            self.poolbot.get_player_profile(player2),
+        ]
+
+        data = []
+        for profile, opponent in zip(profiles, reversed(profiles)):
+            stakes = self.poolbot.elo_engine.stakes(
+                profile.season_elo,
+                opponent.season_elo,
+                match_count=profile.season_match_count
+            )
+            stakes.update(
+                slack_id=profile.slack_id,
+                season_elo=profile.season_elo,
+            )
+            data.append(stakes)
+        return data
+
+    def _fetch_stakes(self, player1, player2):
+        """Ask the server for the points at stake, or None if it can't say."""
+        try:
+            response = self.poolbot.session.get(
+                self._generate_url(),
+                params={
+                    'player1': player1,
+                    'player2': player2,
+                }
+            )
+        except RequestException:
+            logging.exception('Unable to verify the local elo calculation.')
+            return None
+
+        if response.status_code != 200:
+            return None
+
+        fields = (
+            'slack_id', 'season_elo', 'elo_win', 'elo_lose', 'points_win',
+            'points_lose'
+        )
+        return [
+            dict((field, player[field]) for field in fields) for
+            player in response.json()
+        ]
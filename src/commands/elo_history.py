@@ -1,5 +1,7 @@
-from datetime import date
+from calendar import timegm
+from datetime import datetime
 
+from models import EloHistory
 from utils import format_datetime_to_date
 
 from .base import BaseCommand
@@ -28,128 +30,79 @@ class EloHistoryCommand(BaseCommand):
 
     def process_request(self, message):
         try:
-            user_id = self._find_user_mentions(message['text'])[0]
+            user_id = self._user_mentions(message)[0]
         except IndexError:
             user_id = message['user']
 
-        url = self._generate_url()
-        response = self.poolbot.session.get(
-            url,
-            params={'player': user_id}
-        )
-        if response.status_code == 200:
-            elo_history_data = response.json()
-
-            high_elo = max(elo_history_data, key=lambda x: x['elo_score'])
-            low_elo = min(elo_history_data, key=lambda x: x['elo_score'])
+        # the history of each player is kept in memory, so we only need to
+        # fetch the entries added since it was last requested
+        history = self._get_history(user_id)
+        params = {'player': user_id}
+        if history.last_date is not None:
+            params['date__gt'] = history.last_date
 
-            today_net_elo = self.get_today_net_elo(elo_history_data)
-            month_net_elo = self.get_month_net_elo(elo_history_data)
-
-            reply_msg = self.response_msg.format(
-                name=self.poolbot.users[user_id],
-                highest_elo=high_elo['elo_score'],
-                highest_date=format_datetime_to_date(high_elo['date']),
-                lowest_elo=low_elo['elo_score'],
-                lowest_date=format_datetime_to_date(low_elo['date']),
-                today_net=today_net_elo,
-                month_net=month_net_elo,
+        response = self.poolbot.session.get(self._generate_url(), params=params)
+        if response.status_code == 200:
+            history.extend(response.json())
+        elif not len(history):
+            return self.reply("Unable to get elo history data.")
+
+        if not len(history):
+            return self.reply(
+                '{name} is yet to record any games!'.format(
+                    name=self.poolbot.users[user_id]
+                )
             )
-            return self.reply(reply_msg)
 
-        return self.reply("Unable to get elo history data.")
+        highest_elo, highest_date = history.highest
+        lowest_elo, lowest_date = history.lowest
+        reply_msg = self.response_msg.format(
+            name=self.poolbot.users[user_id],
+            highest_elo=highest_elo,
+            highest_date=format_datetime_to_date(highest_date),
+            lowest_elo=lowest_elo,
+            lowest_date=format_datetime_to_date(lowest_date),
+            today_net=self.get_today_net_elo(history),
+            month_net=self.get_month_net_elo(history),
+        )
+        return self.reply(reply_msg)
 
-    def get_today_net_elo(self, elo_history_data):
+    def get_today_net_elo(self, history):
         """Calculate the net points won or loss today for a player."""
-        today_date = date.today()
-
-        # first filter by todays date
-        today_elos = [
-            history['elo_score'] for history in elo_history_data if
-            format_datetime_to_date(history['date'], format_date=False) == today_date
-        ]
-
-        # if no games today - exit early with 0
-        if not today_elos:
-            return 0
-
-        # we also need the players last recorded score previous from today
-        # if this is not found, or the previous history instance was from
-        # a different season, fallback to 1000 elo points
-        previous_elo_score = self.default_elo
-        date_sorted_elos = sorted(elo_history_data, key=lambda x: x['date'])
-        for i, elo_history in enumerate(date_sorted_elos):
-            if format_datetime_to_date(elo_history['date'], format_date=False) == today_date:
-                try:
-                    previous_elo = date_sorted_elos[i-1]
-                except IndexError:
-                    break # use default
-                else:
-                    # double check the previous elo is not from a different season!
-                    if elo_history['season'] == previous_elo['season']:
-                        previous_elo_score = previous_elo['elo_score']
-                    break
-
-        all_elo_scores = [previous_elo_score] + today_elos
-        today_elo_net = sum([
-            all_elo_scores[i+1] - all_elo_scores[i] for
-            i in xrange(len(all_elo_scores) -1)
-        ])
-
-        # prefix a + sign if positive
-        if today_elo_net > 0:
-            today_elo_net = "+ {elo_net}".format(elo_net=today_elo_net)
-
-        return today_elo_net
-
-    def get_month_net_elo(self, elo_history_data):
-        """Calculate the net points won or loss over current month for a player."""
-        current_month = date.today().month
-
-        # filter by current month
-        month_elos = [
-            history for history in elo_history_data if
-            format_datetime_to_date(history['date'], format_date=False).month == current_month
-        ]
-
-        # if no games this month exit early
-        if not month_elos:
-            return 0
-
-        # also make sure all matches are from the current season - otherwise
-        # the change in elo points being reset to 1000 distorts everything
-        current_season = month_elos[-1]['season']
-        month_elos_in_season = [
-            history['elo_score'] for history in month_elos if
-            history['season'] == current_season
-        ]
-
-        # we also need the players last recorded score previous from the month
-        # if this is not found, or the previous history instance was from
-        # a different season, fallback to 1000 elo points
-        previous_elo_score = self.default_elo
-        date_sorted_elos = sorted(elo_history_data, key=lambda x: x['date'])
-        for i, elo_history in enumerate(date_sorted_elos):
-            history_month = format_datetime_to_date(elo_history['date'], format_date=False).month 
-            if history_month == current_month and elo_history['season'] == current_season:
-                try:
-                    previous_elo = date_sorted_elos[i-1]
-                except IndexError:
-                    break # use the default
-                else:
-                    # double check the previous elo is not from a different season!
-                    if elo_history['season'] == previous_elo['season']:
-                        previous_elo_score = previous_elo['elo_score']
-                    break
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self._format_net_elo(
+            history.net_since(timegm(today.utctimetuple()))
+        )
 
-        all_scores = [previous_elo_score] + month_elos_in_season
-        month_elo_net = sum([
-            all_scores[i+1] - all_scores[i] for
-            i in xrange(len(all_scores) -1)
-        ])
+    def get_month_net_elo(self, history):
+        """Calculate the net points won or loss over current month for a
+        player. Only matches from the current season are counted, as the
+        change in elo points being reset to 1000 distorts everything."""
+        month = datetime.utcnow().replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        return self._format_net_elo(
+            history.net_since(
+                timegm(month.utctimetuple()), season=history.current_season
+            )
+        )
 
+    def _get_history(self, user_id):
+        """Return the cached elo history of a player, creating it the first
+        time they are asked about."""
+        history = self.poolbot.elo_histories.get(user_id)
+        if history is not None:
+            return history
+
+        with self.poolbot.elo_histories_lock:
+            history = self.poolbot.elo_histories.get(user_id)
+            if history is None:
+                history = EloHistory(default_elo=self.default_elo)
+                self.poolbot.elo_histories[user_id] = history
+            return history
+
+    def _format_net_elo(self, elo_net):
         # prefix a + sign if positive
-        if month_elo_net > 0:
-            month_elo_net = "+ {elo_net}".format(elo_net=month_elo_net)
-
-        return month_elo_net
\ No newline at end of file
+        if elo_net > 0:
+            return "+ {elo_net}".format(elo_net=elo_net)
+        return elo_net
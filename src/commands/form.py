@@ -18,18 +18,18 @@ class FormCommand(BaseCommand):
     def process_request(self, message):
         """Get the recent match results for the user mentioned in the text."""
         try:
-            user_id = self._find_user_mentions(message['text'])[0]
+            user_id = self._user_mentions(message)[0]
         except IndexError:
             user_id = message['user']
 
         # we pass an additional GET limit param to reduce the number of results
-        args = self._command_args(message)
-        limit = self.DEFAULT_LIMIT
-        if args:
-            try:
-                limit = int(args[0])
-            except ValueError:
-                pass
+        limit = self._int_arg(message, default=self.DEFAULT_LIMIT)
+
+        # answer from the form index once it has been built, unless more
+        # results are wanted than it keeps for each player
+        form = self.poolbot.form
+        if form.ready and limit <= form.size:
+            return self.reply(self._generate_response(user_id, limit))
 
         player_form_url = self._generate_url(user_id=user_id)
         response = self.poolbot.session.get(
@@ -47,3 +47,16 @@ class FormCommand(BaseCommand):
             )
         else:
             return self.reply('Unable to get form data')
+
+    def _generate_response(self, user_id, limit):
+        """Describe the recent results and streaks of a player."""
+        current, longest, season = self.poolbot.form.streaks(user_id)
+        return (
+            'Recent results for {user_name}: `{results}` '
+            '(longest winning streak {longest}, {season} this season)'.format(
+                user_name=self.poolbot.users[user_id].username,
+                results=' '.join(self.poolbot.form.form(user_id, limit)),
+                longest=longest,
+                season=season,
+            )
+        )
@@ -1,3 +1,5 @@
+import logging
+from datetime import date
 from operator import itemgetter
 
 from .base import BaseCommand
@@ -15,18 +17,47 @@ class GrannyCommand(BaseCommand):
         'The leadboard command returns a table of users ranking by the number '
         'of grannies they have handed out.'
     )
+    anniversary_msg = (
+        ':older_woman: {years} {unit} ago today, {winner} grannied {loser}!'
+    )
+
+    def schedule_jobs(self, scheduler):
+        """Celebrate the anniversaries of grannies each day, at the time of
+        the `granny_anniversary_time` setting."""
+        anniversary_time = self.poolbot.config.get('granny_anniversary_time')
+        if anniversary_time:
+            scheduler.daily(
+                'grannies.anniversaries', anniversary_time, self.announce_anniversaries
+            )
+
+    def announce_anniversaries(self, today=None):
+        """Post the grannies given on this day in previous years to the pool
+        channel."""
+        if not self.poolbot.matches.backfilled:
+            logging.info('Skipping granny anniversaries until matches are synced')
+            return
+
+        replies = self._generate_anniversary_replies(today or date.today())
+        if replies:
+            self.poolbot.outbox.put(self.poolbot.config['slack_channel_id'], replies)
 
     def process_request(self, message):
         """Hit the players API to get all player profile data."""
         try:
-            user_id = self._find_user_mentions(message['text'])[0]
+            user_id = self._user_mentions(message)[0]
         except IndexError:
             return self.reply(self._get_granny_leaderboard(message))
         else:
             return self.reply(self._get_player_grannies(user_id))
 
     def _get_player_grannies(self, user_id):
-        """Get the details of all grannies a player has given / recieved."""
+        """Get the details of all grannies a player has given / recieved,
+        from the local match store once it holds every match."""
+        if self.poolbot.matches.backfilled:
+            return self._generate_player_granny_response(
+                user_id, self.poolbot.matches.grannies(user_id)
+            )
+
         granny_url = (
             '{player_url}{player}/grannies/'.format(
                 player_url=self.url_path,
@@ -66,14 +97,7 @@ class GrannyCommand(BaseCommand):
         to limit the number of players shown in the granny table. If no arg
         is passed, or the arg cannot be cast to an integer, default to 10.
         """
-        limit = self.default_limit
-        args = self._command_args(message)
-        if args:
-            try:
-                limit = int(args[0])
-            except ValueError:
-                pass
-        return limit
+        return self._int_arg(message, default=self.default_limit)
 
     def _generate_player_granny_response(self, user_id, matches):
         """Format a response listing all matches where a granny is recorded."""
@@ -96,11 +120,29 @@ class GrannyCommand(BaseCommand):
         player_profile = self.poolbot.users[user_id]
         return resp_str.format(
             player=player_profile.username,
-            grannies_given=player_profile['total_grannies_given_count'],
-            grannies_taken=player_profile['total_grannies_taken_count'],
+            grannies_given=player_profile.total_grannies_given_count,
+            grannies_taken=player_profile.total_grannies_taken_count,
             matches=all_matches
         )
 
+    def _generate_anniversary_replies(self, today):
+        """Return a message for each granny given on this day in a previous
+        year, by players poolbot still knows."""
+        replies = []
+        for match in self.poolbot.matches.grannies_on(today.month, today.day):
+            years = today.year - int(match['date'][:4])
+            if years < 1:
+                continue
+            if match['winner'] not in self.poolbot.users or match['loser'] not in self.poolbot.users:
+                continue
+            replies.append(self.anniversary_msg.format(
+                years=years,
+                unit='year' if years == 1 else 'years',
+                winner=self.poolbot.get_username(match['winner']),
+                loser=self.poolbot.get_username(match['loser'])
+            ))
+        return replies
+
     def _generate_response(self, data, limit):
         """Parse the returned data and generate a string which takes the form
         of a leaderboard style table, with players ranked from 1 to X.
@@ -10,6 +10,7 @@ class HeadToHeadCommand(BaseCommand):
     """Return the results of the previous games between two players."""
 
     command_term = 'head-to-head'
+    aliases = ('h2h',)
     url_path = 'api/match/head_to_head/'
     help_message = (
         'Use the `head-to-head` command to see all results between two players. '
@@ -17,11 +18,12 @@ class HeadToHeadCommand(BaseCommand):
         'of wins for each player, and the details of their last ten matches by '
         'default. You can look further back by passing an extra integer arg. '
         'If you want to see the head-to-head between yourself and another '
-        'player, passing your own name is optional.'
+        'player, passing your own name is optional. You can also use the '
+        'shorter `h2h` command.'
     )
 
     def process_request(self, message):
-        mentioned_user_ids = self._find_user_mentions(message['text'])
+        mentioned_user_ids = self._user_mentions(message)
         if not len(mentioned_user_ids):
             return self.reply(
                 'Sorry, I was unable to find two users in that message...'
@@ -33,64 +35,77 @@ class HeadToHeadCommand(BaseCommand):
         except IndexError:
             player2 = message['user']
 
-        # now try to see if the user want a larger history than the default set,
-        # by removing the mentions and using the first remaining argument
-        limit = 10
-        command_args = self._command_args(message, include_user_mentions=False)
-        if command_args:
-            try:
-                limit = int(command_args[0])
-            except ValueError:
-                pass
+        # now try to see if the user want a larger history than the default set
+        limit = self._int_arg(message, default=10)
 
-        response = self.poolbot.session.get(
-            self._generate_url(),
-            params={
-                'player1': player1,
-                'player2': player2,
-                'limit': limit,
-            }
-        )
-
-        if response.status_code == 200:
+        # answer from the head-to-head index once it has been built, unless
+        # more matches are wanted than it keeps for each pair
+        index = self.poolbot.head_to_head
+        if index.ready and limit <= index.size:
+            data = self._get_indexed_data(player1, player2, limit)
+        else:
+            response = self.poolbot.session.get(
+                self._generate_url(),
+                params={
+                    'player1': player1,
+                    'player2': player2,
+                    'limit': limit,
+                }
+            )
+            if response.status_code != 200:
+                return self.reply('Sorry, I was unable to get head to head data!')
             data = response.json()
-            player1_wins = data[player1]
-            player2_wins = data[player2]
-            total_games = data['total_count']
-            most_wins = player1 if player1_wins > player2_wins else player2
-            most_wins_user = self.poolbot.users[most_wins]
-            most_loses = player2 if most_wins == player1 else player1
-            most_loses_user = self.poolbot.users[most_loses]
 
-            reply_text = (
-                '{winner} has won {winner_win_count} games. '
-                '{loser} has only won {loser_win_count}! '
-                'This gives a win ratio of {winner_ratio} for {winner}! '
-                'The last {recent_game_count} results were:'
-                '```\n{recent_games}\n```'
-            )
+        player1_wins = data[player1]
+        player2_wins = data[player2]
+        total_games = data['total_count']
+        most_wins = player1 if player1_wins > player2_wins else player2
+        most_wins_user = self.poolbot.users[most_wins]
+        most_loses = player2 if most_wins == player1 else player1
+        most_loses_user = self.poolbot.users[most_loses]
+
+        reply_text = (
+            '{winner} has won {winner_win_count} games. '
+            '{loser} has only won {loser_win_count}! '
+            'This gives a win ratio of {winner_ratio} for {winner}! '
+            'The last {recent_game_count} results were:'
+            '```\n{recent_games}\n```'
+        )
 
-            try:
-                winning_percentage = ((data[most_wins] * 100) / total_games)
-            except ZeroDivisionError:
-                return self.reply(
-                    '{player1} and {player2} are yet to record any games!'.format(
-                        player1=self.poolbot.get_username(player1),
-                        player2=self.poolbot.get_username(player2)
-                    )
+        try:
+            winning_percentage = ((data[most_wins] * 100) / total_games)
+        except ZeroDivisionError:
+            return self.reply(
+                '{player1} and {player2} are yet to record any games!'.format(
+                    player1=self.poolbot.get_username(player1),
+                    player2=self.poolbot.get_username(player2)
                 )
+            )
 
-            return self.reply(reply_text.format(
-                winner=most_wins_user.username,
-                loser=most_loses_user.username,
-                winner_win_count=data[most_wins],
-                loser_win_count=data[most_loses],
-                winner_ratio='{percent:.0f}%'.format(percent=winning_percentage),
-                recent_game_count=data['history_count'],
-                recent_games=self._format_recent_matches(data['history'])
-            ))
-        else:
-            return self.reply('Sorry, I was unable to get head to head data!')
+        return self.reply(reply_text.format(
+            winner=most_wins_user.username,
+            loser=most_loses_user.username,
+            winner_win_count=data[most_wins],
+            loser_win_count=data[most_loses],
+            winner_ratio='{percent:.0f}%'.format(percent=winning_percentage),
+            recent_game_count=data['history_count'],
+            recent_games=self._format_recent_matches(data['history'])
+        ))
+
+    def _get_indexed_data(self, player1, player2, limit):
+        """Return the head-to-head record of the players from the index, in
+        the same format as the API."""
+        player1_wins, player2_wins = self.poolbot.head_to_head.head_to_head(
+            player1, player2
+        )
+        history = self.poolbot.head_to_head.recent(player1, player2, limit)
+        return {
+            player1: player1_wins,
+            player2: player2_wins,
+            'total_count': player1_wins + player2_wins,
+            'history': history,
+            'history_count': len(history),
+        }
 
     def _format_recent_matches(self, matches):
         ordered_matches = sorted(matches, key=itemgetter('date'), reverse=True)
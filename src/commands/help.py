@@ -1,10 +1,4 @@
 from .base import BaseCommand
-from .form import FormCommand
-from .head_to_head import HeadToHeadCommand
-from .odds import OddsCommand
-from .record import RecordCommand
-from .stats import StatsCommand
-from .elo import EloCommand
 
 
 class HelpCommand(BaseCommand):
@@ -14,18 +8,16 @@ class HelpCommand(BaseCommand):
 
     def process_request(self, message):
         """Return some helper messages describing how commands work."""
-        helpers = {
-            command.command_term: command.help_message for
-            command in self.poolbot.commands
-        }
+        registry = self.poolbot.command_registry
 
-        args = self._command_args(message)
+        args = self._command_args(message, include_user_mentions=False)
         try:
-            # asking for help on how to use an explicit command
-            reply = helpers[args[1]]
-        except (IndexError, KeyError):
+            # asking for help on how to use an explicit command, which is
+            # the only one we need to load to get its help message
+            reply = registry.resolve(args[0]).help_message
+        except (IndexError, AttributeError):
             # fallback to a general help message
-            commands = '`, `'.join(sorted(helpers.keys()))
+            commands = '`, `'.join(sorted(registry.terms()))
             template = (
                 'Try one of these commands: `{command_list}`. For more '
                 'help on how to use a command, type `@poolbot help <command>`.'
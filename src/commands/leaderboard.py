@@ -1,13 +1,15 @@
 from .base import BaseCommand
 
+from scheduler import parse_weekdays
+
 
 class LeaderboardCommand(BaseCommand):
     """Returns a leadboard of players, ordered by their elo points."""
 
     default_limit = 10
     default_elo_field = 'season'
+    nearby_distance = 2
     command_term = 'leaderboard'
-    url_path = 'api/player/'
     help_message = (
         'The leadboard command returns a table of users ranking by their elo '
         'points. You can pass `season` or `all` in the command to determine '
@@ -15,74 +17,113 @@ class LeaderboardCommand(BaseCommand):
         'passed, the season elo score is default. To reduce the length of the '
         'leaderboard displayed, you can pass an additional integer argument. '
         'To only include players who have played more than ten games, pass the'
-        '`minimum` argument.'
+        '`minimum` argument. To see the players around you, pass `me`, or '
+        'mention another player to see the players around them.'
     )
+    leaderboard_row_msg = '{ranking}. {name} [Elo Score: {elo}] ({wins} W / {losses} L)'
+    digest_msg = 'The season leaderboard so far: \n{table}'
+
+    def schedule_jobs(self, scheduler):
+        """Post the season leaderboard to the pool channel at the time of the
+        `leaderboard_digest_time` setting, on each of the
+        `leaderboard_digest_days` (or every day if none are set)."""
+        digest_time = self.poolbot.config.get('leaderboard_digest_time')
+        if digest_time:
+            scheduler.daily(
+                'leaderboard.digest',
+                digest_time,
+                self.post_digest,
+                weekdays=parse_weekdays(
+                    self.poolbot.config.get('leaderboard_digest_days')
+                )
+            )
+
+    def post_digest(self):
+        """Post the top of the season leaderboard to the pool channel."""
+        table = self._generate_response(
+            self.poolbot.leaderboards[self.default_elo_field],
+            self.default_elo_field,
+            self.default_limit
+        )
+        if table:
+            self.poolbot.outbox.put(
+                self.poolbot.config['slack_channel_id'],
+                [self.digest_msg.format(table=table)]
+            )
 
     def process_request(self, message):
-        """Get the elo scores via the API and format to form the leaderboard."""
+        """Format the leaderboard from the players poolbot has indexed by
+        their elo scores, without asking the server."""
         command_args = self._command_args(message, include_user_mentions=False)
-        self.elo_field = self._determine_elo_field(command_args)
-
-        leaderboard_url = self._generate_url()
-        get_params = {
-            'active': True,
-            'ordering': '-{}_elo'.format(self.elo_field)
-        }
-        response = self.poolbot.session.get(
-            leaderboard_url,
-            params=get_params,
-        )
+        elo_field = self._determine_elo_field(command_args)
+        leaderboard = self.poolbot.leaderboards[elo_field]
 
-        if response.status_code == 200:
-            limit = self._calculate_limit(command_args)
-            minimum = self._minimum_games_filter(command_args)
+        # show the players either side of the author or a mentioned player
+        mentions = self._user_mentions(message)
+        if mentions or 'me' in command_args:
+            player = mentions[0] if mentions else message['user']
             return self.reply(
-                self._generate_response(response.json(), limit, minimum)
+                self._generate_nearby_response(leaderboard, elo_field, player)
             )
-        else:
-            return self.reply('Unable to get leadboard data')
+
+        limit = self._int_arg(message, default=self.default_limit)
+        minimum = self._minimum_games_filter(command_args)
+        return self.reply(
+            self._generate_response(leaderboard, elo_field, limit, minimum)
+        )
 
     def _determine_elo_field(self, command_args):
         """Determine which elo ranking field to use."""
         return 'total' if 'all' in command_args else self.default_elo_field
 
-    def _calculate_limit(self, command_args):
-        """Parse the message to see if an additional parameter was passed
-        to limit the number of players shown in the leaderboard. If no arg
-        is passed, or the arg cannot be cast to an integer, default to 10.
-        """
-        for arg in command_args:
-            try:
-                return int(arg)
-            except ValueError:
-                pass
-        return self.default_limit
-
     def _minimum_games_filter(self, command_args):
         """Determine if an argument was passed to filter the leaderboard to
         only include players who have played a minimum number of games.
         """
         return 10 if 'minimum' in command_args else 1
 
-    def _generate_response(self, data, limit, minimum_games=1):
-        """Parse the returned data and generate a string which takes the form
-        of a leaderboard style table, with players ranked from 1 to X.
+    def _generate_response(self, leaderboard, elo_field, limit, minimum_games=1):
+        """Generate a string which takes the form of a leaderboard style
+        table, with players ranked from 1 to X.
         """
-        leaderboard_row_msg = '{ranking}. {name} [Elo Score: {elo}] ({wins} W / {losses} L)'
+        # every indexed player has played at least one game, so we only need
+        # to look past the top rows when filtering by a higher minimum
+        player_ids = leaderboard.top(limit if minimum_games == 1 else None)
         leaderboard_table_rows = []
 
-        for player in data:
+        for player_id in player_ids:
+            user = self.poolbot.users[player_id]
             if (
-                player['{}_win_count'.format(self.elo_field)] >= minimum_games or
-                player['{}_loss_count'.format(self.elo_field)] >= minimum_games
+                getattr(user, '{}_win_count'.format(elo_field)) >= minimum_games or
+                getattr(user, '{}_loss_count'.format(elo_field)) >= minimum_games
             ):
-                leaderboard_table_rows.append(leaderboard_row_msg.format(
-                    ranking=len(leaderboard_table_rows) + 1,
-                    name=player['name'],
-                    wins=player['{}_win_count'.format(self.elo_field)],
-                    losses=player['{}_loss_count'.format(self.elo_field)],
-                    elo=player['{}_elo'.format(self.elo_field)])
-                )
+                leaderboard_table_rows.append(self._format_row(
+                    len(leaderboard_table_rows) + 1, user, elo_field
+                ))
+                if len(leaderboard_table_rows) == limit:
+                    break
 
-        # finally only return the rows we actually want
-        return ' \n'.join(leaderboard_table_rows[:limit])
+        return ' \n'.join(leaderboard_table_rows)
+
+    def _generate_nearby_response(self, leaderboard, elo_field, player_id):
+        """Generate a leaderboard table of the players ranked just above and
+        below the player."""
+        nearby_players = leaderboard.around(player_id, self.nearby_distance)
+        if not nearby_players:
+            return '{name} is not on the leaderboard yet.'.format(
+                name=self.poolbot.get_username(player_id)
+            )
+
+        return ' \n'.join(
+            self._format_row(position, self.poolbot.users[nearby_id], elo_field) for
+            position, nearby_id in nearby_players
+        )
+
+    def _format_row(self, ranking, user, elo_field):
+        return self.leaderboard_row_msg.format(
+            ranking=ranking,
+            name=user.name,
+            wins=getattr(user, '{}_win_count'.format(elo_field)),
+            losses=getattr(user, '{}_loss_count'.format(elo_field)),
+            elo=getattr(user, '{}_elo'.format(elo_field)),
+        )
@@ -0,0 +1,55 @@
+from .base import BaseCommand
+
+
+class NemesisCommand(BaseCommand):
+    """Returns the opponent a player has the worst record against."""
+
+    command_term = 'nemesis'
+    minimum_games = 3
+    help_message = (
+        'The `nemesis` command returns the player you have the worst win '
+        'ratio against, out of those you have played at least three times. '
+        'Mention another player to find their nemesis instead.'
+    )
+    not_ready_message = (
+        'Sorry, I am still loading the match history. Try again shortly.'
+    )
+    response_message = (
+        '{player}\'s nemesis is {opponent}, who has beaten them {losses} times '
+        'in {games} games.'
+    )
+    no_opponent_message = (
+        '{player} is yet to lose to anyone they have played three times!'
+    )
+
+    def process_request(self, message):
+        try:
+            user_id = self._user_mentions(message)[0]
+        except IndexError:
+            user_id = message['user']
+
+        index = self.poolbot.head_to_head
+        if not index.ready:
+            return self.reply(self.not_ready_message)
+
+        record = self._find_opponent(index, user_id)
+        if record is None:
+            return self.reply(
+                self.no_opponent_message.format(
+                    player=self.poolbot.get_username(user_id)
+                )
+            )
+
+        opponent, wins, losses = record
+        return self.reply(
+            self.response_message.format(
+                player=self.poolbot.get_username(user_id),
+                opponent=self.poolbot.get_username(opponent),
+                wins=wins,
+                losses=losses,
+                games=wins + losses,
+            )
+        )
+
+    def _find_opponent(self, index, user_id):
+        return index.nemesis(user_id, minimum_games=self.minimum_games)
@@ -5,6 +5,91 @@ class OddsCommand(BaseCommand):
     """Returns some odds based on the players and recent results."""
 
     command_term = 'odds'
+    field_args = ('field', 'all')
+    help_message = (
+        'The `odds` command returns the chance of one player beating another, '
+        'based on their season elo and head-to-head record. For example, '
+        '`@poolbot odds @danny @martin`, or just `@poolbot odds @martin` to '
+        'see your own odds. Use `@poolbot odds field` to see your odds '
+        'against every player on the leaderboard, or mention another player '
+        'to see theirs.'
+    )
 
     def process_request(self, message):
-        return self.reply('Sorry this command is not implemented yet...')
+        mentioned_user_ids = self._user_mentions(message)
+        args = [arg.lower() for arg in self._command_args(message)]
+
+        if any(arg in self.field_args for arg in args):
+            try:
+                player = mentioned_user_ids[0]
+            except IndexError:
+                player = message['user']
+            return self.reply(self._generate_field_response(player))
+
+        if not len(mentioned_user_ids):
+            return self.reply('Sorry, you must mention at least one user.')
+
+        try:
+            player1 = mentioned_user_ids[0]
+            player2 = mentioned_user_ids[1]
+        except IndexError:
+            player2 = player1
+            player1 = message['user']
+
+        if player1 == player2:
+            return self.reply('Sorry, a player cannot play against themselves.')
+
+        return self.reply(self._generate_pair_response(player1, player2))
+
+    def _generate_pair_response(self, player1, player2):
+        odds = self.poolbot.odds
+        probability = odds.probability(player1, player2)
+        if probability is None:
+            return 'Sorry, I was unable to calculate the odds of that match.'
+
+        wins, losses = self.poolbot.head_to_head.head_to_head(player1, player2)
+        reply_text = (
+            '{player1} has a {probability} chance of beating {player2}. '
+            'Their elo alone gives {player1} a {elo_probability} chance'
+        ).format(
+            player1=self.poolbot.get_username(player1),
+            player2=self.poolbot.get_username(player2),
+            probability=self._format_probability(probability),
+            elo_probability=self._format_probability(
+                odds.probability(player1, player2, adjusted=False)
+            ),
+        )
+        if not self.poolbot.head_to_head.ready:
+            reply_text += ', as I am still loading their head-to-head record.'
+        elif wins or losses:
+            reply_text += (
+                ', adjusted for a head-to-head record of {wins}-{losses}.'
+            ).format(wins=wins, losses=losses)
+        else:
+            reply_text += ', as they are yet to play each other.'
+        return reply_text
+
+    def _generate_field_response(self, player):
+        opponents = set(self.poolbot.leaderboards['season'].top())
+        field = self.poolbot.odds.field(player, opponents)
+        if not field:
+            return 'Sorry, I was unable to calculate the odds for that player.'
+
+        average = sum(probability for opponent, probability in field) / len(field)
+        rows = [
+            '{name}: {probability}'.format(
+                name=self.poolbot.get_username(opponent),
+                probability=self._format_probability(probability),
+            ) for opponent, probability in field
+        ]
+        return (
+            '{player} has a {average} chance of beating an average player on '
+            'the leaderboard.```\n{rows}\n```'
+        ).format(
+            player=self.poolbot.get_username(player),
+            average=self._format_probability(average),
+            rows='\n'.join(rows),
+        )
+
+    def _format_probability(self, probability):
+        return '{percent:.0f}%'.format(percent=probability * 100)
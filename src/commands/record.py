@@ -1,4 +1,6 @@
 import random
+from functools import partial
+from time import time
 
 from utils import get_ordinal_extension
 
@@ -86,7 +88,7 @@ class RecordCommand(BaseCommand):
             return self.reply("Sorry hombre, uou can only record matches in the public channel.")
 
         # detect the defeated player, ensuring a user does not beat themself
-        defeated_player = self._find_defeated_player(message['text'])
+        defeated_player = self._find_defeated_player(message)
         if defeated_player is None:
             return self.reply(self.no_user_found_message)
         elif defeated_player == msg_author:
@@ -102,40 +104,50 @@ class RecordCommand(BaseCommand):
                 )
             ) 
 
+        metrics = self.poolbot.metrics
+        start = time()
+
         # cache the elo score of each player before recording the win
         original_elo_winner = self._get_elo(msg_author)
         original_elo_loser = self._get_elo(defeated_player)
-        
+
         # cache the leaderboard position of each player before recording the win
         # if either player has not played, this will be None as players without
         # a game are excluded from the leaderboard
         original_position_winner = self.poolbot.get_leaderboard_position(msg_author)
         original_position_loser = self.poolbot.get_leaderboard_position(defeated_player)
 
-        response = self.poolbot.session.post(
-            self._generate_url(),
-            data={
+        with metrics.timer('record.post_match'):
+            match = {
                 'winner': msg_author,
                 'loser': defeated_player,
                 'channel': message['channel'],
                 'granny': 'grannied' in lower_text,
             }
-        )
+            response = self.poolbot.session.post(self._generate_url(), data=match)
 
         if response.status_code == 201:
+            # the server includes the date of the match in its response
+            match.update(response.json())
+            self.poolbot.match_recorded(match)
 
-            # fetch the new elo score after the match has been recorded
-            # and store it in the player profile cache
-            updated_elo_winner = self._get_elo(msg_author, from_cache=False)
-            updated_elo_loser = self._get_elo(defeated_player, from_cache=False)
+            # fetch the new elo score of both players at once after the match
+            # has been recorded, which also updates their profile in the cache
+            # and so their position in the cached leaderboard
+            with metrics.timer('record.fetch_profiles'):
+                updated_elo_winner, updated_elo_loser = self.poolbot.request_pool.map(
+                    partial(self._get_elo, from_cache=False),
+                    (msg_author, defeated_player)
+                )
 
             delta_elo_winner = updated_elo_winner - original_elo_winner
             delta_elo_loser = abs(updated_elo_loser - original_elo_loser)
 
-            # fetch the new leaderboard position after the match has been recorded
+            # the new leaderboard positions are read from the updated index
             updated_position_winner = self.poolbot.get_leaderboard_position(msg_author)
             updated_position_loser = self.poolbot.get_leaderboard_position(defeated_player)
-            
+            metrics.timing('record.total', time() - start)
+
             if original_position_winner is not None:
                 delta_position_winner = abs(updated_position_winner - original_position_winner)
 
@@ -218,10 +230,10 @@ class RecordCommand(BaseCommand):
         # TODO generate some funny phrase to celebrate the victory
         # eg highlight an unbetean run, or X consequtive lose etc
 
-    def _find_defeated_player(self, text):
+    def _find_defeated_player(self, message):
         """Look for a user mention in the message text."""
         try:
-            return self._find_user_mentions(text)[0]
+            return self._user_mentions(message)[0]
         except IndexError:
             return None
 
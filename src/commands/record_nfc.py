@@ -25,7 +25,7 @@ class RecordNFCCommand(BaseCommand):
             return self.reply('Only NFC bots can use this command')
 
         try:
-            winner, loser = self._find_players(message['text'])
+            winner, loser = self._find_players(message)
         except ValueError:  # safety check just in case NFC bot sends a wrong text
             return self.reply("Unable to record game via NFC.")
 
@@ -34,10 +34,11 @@ class RecordNFCCommand(BaseCommand):
         victory_noun = random.choice(record.victory_nouns)
         message['user'] = winner
         message['text'] = "{} <@{}>".format(victory_noun, loser)
+        message['parsed'] = self.poolbot.tokenizer.parse(message['text'])
 
         # Pretend it's a record command!
         return record.process_request(message)
 
-    def _find_players(self, text):
+    def _find_players(self, message):
         """Parses the message text and returns two user IDs: winner's and loser's."""
-        return self._find_user_mentions(text)[:2]
+        return self._user_mentions(message)[:2]
@@ -1,5 +1,8 @@
+import logging
 from datetime import datetime
 
+from requests import HTTPError
+
 from utils import format_datetime_to_date
 from .base import BaseCommand
 
@@ -31,56 +34,72 @@ class SeasonCommand(BaseCommand):
         )
 
     def season_list(self):
-        """Find all season instances and return them in a formatted list"""
-        season_url = self._generate_url()
-        get_params = {'ordering': '-end_date'}
-        response = self.poolbot.session.get(season_url, params=get_params)
-
-        if response.status_code == 200:
-            return self.format_season_list_response(response.json())
+        """Return all the seasons from the season catalog in a formatted
+        list, newest first."""
+        if not self.poolbot.seasons.ready and not self._refresh_catalog():
+            return None
+        return self.format_season_list_response(self.poolbot.seasons.newest_first())
 
     def season_detail(self, season_name):
-        """Find all season player instances and format into a leaderboard."""
-        season_url = self._generate_url()
-        response = self.poolbot.session.get(season_url)
-
-        if response.status_code == 200:
-            season = self.find_season(season_name, response.json())
-            if season is None:
-                return (
-                    "Unable to get data for the season {season}. "
-                    "Are you sure there is a season with this name?".format(
-                        season=season_name
-                    )
-                )
-            else:
-                season_player_url = self.poolbot.generate_url('api/season-player/')
-                get_params = {
-                    'season': season['pk'],
-                    'ordering': '-elo_score'
-                }
-                response = self.poolbot.session.get(
-                    season_player_url,
-                    params=get_params
+        """Format the leaderboard of a season. The leaderboards of finished
+        seasons are only fetched once, and the active season is only fetched
+        again after a match is recorded."""
+        catalog = self.poolbot.seasons
+        season = catalog.get(season_name)
+        if season is None:
+            # the season may have started since the catalog was loaded
+            if not self._refresh_catalog():
+                return None
+            season = catalog.get(season_name)
+
+        if season is None:
+            return (
+                "Unable to get data for the season {season}. "
+                "Are you sure there is a season with this name?".format(
+                    season=season_name
                 )
+            )
 
-                if response.status_code == 200:
-                    return self.format_season_player_responses(season, response.json())
+        rows = catalog.leaderboard(season)
+        if rows is None:
+            generation = catalog.generation
+            season_player_url = self.poolbot.generate_url('api/season-player/')
+            get_params = {
+                'season': season['pk'],
+                'ordering': '-elo_score'
+            }
+            response = self.poolbot.session.get(
+                season_player_url,
+                params=get_params
+            )
+            if response.status_code != 200:
+                return None
+
+            rows = response.json()
+            catalog.set_leaderboard(season, rows, generation)
 
-    def find_season(self, season_name, season_data):
-        for season in season_data:
-            if season['name'] == season_name:
-                return season
+        return self.format_season_player_responses(season, rows)
+
+    def _refresh_catalog(self):
+        """Reload the season catalog, returning whether it succeeded."""
+        try:
+            self.poolbot.refresh_seasons()
+        except HTTPError:
+            logging.exception('Unable to refresh the season catalog.')
+            return False
+        return True
 
     def format_season_list_response(self, data):
         """Format the season list response."""
 
         # we want to show the human readable name for the player, not their
-        # PK which is what the API returns...
-        for season in data:
-            season['winner_name'] = self.poolbot.users.get(
+        # PK which is what the API returns. The seasons are copied, as they
+        # belong to the season catalog
+        data = [
+            dict(season, winner_name=self.poolbot.users.get(
                 season['winner'], 'TBC' # this should be the in progress season
-            )
+            )) for season in data
+        ]
 
         return "\n".join(
             self.active_list_reply.format(**season) if
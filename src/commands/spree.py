@@ -36,28 +36,33 @@ class SpreeCommand(BaseCommand):
             else:
                 break
 
+        return self.get_spree_message(spree), spree
+
+    def get_spree_message(self, spree):
         # cover cases where the number is higher than the spree table max
         spree_key = self.HIGHEST_SPREE if spree > self.HIGHEST_SPREE else spree
 
-        spree_msg = self.SPREE_TABLE.get(spree_key, None)
-
-        return spree_msg, spree
+        return self.SPREE_TABLE.get(spree_key, None)
 
     def process_request(self, message):
         """Get the recent match results for the user mentioned in the text."""
         try:
-            user_id = self._find_user_mentions(message['text'])[0]
+            user_id = self._user_mentions(message)[0]
         except IndexError:
             user_id = message['user']
 
+        # the form index knows the current streak of every player once it
+        # has been built from the match store
+        if self.poolbot.form.ready:
+            spree_count = self.poolbot.form.streaks(user_id)[0]
+            return self.reply(
+                self._generate_response(
+                    user_id, self.get_spree_message(spree_count), spree_count
+                )
+            )
+
         # we pass an additional GET limit param to reduce the number of results
-        args = self._command_args(message)
-        limit = self.DEFAULT_LIMIT
-        if args:
-            try:
-                limit = int(args[0])
-            except ValueError:
-                pass
+        limit = self._int_arg(message, default=self.DEFAULT_LIMIT)
 
         player_form_url = self._generate_url(user_id=user_id)
         response = self.poolbot.session.get(
@@ -67,19 +72,19 @@ class SpreeCommand(BaseCommand):
 
         if response.status_code == 200:
             spree, spree_count = self.calculate_spree(response.content)
-            if spree:
-                user = self.poolbot.users[user_id]
-                return self.reply(
-                    '{username} {prefix} {spree} {suffix} ({count} consecutive wins)'.format(
-                        username=user.username,
-                        prefix=spree[0],
-                        spree=spree[1],
-                        suffix=spree[2],
-                        count=spree_count,
-                    )
-                )
-            else:
-                return self.reply('')
-
+            return self.reply(self._generate_response(user_id, spree, spree_count))
         else:
             return self.reply('Unable to get spree data')
+
+    def _generate_response(self, user_id, spree, spree_count):
+        if not spree:
+            return ''
+
+        user = self.poolbot.users[user_id]
+        return '{username} {prefix} {spree} {suffix} ({count} consecutive wins)'.format(
+            username=user.username,
+            prefix=spree[0],
+            spree=spree[1],
+            suffix=spree[2],
+            count=spree_count,
+        )
@@ -0,0 +1,34 @@
+from .base import BaseCommand
+
+
+class StatusCommand(BaseCommand):
+    """Reports metrics about how poolbot itself is performing."""
+
+    command_term = 'status'
+    help_message = (
+        'The status command reports how poolbot is performing, for example '
+        'how many replies are waiting to be sent and how long they waited.'
+    )
+
+    def process_request(self, message):
+        report = self.poolbot.metrics.report()
+        if not report:
+            return self.reply('No metrics have been recorded yet.')
+
+        hit_rate = self._cache_hit_rate()
+        if hit_rate is not None:
+            report += '\nhttp.cache.hit_rate: {:.0f}%'.format(hit_rate * 100)
+        return self.reply('Poolbot status:\n```\n{}\n```'.format(report))
+
+    def _cache_hit_rate(self):
+        """Return the share of cacheable requests answered without
+        downloading the response again, or None if there have been none."""
+        metrics = self.poolbot.metrics
+        hits = (
+            metrics.get_counter('http.cache.hit') +
+            metrics.get_counter('http.cache.revalidated')
+        )
+        lookups = hits + metrics.get_counter('http.cache.miss')
+        if not lookups:
+            return None
+        return float(hits) / lookups
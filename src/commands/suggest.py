@@ -0,0 +1,70 @@
+from .base import BaseCommand
+
+from models import OpponentSuggester
+from utils import format_datetime_to_date
+
+
+class SuggestCommand(BaseCommand):
+    """Suggests who a player should play next."""
+
+    command_term = 'suggest'
+    default_limit = 3
+    help_message = (
+        'The `suggest` command recommends opponents for you, out of the '
+        'players closest to your season elo. Players who have played '
+        'recently, would give you a close match, and who you have not played '
+        'for a while (or ever) are suggested first. Mention another player '
+        'to get suggestions for them, or pass a number to see more.'
+    )
+    not_ready_message = (
+        'Sorry, I am still loading the match history. Try again shortly.'
+    )
+    suggestion_row_msg = '{ranking}. {name} ({probability} chance of winning, {history})'
+
+    def process_request(self, message):
+        try:
+            user_id = self._user_mentions(message)[0]
+        except IndexError:
+            user_id = message['user']
+
+        if not (self.poolbot.form.ready and self.poolbot.head_to_head.ready):
+            return self.reply(self.not_ready_message)
+
+        try:
+            user = self.poolbot.users[user_id]
+        except KeyError:
+            return self.reply('Sorry, I do not know that player.')
+
+        limit = min(max(self._int_arg(message, default=self.default_limit), 1), 10)
+        suggester = OpponentSuggester(
+            self.poolbot.leaderboards['season'],
+            self.poolbot.odds,
+            self.poolbot.elo_engine,
+            self.poolbot.form,
+            self.poolbot.head_to_head,
+            candidates=max(limit * 5, 20)
+        )
+        suggestions = suggester.suggest(user_id, user.season_elo, limit=limit)
+        if not suggestions:
+            return self.reply(
+                'Sorry, there is nobody on the leaderboard to suggest yet.'
+            )
+
+        rows = [
+            self.suggestion_row_msg.format(
+                ranking=ranking,
+                name=self.poolbot.get_username(opponent),
+                probability='{:.0f}%'.format(probability * 100),
+                history=self._format_history(last_played),
+            ) for ranking, (opponent, score, probability, last_played) in
+            enumerate(suggestions, 1)
+        ]
+        return self.reply('Suggested opponents for {player}: \n{rows}'.format(
+            player=self.poolbot.get_username(user_id),
+            rows=' \n'.join(rows),
+        ))
+
+    def _format_history(self, last_played):
+        if last_played is None:
+            return 'never played'
+        return 'last played {}'.format(format_datetime_to_date(last_played))
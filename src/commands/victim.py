@@ -0,0 +1,23 @@
+from .nemesis import NemesisCommand
+
+
+class VictimCommand(NemesisCommand):
+    """Returns the opponent a player has the best record against."""
+
+    command_term = 'victim'
+    help_message = (
+        'The `victim` command returns your favourite victim - the player you '
+        'have the best win ratio against, out of those you have played at '
+        'least three times. Mention another player to find their victim '
+        'instead.'
+    )
+    response_message = (
+        '{player}\'s favourite victim is {opponent}, who they have beaten '
+        '{wins} times in {games} games.'
+    )
+    no_opponent_message = (
+        '{player} is yet to beat anyone they have played three times!'
+    )
+
+    def _find_opponent(self, index, user_id):
+        return index.victim(user_id, minimum_games=self.minimum_games)
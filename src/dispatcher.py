@@ -0,0 +1,86 @@
+"""Runs poolbot handlers on worker threads without blocking the RTM loop."""
+
+import logging
+import threading
+from collections import deque
+from Queue import Queue
+
+
+class ChannelDispatcher(object):
+    """
+    Executes a callback for each submitted event on a pool of worker threads.
+
+    Events from different channels are processed concurrently, but events
+    from the same channel are always processed one at a time and in the order
+    they were submitted - so a reply to the first message in a channel is
+    never overtaken by a reply to the second.
+    """
+
+    def __init__(self, callback, workers=4):
+        self.callback = callback
+        self.workers = workers
+
+        # pending events for each channel, and the channels which currently
+        # have a worker processing one of their events
+        self.channel_queues = {}
+        self.active_channels = set()
+        self.lock = threading.Lock()
+
+        # channels which have pending events and are waiting for a worker
+        self.ready_channels = Queue()
+
+        self.threads = []
+        for i in xrange(self.workers):
+            thread = threading.Thread(
+                target=self._work,
+                name='poolbot-worker-{}'.format(i)
+            )
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, channel_id, event):
+        """Queue an event to be processed after all earlier events from the
+        same channel."""
+        with self.lock:
+            queue = self.channel_queues.setdefault(channel_id, deque())
+            queue.append(event)
+
+            # if a worker is already draining this channel it will pick up
+            # the event once the earlier ones are finished
+            if channel_id in self.active_channels:
+                return
+            self.active_channels.add(channel_id)
+
+        self.ready_channels.put(channel_id)
+
+    def pending(self):
+        """Return the total number of events waiting to be processed."""
+        with self.lock:
+            return sum(len(queue) for queue in self.channel_queues.itervalues())
+
+    def _work(self):
+        """Process one event at a time from whichever channel is ready."""
+        while True:
+            channel_id = self.ready_channels.get()
+
+            with self.lock:
+                event = self.channel_queues[channel_id].popleft()
+
+            try:
+                self.callback(event)
+            except Exception:
+                logging.exception('Unable to process event %s', event)
+
+            with self.lock:
+                if self.channel_queues[channel_id]:
+                    # hand the channel back to the pool rather than draining
+                    # it here, so one busy channel cannot starve the others
+                    requeue = True
+                else:
+                    del self.channel_queues[channel_id]
+                    self.active_channels.discard(channel_id)
+                    requeue = False
+
+            if requeue:
+                self.ready_channels.put(channel_id)
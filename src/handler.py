@@ -1,6 +1,12 @@
 class Handler(object):
     """Base class for handlers which defines the interface to implement."""
 
+    # the RTM event types and subtypes a reaction is interested in, and
+    # optionally the IDs of the only channels it should react in
+    event_types = ()
+    event_subtypes = ()
+    channels = None
+
     def __init__(self, poolbot):
         """Make poolbot available to all handlers."""
         self.poolbot = poolbot
@@ -13,6 +19,10 @@ class Handler(object):
         """Determine an action to take based on the message details."""
         return NotImplemented()
 
+    def schedule_jobs(self, scheduler):
+        """Register any periodic jobs the handler runs with the scheduler."""
+        pass
+
     def reply(self, message, callbacks=None):
         """Return a message to the channel and call further commands via callbacks."""
         if callbacks is None:
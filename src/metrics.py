@@ -0,0 +1,71 @@
+"""In process counters, gauges and timings used to monitor poolbot."""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from time import time
+
+
+class Metrics(object):
+    """Thread safe store of the metrics recorded while poolbot runs."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = defaultdict(int)
+        self.gauges = {}
+        self.timings = {}
+
+    def incr(self, name, value=1):
+        """Increase a counter, for example the number of cache hits."""
+        with self.lock:
+            self.counters[name] += value
+
+    def gauge(self, name, value):
+        """Record the current value of something, for example a queue size."""
+        with self.lock:
+            self.gauges[name] = value
+
+    def timing(self, name, seconds):
+        """Record how long an operation took."""
+        with self.lock:
+            count, total, maximum = self.timings.get(name, (0, 0.0, 0.0))
+            self.timings[name] = (count + 1, total + seconds, max(maximum, seconds))
+
+    @contextmanager
+    def timer(self, name):
+        """Record the time taken to execute the body of a with statement."""
+        start = time()
+        try:
+            yield
+        finally:
+            self.timing(name, time() - start)
+
+    def get_counter(self, name):
+        """Return the current value of a counter."""
+        with self.lock:
+            return self.counters.get(name, 0)
+
+    def get_timing(self, name):
+        """Return the count, mean and maximum (in seconds) of a timing."""
+        with self.lock:
+            count, total, maximum = self.timings.get(name, (0, 0.0, 0.0))
+        mean = total / count if count else 0.0
+        return count, mean, maximum
+
+    def report(self):
+        """Return a human readable summary of all metrics recorded."""
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            timings = dict(self.timings)
+
+        lines = ['{}: {}'.format(name, counters[name]) for name in sorted(counters)]
+        lines.extend(
+            '{}: {}'.format(name, gauges[name]) for name in sorted(gauges)
+        )
+        for name in sorted(timings):
+            count, total, maximum = timings[name]
+            lines.append('{}: {:.0f}ms mean / {:.0f}ms max ({} samples)'.format(
+                name, total * 1000 / count, maximum * 1000, count
+            ))
+        return '\n'.join(lines)
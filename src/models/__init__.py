@@ -1 +1,11 @@
-from users import User
\ No newline at end of file
+from challenges import Challenge, ChallengeBoard
+from channels import ChannelRegistry
+from elo_history import EloHistory
+from form import FormIndex
+from head_to_head import HeadToHeadIndex
+from leaderboard import RankIndex
+from matches import MatchStore
+from odds import OddsMatrix
+from seasons import SeasonCatalog
+from suggestions import OpponentSuggester
+from users import User
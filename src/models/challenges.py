@@ -0,0 +1,123 @@
+"""In memory state of the challenge in each channel."""
+
+from threading import Lock
+
+from utils import InvalidChallengeStateException, datetime_to_timestamp
+
+
+class Challenge(object):
+    """
+    The challenge of a single channel, which is a small state machine.
+
+    A player opens a challenge, another player accepts it, and if nobody
+    accepts it in time it expires. An accepted challenge also expires once
+    the match has had time to be played. A new challenge can be opened once
+    the last one has been accepted or has expired.
+    """
+
+    OPEN = 'open'
+    ACCEPTED = 'accepted'
+    EXPIRED = 'expired'
+
+    # the states a challenge can move to from each state
+    transitions = {
+        EXPIRED: (OPEN,),
+        OPEN: (ACCEPTED, EXPIRED),
+        ACCEPTED: (OPEN, EXPIRED),
+    }
+
+    def __init__(self, pk, channel, initiator=None, challenger=None, updated_at=None):
+        self.pk = pk
+        self.channel = channel
+        self.initiator = initiator or None
+        self.challenger = challenger or None
+        if self.initiator and self.challenger:
+            self.state = self.ACCEPTED
+        elif self.initiator:
+            self.state = self.OPEN
+        else:
+            self.state = self.EXPIRED
+
+        # the time the server last changed the challenge, if known
+        self.updated_at = updated_at
+        # the time the current state expires at, if it does
+        self.expires_at = None
+        # held while a change is written to the server, so the state is
+        # only changed once the server has accepted it
+        self.lock = Lock()
+
+    @classmethod
+    def from_api(cls, data):
+        """Create a challenge from the data of the `api/challenge/` endpoint."""
+        updated_at = data.get('last_updated')
+        return cls(
+            data['id'], data['channel'], data.get('initiator'), data.get('challenger'),
+            updated_at=datetime_to_timestamp(updated_at) if updated_at else None
+        )
+
+    def can_become(self, state):
+        return state in self.transitions[self.state]
+
+    def open(self, initiator, expires_at=None):
+        self._move(self.OPEN)
+        self.initiator = initiator
+        self.challenger = None
+        self.expires_at = expires_at
+
+    def accept(self, challenger, expires_at=None):
+        if challenger == self.initiator:
+            raise InvalidChallengeStateException(
+                'A player cannot accept their own challenge.'
+            )
+        self._move(self.ACCEPTED)
+        self.challenger = challenger
+        self.expires_at = expires_at
+
+    def expire(self):
+        self._move(self.EXPIRED)
+        self.initiator = None
+        self.challenger = None
+        self.expires_at = None
+
+    def _move(self, state):
+        if not self.can_become(state):
+            raise InvalidChallengeStateException(
+                'A challenge which is {} cannot become {}.'.format(self.state, state)
+            )
+        self.state = state
+
+
+class ChallengeBoard(object):
+    """The challenge of each channel, loaded from the server once and then
+    kept up to date as poolbot changes them."""
+
+    def __init__(self):
+        self.challenges = {}
+        self.ready = False
+        self.lock = Lock()
+
+    def load(self, data):
+        """Replace the challenges with those returned by the server."""
+        with self.lock:
+            self.challenges = dict(
+                (challenge['channel'], Challenge.from_api(challenge)) for
+                challenge in data
+            )
+            self.ready = True
+
+    def get(self, channel):
+        with self.lock:
+            return self.challenges.get(channel)
+
+    def add(self, challenge):
+        """Add a challenge just created on the server."""
+        with self.lock:
+            self.challenges[challenge.channel] = challenge
+        return challenge
+
+    def in_state(self, state):
+        with self.lock:
+            return [
+                challenge for challenge in self.challenges.itervalues() if
+                challenge.state == state
+            ]
@@ -0,0 +1,74 @@
+"""Registry of the slack channels poolbot is a member of."""
+
+
+class ChannelRegistry(object):
+    """
+    Stores the ID and name of each channel poolbot is a member of, keyed by
+    channel ID for constant time lookups.
+
+    Channels poolbot is not a member of are never stored. After the initial
+    load the registry is kept up to date from RTM events, rather than by
+    fetching the full channel list again.
+    """
+
+    page_size = 200
+
+    def __init__(self):
+        self.channels = {}
+
+    def __contains__(self, channel_id):
+        return channel_id in self.channels
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def get(self, channel_id, default=None):
+        return self.channels.get(channel_id, default)
+
+    def all(self):
+        """Return a copy of every channel, safe to use while the registry
+        is updated from another thread."""
+        return [dict(channel) for channel in self.channels.values()]
+
+    def load(self, client):
+        """Page through `channels.list`, storing the channels poolbot is a
+        member of one page at a time."""
+        params = {
+            'exclude_archived': True,
+            'exclude_members': True,
+            'limit': self.page_size,
+        }
+        while True:
+            response = client.api_call('channels.list', **params)
+            if not response.get('ok'):
+                break
+
+            for channel in response['channels']:
+                self.add(channel)
+
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                break
+            params['cursor'] = cursor
+
+    def add(self, channel):
+        """Store a channel if poolbot is a member of it. The `channel_joined`
+        event omits `is_member`, as joining implies membership."""
+        if channel.get('is_member', True):
+            self.channels[channel['id']] = {
+                'id': channel['id'],
+                'name': channel.get('name'),
+            }
+
+    def remove(self, channel_id):
+        self.channels.pop(channel_id, None)
+
+    def rename(self, channel):
+        """Update the name of a channel if poolbot is a member of it."""
+        try:
+            self.channels[channel['id']]['name'] = channel['name']
+        except KeyError:
+            pass
@@ -0,0 +1,93 @@
+"""Compact in memory copy of a player's elo history."""
+
+from array import array
+from bisect import bisect_left
+from threading import Lock
+
+from utils import datetime_to_timestamp
+
+
+class EloHistory(object):
+    """
+    The elo score of a player after each of their matches, oldest first.
+
+    Entries are stored in parallel arrays of integers rather than a list of
+    dicts, and each date is only parsed once, when it is added. Alongside the
+    scores we keep a running total of the points won or lost by each match,
+    where the first match of a season is compared to the `default_elo` every
+    season starts from. The net points won since any moment are then the
+    difference of two running totals, found with a binary search on the
+    timestamps. The highest and lowest scores are updated as entries are
+    added, so none of the queries need to look at every entry.
+    """
+
+    def __init__(self, default_elo=1000):
+        self.default_elo = default_elo
+        self.timestamps = array('l')
+        self.scores = array('l')
+        self.seasons = array('l')
+        self.net_totals = array('l')
+        # the index of the first entry of each season
+        self.season_starts = {}
+
+        # the date of the newest entry, as returned by the API, so only
+        # newer entries need to be fetched
+        self.last_date = None
+        self.highest = None
+        self.lowest = None
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def extend(self, entries):
+        """Add entries from the API which are newer than the last entry,
+        returning the number added."""
+        entries = sorted(entries, key=lambda entry: entry['date'])
+        added = 0
+        with self.lock:
+            for entry in entries:
+                if self.last_date is not None and entry['date'] <= self.last_date:
+                    continue
+                self._append(entry)
+                added += 1
+        return added
+
+    def net_since(self, timestamp, season=None):
+        """Return the net points won or lost by matches played since the
+        timestamp. If a season is passed, only its matches are counted."""
+        with self.lock:
+            start = bisect_left(self.timestamps, timestamp)
+            if season is not None:
+                start = max(start, self.season_starts.get(season, len(self.scores)))
+            if start >= len(self.net_totals):
+                return 0
+
+            previous_total = self.net_totals[start - 1] if start else 0
+            return self.net_totals[-1] - previous_total
+
+    @property
+    def current_season(self):
+        return self.seasons[-1] if self.seasons else None
+
+    def _append(self, entry):
+        score = int(entry['elo_score'])
+        season = int(entry['season'])
+
+        if self.seasons and self.seasons[-1] == season:
+            net = score - self.scores[-1]
+        else:
+            net = score - self.default_elo
+            self.season_starts[season] = len(self.scores)
+        previous_total = self.net_totals[-1] if self.net_totals else 0
+
+        self.timestamps.append(datetime_to_timestamp(entry['date']))
+        self.scores.append(score)
+        self.seasons.append(season)
+        self.net_totals.append(previous_total + net)
+        self.last_date = entry['date']
+
+        if self.highest is None or score > self.highest[0]:
+            self.highest = (score, entry['date'])
+        if self.lowest is None or score < self.lowest[0]:
+            self.lowest = (score, entry['date'])
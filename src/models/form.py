@@ -0,0 +1,119 @@
+"""Index of the recent results and winning streaks of each player."""
+
+from collections import deque
+from threading import Lock
+
+
+class PlayerForm(object):
+    """The recent results and winning streaks of a single player."""
+
+    __slots__ = (
+        'results', 'current_streak', 'longest_streak', 'season_current_streak',
+        'season_streak', 'last_played',
+    )
+
+    def __init__(self, size):
+        # `W` or `L` for each recent match, newest first
+        self.results = deque(maxlen=size)
+        self.current_streak = 0
+        self.longest_streak = 0
+        # the current streak counting only matches played this season
+        self.season_current_streak = 0
+        self.season_streak = 0
+        # the date of the player's most recent match
+        self.last_played = None
+
+
+class FormIndex(object):
+    """
+    Keeps a ring buffer of the last `size` results of each player, along with
+    their current, longest ever and longest this season winning streaks.
+
+    The index is built from the full match history once, then each recorded
+    match is applied in constant time, so form and spree queries never need
+    to look at the history again.
+    """
+
+    def __init__(self, size=100):
+        self.size = size
+        self.players = {}
+        self.season_start = None
+        self.ready = False
+        self.lock = Lock()
+
+    def rebuild(self, matches, season_start=None):
+        """Replace the index with one built from the matches, which must be
+        ordered oldest first. Streaks of matches played on or after the
+        `season_start` date count towards the season streak."""
+        with self.lock:
+            self.players = {}
+            self.season_start = season_start
+            for match in matches:
+                self._apply(match)
+            self.ready = True
+
+    def record(self, match):
+        """Add a match played after every match already in the index."""
+        with self.lock:
+            self._apply(match)
+
+    def form(self, player, limit=None):
+        """Return up to `limit` of the player's recent results, newest first."""
+        with self.lock:
+            try:
+                results = self.players[player].results
+            except KeyError:
+                return []
+            return list(results)[:limit]
+
+    def streaks(self, player):
+        """Return the current, longest ever and longest this season winning
+        streaks of the player."""
+        with self.lock:
+            try:
+                form = self.players[player]
+            except KeyError:
+                return 0, 0, 0
+            return form.current_streak, form.longest_streak, form.season_streak
+
+    def last_played(self, player):
+        """Return the date of the player's most recent match, or None."""
+        with self.lock:
+            try:
+                return self.players[player].last_played
+            except KeyError:
+                return None
+
+    def _get_player(self, player):
+        try:
+            return self.players[player]
+        except KeyError:
+            form = self.players[player] = PlayerForm(self.size)
+            return form
+
+    def _apply(self, match):
+        # a match recorded just now may not have a date, but is in season
+        date = match.get('date')
+        in_season = (
+            self.season_start is None or
+            date is None or
+            date[:len(self.season_start)] >= self.season_start
+        )
+
+        winner = self._get_player(match['winner'])
+        winner.results.appendleft('W')
+        winner.current_streak += 1
+        winner.longest_streak = max(winner.longest_streak, winner.current_streak)
+        if in_season:
+            winner.season_current_streak += 1
+            winner.season_streak = max(
+                winner.season_streak, winner.season_current_streak
+            )
+
+        loser = self._get_player(match['loser'])
+        loser.results.appendleft('L')
+        loser.current_streak = 0
+        loser.season_current_streak = 0
+
+        if date is not None:
+            winner.last_played = loser.last_played = date
@@ -0,0 +1,121 @@
+"""Index of the results between each pair of players."""
+
+from collections import deque
+from threading import Lock
+
+
+class HeadToHeadIndex(object):
+    """
+    A sparse matrix of the wins and losses between each pair of players who
+    have played each other, plus a list of each pair's most recent matches.
+
+    Like the FormIndex, it is built from the full match history once and
+    then updated as each match is recorded. This makes head-to-head lookups
+    constant time. Nemesis and victim queries only look at the opponents a
+    player has actually played.
+    """
+
+    def __init__(self, size=50):
+        self.size = size
+        # {player: {opponent: [wins, losses]}}
+        self.records = {}
+        # {(player, opponent): deque of matches}, keyed in sorted order
+        self.recent_matches = {}
+        self.ready = False
+        self.lock = Lock()
+
+    def rebuild(self, matches):
+        """Replace the index with one built from the matches, which must be
+        ordered oldest first."""
+        with self.lock:
+            self.records = {}
+            self.recent_matches = {}
+            for match in matches:
+                self._apply(match)
+            self.ready = True
+
+    def record(self, match):
+        """Add a match played after every match already in the index."""
+        with self.lock:
+            self._apply(match)
+
+    def head_to_head(self, player, opponent):
+        """Return the wins and losses of a player against an opponent."""
+        with self.lock:
+            try:
+                return tuple(self.records[player][opponent])
+            except KeyError:
+                return 0, 0
+
+    def recent(self, player, opponent, limit=None):
+        """Return up to `limit` recent matches between the players, newest
+        first."""
+        with self.lock:
+            matches = self.recent_matches.get(self._pair(player, opponent), ())
+            return list(matches)[:limit]
+
+    def last_played(self, player, opponent):
+        """Return the date the players last played each other, or None if
+        they never have."""
+        with self.lock:
+            matches = self.recent_matches.get(self._pair(player, opponent))
+            return matches[0].get('date') if matches else None
+
+    def opponents(self, player, minimum_games=1):
+        """Return (opponent, wins, losses) tuples for every opponent a player
+        has played at least `minimum_games` times."""
+        with self.lock:
+            return [
+                (opponent, wins, losses) for opponent, (wins, losses) in
+                self.records.get(player, {}).iteritems() if
+                wins + losses >= minimum_games
+            ]
+
+    def nemesis(self, player, minimum_games=1):
+        """Return the (opponent, wins, losses) the player has the worst win
+        ratio against, preferring the opponent they have lost to most. Only
+        opponents who have beaten the player are considered."""
+        opponents = [
+            record for record in self.opponents(player, minimum_games) if
+            record[2]
+        ]
+        if not opponents:
+            return None
+        return min(
+            opponents,
+            key=lambda (opponent, wins, losses): (
+                float(wins) / (wins + losses), -losses
+            )
+        )
+
+    def victim(self, player, minimum_games=1):
+        """Return the (opponent, wins, losses) the player has the best win
+        ratio against, preferring the opponent they have beaten most. Only
+        opponents the player has beaten are considered."""
+        opponents = [
+            record for record in self.opponents(player, minimum_games) if
+            record[1]
+        ]
+        if not opponents:
+            return None
+        return max(
+            opponents,
+            key=lambda (opponent, wins, losses): (
+                float(wins) / (wins + losses), wins
+            )
+        )
+
+    def _pair(self, player, opponent):
+        return (player, opponent) if player < opponent else (opponent, player)
+
+    def _apply(self, match):
+        winner, loser = match['winner'], match['loser']
+        self.records.setdefault(winner, {}).setdefault(loser, [0, 0])[0] += 1
+        self.records.setdefault(loser, {}).setdefault(winner, [0, 0])[1] += 1
+
+        pair = self._pair(winner, loser)
+        try:
+            matches = self.recent_matches[pair]
+        except KeyError:
+            matches = self.recent_matches[pair] = deque(maxlen=self.size)
+        matches.appendleft(match)
@@ -0,0 +1,121 @@
+"""Index of players ordered by elo, used to answer leaderboard queries."""
+
+from bisect import bisect_left, insort
+from threading import Lock
+
+
+class RankIndex(object):
+    """
+    Keeps the players included in a leaderboard in a sorted list, ordered by
+    elo (highest first) and then slack ID to break ties.
+
+    Positions are found with a binary search, so position, top N and
+    "players around me" queries take logarithmic time (plus the number of
+    players returned) rather than sorting every player on each query. The
+    index is updated in place whenever a player profile changes.
+    """
+
+    def __init__(self, elo_field, match_count_field):
+        self.elo_field = elo_field
+        self.match_count_field = match_count_field
+        self.keys = []
+        self.player_keys = {}
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rebuild(self, users):
+        """Replace the contents of the index with the users provided."""
+        player_keys = {}
+        for user in users:
+            key = self._get_key(user)
+            if key is not None:
+                player_keys[user.slack_id] = key
+
+        with self.lock:
+            self.player_keys = player_keys
+            self.keys = sorted(player_keys.itervalues())
+
+    def update(self, user):
+        """Move a user to their current position, adding or removing them if
+        they have joined or left the leaderboard."""
+        key = self._get_key(user)
+        with self.lock:
+            previous_key = self.player_keys.get(user.slack_id)
+            if key == previous_key:
+                return
+
+            if previous_key is not None:
+                del self.keys[bisect_left(self.keys, previous_key)]
+                del self.player_keys[user.slack_id]
+            if key is not None:
+                insort(self.keys, key)
+                self.player_keys[user.slack_id] = key
+
+    def remove(self, slack_id):
+        with self.lock:
+            key = self.player_keys.pop(slack_id, None)
+            if key is not None:
+                del self.keys[bisect_left(self.keys, key)]
+
+    def position(self, slack_id):
+        """Return the 1 based leaderboard position of a player, or None if
+        they are not included in the leaderboard."""
+        with self.lock:
+            try:
+                key = self.player_keys[slack_id]
+            except KeyError:
+                return None
+            return bisect_left(self.keys, key) + 1
+
+    def top(self, limit=None):
+        """Return the slack IDs of the players at the top of the leaderboard."""
+        with self.lock:
+            keys = self.keys if limit is None else self.keys[:limit]
+            return [slack_id for elo, slack_id in keys]
+
+    def around(self, slack_id, distance=2):
+        """Return (position, slack ID) tuples for the players up to `distance`
+        places above and below a player."""
+        with self.lock:
+            try:
+                index = bisect_left(self.keys, self.player_keys[slack_id])
+            except KeyError:
+                return []
+
+            start = max(index - distance, 0)
+            return [
+                (start + offset + 1, player_id) for
+                offset, (elo, player_id) in
+                enumerate(self.keys[start:index + distance + 1])
+            ]
+
+    def nearest(self, elo, limit, exclude=()):
+        """Return (slack ID, elo) tuples for up to `limit` players with the
+        closest elo to `elo`, closest first. Starting from the position the elo would
+        have, the closer neighbour on either side is taken each time."""
+        with self.lock:
+            after = bisect_left(self.keys, (-elo, ''))
+            before = after - 1
+            players = []
+            while len(players) < limit and (before >= 0 or after < len(self.keys)):
+                if after >= len(self.keys) or (
+                    before >= 0 and
+                    abs(self.keys[before][0] + elo) <= abs(self.keys[after][0] + elo)
+                ):
+                    key = self.keys[before]
+                    before -= 1
+                else:
+                    key = self.keys[after]
+                    after += 1
+                if key[1] not in exclude:
+                    players.append((key[1], -key[0]))
+            return players
+
+    def _get_key(self, user):
+        """Return the sort key of a user, or None if they should not appear
+        in the leaderboard because they are inactive or yet to play."""
+        if not (user.active and getattr(user, self.match_count_field)):
+            return None
+        return (-getattr(user, self.elo_field), user.slack_id)
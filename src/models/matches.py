@@ -0,0 +1,162 @@
+"""Local copy of every match recorded on the poolbot server."""
+
+import sqlite3
+from threading import Lock
+
+
+class MatchStore(object):
+    """
+    Stores matches in an embedded SQLite database, so history queries can be
+    answered without a request to the poolbot server.
+
+    Matches are stored in the same format as the `api/match/` endpoint
+    returns them. A match is identified by its date, winner and loser, so a
+    match pushed here as it is recorded is not duplicated when it is later
+    fetched by a sync. The date of the newest match fetched is kept as a
+    cursor, so each sync only asks the server for matches since then.
+
+    A single connection is shared by every thread, guarded by a lock.
+    """
+
+    schema = (
+        'CREATE TABLE IF NOT EXISTS match ('
+        '  date TEXT NOT NULL,'
+        '  winner TEXT NOT NULL,'
+        '  loser TEXT NOT NULL,'
+        '  channel TEXT,'
+        '  granny INTEGER NOT NULL DEFAULT 0,'
+        '  UNIQUE (date, winner, loser)'
+        ')',
+        'CREATE INDEX IF NOT EXISTS match_winner ON match (winner, date)',
+        'CREATE INDEX IF NOT EXISTS match_loser ON match (loser, date)',
+        # grannies by the month and day they were given, for anniversaries
+        'CREATE INDEX IF NOT EXISTS match_granny_day ON match '
+        '(substr(date, 6, 5)) WHERE granny',
+        'CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)',
+    )
+    columns = ('date', 'winner', 'loser', 'channel', 'granny')
+
+    def __init__(self, path=':memory:'):
+        self.path = path or ':memory:'
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = Lock()
+        with self.lock, self.connection:
+            for statement in self.schema:
+                self.connection.execute(statement)
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM match').fetchone()[0]
+
+    @property
+    def backfilled(self):
+        """Whether every match recorded before the first sync is stored."""
+        return self.get_state('backfilled') == '1'
+
+    @property
+    def cursor(self):
+        """The date of the newest match fetched from the server."""
+        return self.get_state('cursor')
+
+    def get_state(self, key):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT value FROM sync_state WHERE key = ?', (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, match):
+        """Store a single match, returning whether it was new."""
+        return self.add_many([match]) == 1
+
+    def add_many(self, matches, cursor=None, backfilled=None):
+        """Store the matches, ignoring any already stored, and return the
+        number added. The sync cursor and backfilled flag are updated in
+        the same transaction, so they never get ahead of the matches."""
+        rows = [
+            (
+                match['date'],
+                match['winner'],
+                match['loser'],
+                match.get('channel'),
+                bool(match.get('granny')),
+            ) for match in matches
+        ]
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO match ({}) VALUES (?, ?, ?, ?, ?)'.format(
+                    ', '.join(self.columns)
+                ),
+                rows
+            )
+            added = self.connection.total_changes - before
+
+            if cursor is not None:
+                self._set_state('cursor', cursor)
+            if backfilled is not None:
+                self._set_state('backfilled', '1' if backfilled else '0')
+        return added
+
+    def player_matches(self, player, limit=None, since=None):
+        """Return the matches a player has played, newest first."""
+        return self._query(
+            'WHERE (winner = :player OR loser = :player) AND date >= :since',
+            {'player': player, 'since': since or ''},
+            limit
+        )
+
+    def head_to_head(self, player1, player2, limit=None):
+        """Return the matches between two players, newest first."""
+        return self._query(
+            'WHERE (winner = :player1 AND loser = :player2) OR '
+            '(winner = :player2 AND loser = :player1)',
+            {'player1': player1, 'player2': player2},
+            limit
+        )
+
+    def grannies(self, player):
+        """Return the grannies a player has given or taken, newest first."""
+        return self._query(
+            'WHERE granny AND (winner = :player OR loser = :player)',
+            {'player': player}
+        )
+
+    def grannies_on(self, month, day):
+        """Return the grannies given on the month and day of any year,
+        newest first."""
+        return self._query(
+            'WHERE granny AND substr(date, 6, 5) = :day',
+            {'day': '{:02d}-{:02d}'.format(month, day)}
+        )
+
+    def all_matches(self):
+        """Return every match, oldest first."""
+        return self._query('', {}, ascending=True)
+
+    def between(self, start, end):
+        """Return the matches on or after `start` and before `end`."""
+        return self._query(
+            'WHERE date >= :start AND date < :end',
+            {'start': start, 'end': end}
+        )
+
+    def _query(self, where, params, limit=None, ascending=False):
+        sql = 'SELECT {} FROM match {} ORDER BY date {}'.format(
+            ', '.join(self.columns), where, 'ASC' if ascending else 'DESC'
+        )
+        if limit is not None:
+            sql += ' LIMIT {:d}'.format(limit)
+
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [
+            dict(zip(self.columns, row[:-1]), granny=bool(row[-1])) for
+            row in rows
+        ]
+
+    def _set_state(self, key, value):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+            (key, value)
+        )
@@ -0,0 +1,164 @@
+"""Matrix of the probability of each player beating every other player."""
+
+from operator import itemgetter
+from threading import Lock
+
+
+class OddsMatrix(object):
+    """
+    Stores the chance of each ranked player beating every other ranked
+    player, so odds queries are a lookup rather than a calculation. Like the
+    leaderboards, only active players who have played a match are included,
+    so players joining the team never grow the matrix.
+
+    Probabilities start from the expected score given by the season elo of
+    both players, which is then blended with their head-to-head record. The
+    elo estimate counts as `prior_games` imaginary games, so a pair who have
+    played a handful of times stay close to it while a long rivalry moves the
+    odds towards their actual results:
+
+        (prior_games * elo_odds + wins) / (prior_games + games played)
+
+    The whole matrix is calculated at once when the users are loaded. After
+    that, an elo change only recalculates the row and column of that player,
+    and a recorded match only recalculates the two cells of that pair.
+    Head-to-head records are read from a HeadToHeadIndex.
+    """
+
+    def __init__(self, engine, head_to_head, prior_games=10, elo_field='season_elo',
+                 match_count_field='season_match_count'):
+        self.engine = engine
+        self.head_to_head = head_to_head
+        self.prior_games = prior_games
+        self.elo_field = elo_field
+        self.match_count_field = match_count_field
+
+        # slack IDs in matrix order, and the index of each in that order
+        self.players = []
+        self.indexes = {}
+        self.elos = []
+
+        # elo based and head-to-head adjusted probabilities, where
+        # `matrix[i][j]` is the chance of player i beating player j
+        self.elo_matrix = []
+        self.matrix = []
+
+        self.lock = Lock()
+
+    def __contains__(self, slack_id):
+        return slack_id in self.indexes
+
+    def __len__(self):
+        return len(self.players)
+
+    def rebuild(self, users):
+        """Recalculate the whole matrix for the users provided."""
+        players = [user for user in users if self._includes(user)]
+        with self.lock:
+            self._rebuild(
+                [user.slack_id for user in players],
+                [getattr(user, self.elo_field) for user in players]
+            )
+
+    def update(self, user):
+        """Recalculate the odds of a user after their elo has changed, adding
+        or removing them from the matrix if necessary."""
+        included = self._includes(user)
+        with self.lock:
+            index = self.indexes.get(user.slack_id)
+            if index is None and not included:
+                return
+
+            if index is None or not included:
+                # the size of the matrix has changed, so start again
+                players = [
+                    player for player in self.players if
+                    player != user.slack_id
+                ]
+                elos = [self.elos[self.indexes[player]] for player in players]
+                if included:
+                    players.append(user.slack_id)
+                    elos.append(getattr(user, self.elo_field))
+                self._rebuild(players, elos)
+                return
+
+            elo = getattr(user, self.elo_field)
+            if elo == self.elos[index]:
+                return
+            self.elos[index] = elo
+
+            for opponent_index, opponent_elo in enumerate(self.elos):
+                if opponent_index == index:
+                    continue
+                expected = self.engine.expected_score(elo, opponent_elo)
+                self.elo_matrix[index][opponent_index] = expected
+                self.elo_matrix[opponent_index][index] = 1 - expected
+                self._adjust(index, opponent_index)
+
+    def refresh_pair(self, player, opponent):
+        """Recalculate the odds of a pair after their head-to-head record
+        has changed."""
+        with self.lock:
+            try:
+                self._adjust(self.indexes[player], self.indexes[opponent])
+            except KeyError:
+                pass
+
+    def probability(self, player, opponent, adjusted=True):
+        """Return the chance of a player beating an opponent, or None if
+        either is not in the matrix. Pass `adjusted=False` for the odds
+        based on elo alone."""
+        matrix = self.matrix if adjusted else self.elo_matrix
+        with self.lock:
+            try:
+                return matrix[self.indexes[player]][self.indexes[opponent]]
+            except KeyError:
+                return None
+
+    def field(self, player, opponents=None):
+        """Return (opponent, probability) tuples for a player against every
+        other player (or those in `opponents`), most likely win first."""
+        with self.lock:
+            try:
+                row = self.matrix[self.indexes[player]]
+            except KeyError:
+                return []
+
+            odds = [
+                (opponent, row[index]) for opponent, index in
+                self.indexes.iteritems() if
+                opponent != player and (opponents is None or opponent in opponents)
+            ]
+        return sorted(odds, key=itemgetter(1), reverse=True)
+
+    def _includes(self, user):
+        """Return whether a user belongs in the matrix, using the same rule
+        as the leaderboards."""
+        return bool(user.active and getattr(user, self.match_count_field))
+
+    def _rebuild(self, players, elos):
+        self.players = players
+        self.indexes = dict((player, index) for index, player in enumerate(players))
+        self.elos = elos
+        self.elo_matrix = self.engine.expected_score_matrix(elos)
+        self.matrix = [list(row) for row in self.elo_matrix]
+
+        # only pairs who have played each other need adjusting
+        for index, player in enumerate(players):
+            for opponent, wins, losses in self.head_to_head.opponents(player):
+                opponent_index = self.indexes.get(opponent)
+                if opponent_index is not None and index < opponent_index:
+                    self._adjust(index, opponent_index)
+
+    def _adjust(self, index, opponent_index):
+        """Blend the elo odds of a pair with their head-to-head record."""
+        wins, losses = self.head_to_head.head_to_head(
+            self.players[index], self.players[opponent_index]
+        )
+
+        probability = (
+            (self.prior_games * self.elo_matrix[index][opponent_index] + wins) /
+            float(self.prior_games + wins + losses)
+        )
+        self.matrix[index][opponent_index] = probability
+        self.matrix[opponent_index][index] = 1 - probability
@@ -0,0 +1,90 @@
+"""Catalog of seasons and their final leaderboards."""
+
+from threading import Lock
+
+
+class SeasonCatalog(object):
+    """
+    Every season on the poolbot server, indexed by name, along with the
+    leaderboard of each season which has been asked for.
+
+    Names are looked up case insensitively. The leaderboard of a finished
+    season can never change, so once fetched it is kept for as long as
+    poolbot runs. The active season's leaderboard is kept until a match is
+    recorded, or the season ends.
+    """
+
+    def __init__(self):
+        # oldest first, as returned by the api/season/ endpoint
+        self.seasons = []
+        self.names = {}
+        # {season pk: season-player rows, ordered by elo}
+        self.leaderboards = {}
+        # incremented each time the active season's leaderboard changes
+        self.generation = 0
+        self.ready = False
+        self.lock = Lock()
+
+    def load(self, seasons):
+        """Replace the catalog with the seasons, which must be ordered by
+        their start date. Leaderboards of seasons which were already
+        finished are kept."""
+        with self.lock:
+            finished = set(
+                season['pk'] for season in self.seasons if not season['active']
+            )
+            self.seasons = list(seasons)
+            self.names = dict(
+                (self._key(season['name']), season) for season in self.seasons
+            )
+            self.leaderboards = dict(
+                (season['pk'], self.leaderboards[season['pk']]) for
+                season in self.seasons if
+                not season['active'] and
+                season['pk'] in finished and
+                season['pk'] in self.leaderboards
+            )
+            self.ready = True
+
+    def get(self, name):
+        """Return the season with the name, ignoring case, or None."""
+        with self.lock:
+            return self.names.get(self._key(name))
+
+    def newest_first(self):
+        with self.lock:
+            return list(reversed(self.seasons))
+
+    @property
+    def active(self):
+        """The season currently being played, if any."""
+        with self.lock:
+            for season in reversed(self.seasons):
+                if season['active']:
+                    return season
+
+    def leaderboard(self, season):
+        """Return the cached leaderboard of a season, or None."""
+        with self.lock:
+            return self.leaderboards.get(season['pk'])
+
+    def set_leaderboard(self, season, rows, generation=None):
+        """Cache the leaderboard of a season. Pass the `generation` read
+        before fetching it, so a leaderboard of the active season fetched
+        before a match was recorded is not cached."""
+        with self.lock:
+            if season['active'] and generation not in (None, self.generation):
+                return
+            self.leaderboards[season['pk']] = rows
+
+    def invalidate_active(self):
+        """Forget the leaderboard of the active season, after a match has
+        changed it."""
+        with self.lock:
+            self.generation += 1
+            for season in self.seasons:
+                if season['active']:
+                    self.leaderboards.pop(season['pk'], None)
+
+    def _key(self, name):
+        return ' '.join(name.lower().split())
@@ -0,0 +1,80 @@
+"""Suggests opponents for a player from the in memory indexes."""
+
+from time import time
+
+from utils import datetime_to_timestamp
+
+
+DAY = 24 * 60 * 60.0
+
+
+class OpponentSuggester(object):
+    """
+    Ranks the players closest in elo to a player as opponents for them.
+
+    The `candidates` nearest players by elo are found with a binary search
+    of the season leaderboard, and each is scored out of one for:
+
+    * closeness - how near the odds of the match are to even
+    * activity - how recently they last played anyone
+    * freshness - whether the pair have never played, or not for a while
+
+    Everything is read from the indexes poolbot keeps in memory, so the
+    cost of a suggestion depends on the number of candidates rather than
+    the number of players, and the server is never asked.
+    """
+
+    weights = {
+        'closeness': 0.5,
+        'activity': 0.3,
+        'freshness': 0.2,
+    }
+    # days after which a player counts as half as active
+    activity_half_life = 7
+    # days after which a pairing is as fresh as one never played
+    stale_pairing_days = 30
+
+    def __init__(self, leaderboard, odds, engine, form, head_to_head, candidates=20):
+        self.leaderboard = leaderboard
+        self.odds = odds
+        self.engine = engine
+        self.form = form
+        self.head_to_head = head_to_head
+        self.candidates = candidates
+
+    def suggest(self, player, elo, limit=3, now=None):
+        """Return up to `limit` (opponent, score, probability, last played)
+        tuples for the player, best first. The probability is the player's
+        chance of winning, and last played is the date the pair last played
+        each other, or None."""
+        now = time() if now is None else now
+        suggestions = []
+        nearest = self.leaderboard.nearest(elo, self.candidates, exclude=(player,))
+        for opponent, opponent_elo in nearest:
+            probability = self.odds.probability(player, opponent)
+            if probability is None:
+                probability = self.engine.expected_score(elo, opponent_elo)
+            last_played = self.head_to_head.last_played(player, opponent)
+
+            score = (
+                self.weights['closeness'] * (1 - 2 * abs(probability - 0.5)) +
+                self.weights['activity'] * self._activity(opponent, now) +
+                self.weights['freshness'] * self._freshness(last_played, now)
+            )
+            suggestions.append((opponent, score, probability, last_played))
+
+        suggestions.sort(key=lambda suggestion: suggestion[1], reverse=True)
+        return suggestions[:limit]
+
+    def _activity(self, player, now):
+        last_played = self.form.last_played(player)
+        if last_played is None:
+            return 0.0
+        days = max(now - datetime_to_timestamp(last_played), 0) / DAY
+        return 1.0 / (1 + days / self.activity_half_life)
+
+    def _freshness(self, last_played, now):
+        if last_played is None:
+            return 1.0
+        days = max(now - datetime_to_timestamp(last_played), 0) / DAY
+        return min(days / self.stale_pairing_days, 1.0)
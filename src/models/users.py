@@ -45,6 +45,24 @@ class User(object):
                     '{} must be passed as a kwarg to __init_().'.format(required_attr)
                 )
 
+    @classmethod
+    def from_slack(cls, member, player_profile):
+        """Create a user from a slack `users.list` member and their poolbot
+        player profile."""
+        user_profile = cls.slack_fields(member)
+        user_profile.update(player_profile)
+        return cls(**user_profile)
+
+    @staticmethod
+    def slack_fields(member):
+        """Return the only fields we store from a slack user object."""
+        return {
+            'real_name': member.get('profile', {}).get(
+                'real_name', member.get('real_name')
+            ),
+            'is_bot': member.get('is_bot', False),
+        }
+
     def __str__(self):
         return self.username
 
@@ -56,6 +74,13 @@ class User(object):
         for attr, value in data.iteritems():
             setattr(self, attr, value)
 
+    def to_dict(self):
+        """Return the slack user and player profile attributes."""
+        return {
+            attr: getattr(self, attr) for
+            attr in self.USER_ATTRS + self.PLAYER_ATTRS
+        }
+
     @property
     def included_in_leaderboard(self, season=True):
         """Determine if the user should be included in the leaderboard."""
@@ -0,0 +1,105 @@
+"""Queue of outbound slack messages, sent at a rate slack will accept."""
+
+import logging
+import threading
+from collections import deque
+from time import time
+
+
+class Outbox(object):
+    """
+    Sends queued messages from a single background thread, at most one
+    message per channel every `interval` seconds.
+
+    Slack rejects messages sent faster than roughly one per second, so during
+    busy periods replies wait in a per-channel queue instead. All the replies
+    passed to put() together (a handler reply and its callback replies) are
+    joined into as few messages as slack allows.
+    """
+
+    separator = '\n'
+    max_message_length = 4000
+
+    def __init__(self, send, interval=1.0, metrics=None):
+        self.send = send
+        self.interval = interval
+        self.metrics = metrics
+
+        self.channel_queues = {}
+        self.next_send_times = {}
+        self.condition = threading.Condition()
+
+        self.thread = threading.Thread(target=self._run, name='poolbot-outbox')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def put(self, channel_id, replies):
+        """Queue the replies to be sent to the channel, coalesced into a
+        single message where they fit."""
+        messages = self.coalesce(replies)
+        with self.condition:
+            queue = self.channel_queues.setdefault(channel_id, deque())
+            for text in messages:
+                queue.append((text, time()))
+            self._record_depth()
+            self.condition.notify()
+
+    def coalesce(self, replies):
+        """Join the replies into messages no longer than slack accepts."""
+        messages = []
+        for reply in replies:
+            if (
+                messages and
+                len(messages[-1]) + len(self.separator) + len(reply) <= self.max_message_length
+            ):
+                messages[-1] = self.separator.join((messages[-1], reply))
+            else:
+                messages.append(reply)
+        return messages
+
+    def depth(self):
+        """Return the number of messages waiting to be sent."""
+        with self.condition:
+            return sum(len(queue) for queue in self.channel_queues.itervalues())
+
+    def _run(self):
+        while True:
+            with self.condition:
+                channel_id, wait = self._next_channel()
+                while channel_id is None:
+                    self.condition.wait(wait)
+                    channel_id, wait = self._next_channel()
+
+                text, queued_at = self.channel_queues[channel_id].popleft()
+                if not self.channel_queues[channel_id]:
+                    del self.channel_queues[channel_id]
+                self.next_send_times[channel_id] = time() + self.interval
+                self._record_depth()
+
+            try:
+                self.send(channel_id, text)
+            except Exception:
+                logging.exception('Unable to send message to %s', channel_id)
+            else:
+                if self.metrics is not None:
+                    self.metrics.timing('outbox.send_latency', time() - queued_at)
+
+    def _next_channel(self):
+        """Return a channel with a message which can be sent now, or if there
+        is none, how long to wait before one can be (None for indefinitely)."""
+        now = time()
+        wait = None
+        for channel_id in self.channel_queues:
+            next_send_time = self.next_send_times.get(channel_id, 0)
+            if next_send_time <= now:
+                return channel_id, None
+            if wait is None or next_send_time - now < wait:
+                wait = next_send_time - now
+        return None, wait
+
+    def _record_depth(self):
+        if self.metrics is not None:
+            self.metrics.gauge(
+                'outbox.depth',
+                sum(len(queue) for queue in self.channel_queues.itervalues())
+            )
@@ -0,0 +1,62 @@
+"""Tokenizer which parses the text of a poolbot command once per message."""
+
+import re
+
+
+MENTION_REGEX = re.compile(r'<@([a-zA-Z0-9]+)>')
+INTEGER_REGEX = re.compile(r'^-?\d+$')
+
+
+class ParsedCommand(object):
+    """The tokens of a command message, shared by every handler processing
+    the message so the text is only split and searched once."""
+
+    def __init__(self, text, term, tokens, mentions, args, int_args):
+        # the message text with the leading poolbot mention removed
+        self.text = text
+        # the first word of the command, for example `record`
+        self.term = term
+        # every word after the command term, including user mentions
+        self.tokens = tokens
+        # IDs of all users mentioned in the message, excluding poolbot
+        self.mentions = mentions
+        # the words after the command term which are not user mentions,
+        # and the subset of those which are integers
+        self.args = args
+        self.int_args = int_args
+
+    def __repr__(self):
+        return '<ParsedCommand {}>'.format(self.text)
+
+
+class CommandTokenizer(object):
+    """Builds ParsedCommand instances using regexes compiled once for the
+    bot, rather than for every message."""
+
+    def __init__(self, bot_id):
+        self.bot_id = bot_id
+        self.bot_mention_regex = re.compile(
+            r'^\s*<@{bot_id}>[:\s]*'.format(bot_id=re.escape(bot_id))
+        )
+
+    def parse(self, text):
+        """Split the message text into a ParsedCommand. Only a leading
+        `@poolbot:` mention is removed - any other text is left untouched."""
+        text = self.bot_mention_regex.sub('', text, count=1).strip()
+        words = text.split()
+
+        mentions = [
+            user_id for user_id in MENTION_REGEX.findall(text) if
+            user_id != self.bot_id
+        ]
+        args = [word for word in words[1:] if not MENTION_REGEX.match(word)]
+        int_args = [int(arg) for arg in args if INTEGER_REGEX.match(arg)]
+
+        return ParsedCommand(
+            text=text,
+            term=words[0] if words else None,
+            tokens=words[1:],
+            mentions=mentions,
+            args=args,
+            int_args=int_args,
+        )
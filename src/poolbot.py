@@ -1,31 +1,74 @@
 """Pool focused slack bot which interacts via a RTM websocket."""
 
 import os
-import inspect
 import importlib
 import logging
-from time import sleep
+from argparse import ArgumentParser
+from datetime import date, datetime, timedelta
+from multiprocessing.pool import ThreadPool
+from threading import Lock, Thread
+from time import sleep, time
 from urlparse import urljoin
 
 from requests import Session
+from requests.exceptions import ConnectionError, RequestException, Timeout
 import yaml
 
 from slackclient import SlackClient
 
-from models import User
-from utils import (
-    MissingConfigurationException,
-    flatten_nested_dict,
+from commands import COMMANDS
+from dispatcher import ChannelDispatcher
+from metrics import Metrics
+from models import (
+    ChannelRegistry,
+    FormIndex,
+    HeadToHeadIndex,
+    MatchStore,
+    OddsMatrix,
+    RankIndex,
+    SeasonCatalog,
+    User,
 )
+from outbox import Outbox
+from parsing import CommandTokenizer
+from rating import EloEngine
+from reactions import REACTIONS
+from registry import CommandRegistry, EventRouter, PluginSpec
+from scheduler import Scheduler
+from snapshot import load_snapshot, save_snapshot
+from transport import (
+    DEFAULT_CACHE_TTLS,
+    DEFAULT_TIMEOUT,
+    DEFAULT_TIMEOUTS,
+    CachingAdapter,
+    CircuitBreaker,
+)
+from utils import MissingConfigurationException, iterate_in_background
 
 
 class PoolBot(object):
     """Records pool results and much more using a custom slack bot."""
 
-    PLUGIN_DIRS = ('commands', 'reactions')
+    DEFAULT_IMPORT_BUDGET = 0.5
     REQUIRED_SETTINGS = ('api_token', 'bot_id', 'server_host', 'server_token')
-
-    def __init__(self, config_path='config.yaml'):
+    DEFAULT_WORKER_THREADS = 4
+    DEFAULT_MESSAGE_INTERVAL = 1.0
+    DEFAULT_REQUEST_THREADS = 8
+    IDLE_POLL_INTERVAL = 0.1
+    DEFAULT_SNAPSHOT_PATH = 'poolbot_snapshot.json'
+    USERS_PAGE_SIZE = 200
+    REGISTRATION_BATCH_SIZE = 50
+    DEFAULT_MATCH_STORE_PATH = 'poolbot_matches.db'
+    DEFAULT_MATCH_SYNC_INTERVAL = 60
+    DEFAULT_SNAPSHOT_INTERVAL = 15 * 60
+    DEFAULT_SEASON_REFRESH_INTERVAL = 60 * 60
+    MATCH_BACKFILL_CHUNK_DAYS = 90
+    SERVER_BUSY_MESSAGE = (
+        'Sorry, the poolbot server is busy right now. Please try again in a '
+        'minute.'
+    )
+
+    def __init__(self, config_path='config.yaml', cold_start=False):
         self.config_path = config_path
 
         # load config settings from yaml file
@@ -34,21 +77,98 @@ class PoolBot(object):
         # point the logger to a filepath
         self.setup_logging()
 
+        # record metrics such as latency to help monitor the bot
+        self.metrics = Metrics()
+
+        # periodic jobs registered by poolbot and its plugins are run from
+        # the RTM loop, see listen()
+        self.scheduler = Scheduler(metrics=self.metrics)
+
         # connect to the slack websocket
         self.client = SlackClient(self.api_token)
 
-        # initalize a session with default authorization headers
+        # initalize a session with default authorization headers, and a pool
+        # of threads used to send independent requests concurrently
         self.prepare_requests_session()
+        self.request_pool = ThreadPool(
+            self.config.get('request_threads', self.DEFAULT_REQUEST_THREADS)
+        )
+
+        # players are indexed by their season and total elo points, so their
+        # leaderboard positions can be found without sorting every player
+        self.leaderboards = {
+            'season': RankIndex('season_elo', 'season_match_count'),
+            'total': RankIndex('total_elo', 'total_match_count'),
+        }
+
+        # the points won and lost in a match are calculated locally, using
+        # the same K-factor rules as the poolbot server
+        self.elo_engine = EloEngine(
+            k_factor=self.config.get('elo_k_factor', 32),
+            provisional_k_factor=self.config.get('elo_provisional_k_factor'),
+            provisional_matches=self.config.get('elo_provisional_matches', 0),
+        )
+
+        # every match is replicated into a local database, so match history
+        # can be queried without a request to the server
+        self.matches = MatchStore(
+            self.config.get('match_store_path', self.DEFAULT_MATCH_STORE_PATH)
+        )
+        # held while the users dictionary is changed or copied, as users join
+        # from the RTM loop while background jobs read the cache
+        self.users_lock = Lock()
+        # held while the snapshot is written, so the periodic save and the
+        # save at shutdown never write the file at the same time
+        self.snapshot_lock = Lock()
+
+        # held while a recorded match is added to the store and indexes, and
+        # while the indexes are rebuilt, so no match is counted twice
+        self.match_lock = Lock()
+
+        # recent results, winning streaks and head-to-head records are built
+        # from the match store after it is synced, then updated as each match
+        # is recorded
+        self.form = FormIndex(size=self.config.get('form_buffer_size', 100))
+        self.head_to_head = HeadToHeadIndex(
+            size=self.config.get('head_to_head_buffer_size', 50)
+        )
+
+        # the seasons are refreshed regularly, and the leaderboards of
+        # finished seasons are kept once fetched
+        self.seasons = SeasonCatalog()
+
+        # the elo history of each player, fetched the first time it is
+        # requested and then only topped up with newer entries
+        self.elo_histories = {}
+        self.elo_histories_lock = Lock()
+
+        # the chance of each player beating every other player is kept up to
+        # date alongside the leaderboards, for the odds command and others
+        self.odds = OddsMatrix(
+            self.elo_engine,
+            self.head_to_head,
+            prior_games=self.config.get('odds_prior_games', 10),
+        )
 
-        # save all the channels poolbot is in, and all users into memory
-        self.store_poolbot_channels()
-        self.store_users()
+        # save all the channels poolbot is in, and all users into memory,
+        # restoring them from a snapshot on disk if possible so the bot can
+        # start answering straight away
+        self.snapshot_path = self.config.get(
+            'snapshot_path', self.DEFAULT_SNAPSHOT_PATH
+        )
+        cold_start = cold_start or self.config.get('cold_start', False)
+        if cold_start or not self.warm_start():
+            self.startup()
+        self.rebuild_leaderboards()
 
         # load all command and reaction handlers, and do pre processing work
         self.load_handlers()
+        self.schedule_jobs()
 
         # because we will compare it regularly, cache the bot mention string
+        # and compile the regexes used to tokenize commands
         self.bot_mention = '<@{bot_id}>'.format(bot_id=self.bot_id)
+        self.tokenizer = CommandTokenizer(self.bot_id)
 
     def setup_logging(self):
         """Configure the logger settings."""
@@ -80,28 +200,150 @@ class PoolBot(object):
                 )
 
     def load_handlers(self):
-        """Load and invoke all command and reaction handlers."""
-        self.commands = []
+        """Register all command and reaction handlers. Commands are declared
+        by a PluginSpec and only imported when first used, while reactions
+        are loaded straight away so they can subscribe to events."""
+        # index the commands by term so each message is resolved with a
+        # single lookup, rather than asking every command in turn
+        self.command_registry = CommandRegistry(loader=self.load_plugin)
+        for spec in COMMANDS + self.get_configured_plugins('commands'):
+            self.command_registry.register(spec)
+
+        # commands which schedule jobs need to be loaded before they are used
+        self.command_registry.load_eager()
+
+        # likewise index the reactions by the events they are interested in
         self.reactions = []
+        self.event_router = EventRouter()
+        for spec in REACTIONS + self.get_configured_plugins('reactions'):
+            reaction = self.load_plugin(spec)
+            self.reactions.append(reaction)
+            self.event_router.subscribe(reaction)
+
+    def get_configured_plugins(self, plugin_dir):
+        """Return specs for any extra plugins listed in the config file, for
+        example `commands: [{path: mymodule.MyCommand, term: mine}]`."""
+        return tuple(
+            PluginSpec(
+                plugin['path'],
+                command_term=plugin.get('term'),
+                aliases=plugin.get('aliases', ()),
+                eager=plugin.get('eager', False)
+            ) for plugin in self.config.get(plugin_dir) or ()
+        )
 
-        for plugin_dir in self.PLUGIN_DIRS:
-            plugin_module = importlib.import_module(plugin_dir)
-            for name, obj in inspect.getmembers(plugin_module):
-                if inspect.isclass(obj):
-                    getattr(self, plugin_dir).append(obj(self))
+    def load_plugin(self, spec):
+        """Import the module of a plugin and create its handler, reporting
+        how long the import took."""
+        start = time()
+        module = importlib.import_module(spec.module)
+        duration = time() - start
+
+        self.metrics.timing('plugins.import.{}'.format(spec.module), duration)
+        budget = self.config.get('plugin_import_budget', self.DEFAULT_IMPORT_BUDGET)
+        if duration > budget:
+            logging.warning(
+                'Importing %s took %.2fs, over the budget of %.2fs',
+                spec.module, duration, budget
+            )
+        else:
+            logging.debug('Imported %s in %.3fs', spec.module, duration)
+
+        handler = getattr(module, spec.class_name)(self)
 
         # some commands also equire some setup work before they can be used
-        for command in self.commands:
-            command.setup()
+        setup = getattr(handler, 'setup', None)
+        if setup is not None:
+            setup()
+
+        schedule_jobs = getattr(handler, 'schedule_jobs', None)
+        if schedule_jobs is not None:
+            schedule_jobs(self.scheduler)
+        return handler
+
+    def schedule_jobs(self):
+        """Register the periodic jobs poolbot runs itself. Plugins register
+        their own jobs when they are loaded."""
+        # keep the local match store up to date, starting straight away
+        sync_interval = self.config.get(
+            'match_sync_interval', self.DEFAULT_MATCH_SYNC_INTERVAL
+        )
+        if sync_interval:
+            self.scheduler.every('matches.sync', sync_interval, self.sync_matches, delay=0)
+
+        # pick up new seasons, and seasons which have finished
+        season_interval = self.config.get(
+            'season_refresh_interval', self.DEFAULT_SEASON_REFRESH_INTERVAL
+        )
+        if season_interval:
+            self.scheduler.every('seasons.refresh', season_interval, self.refresh_seasons)
+
+        # save the caches regularly, so a crash does not lose them all
+        snapshot_interval = self.config.get(
+            'snapshot_interval', self.DEFAULT_SNAPSHOT_INTERVAL
+        )
+        if self.snapshot_path and snapshot_interval:
+            self.scheduler.every('snapshot.save', snapshot_interval, self.save_snapshot)
 
     def listen(self):
         """Establish a connection with the Slack RTM websocket and read all
-        omitted messages."""
-        self.client.rtm_connect()
-        while True:
-            for message in self.client.rtm_read():
-                self.read_input(message)
-                sleep(1)
+        omitted messages.
+
+        Between reads, any scheduled jobs which are due are started on their
+        own threads. Messages are handed to a pool of worker threads as soon as they are
+        read, so a slow handler or request to the poolbot server never stops
+        the websocket being consumed. Messages from the same channel are still
+        processed in the order they were sent."""
+        self.dispatcher = ChannelDispatcher(
+            self.read_input,
+            workers=self.config.get('worker_threads', self.DEFAULT_WORKER_THREADS)
+        )
+
+        # replies are queued and sent from a single thread, at a rate slack
+        # will accept for each channel
+        self.outbox = Outbox(
+            self.send_message,
+            interval=self.config.get(
+                'outbound_message_interval',
+                self.DEFAULT_MESSAGE_INTERVAL
+            ),
+            metrics=self.metrics
+        )
+
+        # we keep our own registry of channels, so there is no need for the
+        # client to load the state of every channel in the team
+        self.client.rtm_connect(with_team_state=False)
+        try:
+            while True:
+                messages = self.client.rtm_read()
+                for message in messages:
+                    channel_id = self.get_event_channel(message)
+                    if self.accept_event(message, channel_id):
+                        self.dispatcher.submit(channel_id, message)
+
+                self.scheduler.run_pending()
+
+                # rtm_read() does not block, so avoid spinning on an idle socket
+                if not messages:
+                    sleep(self.IDLE_POLL_INTERVAL)
+        finally:
+            self.save_snapshot()
+
+    def accept_event(self, message, channel_id):
+        """Determine if any handler could be interested in an event. Most
+        RTM traffic is not, so this must be cheap to run."""
+        return bool(
+            self.command_for_poolbot(message) or
+            self.event_router.route(message, channel_id)
+        )
+
+    def get_event_channel(self, message):
+        """Return the channel ID an event relates to, if any. Some events
+        such as `channel_joined` include the full channel object instead."""
+        channel = message.get('channel')
+        if isinstance(channel, dict):
+            return channel.get('id')
+        return channel
 
     def read_input(self, message):
         """Parse each message to determine if poolbot should take an action and
@@ -111,19 +353,18 @@ class PoolBot(object):
         # if the message is a explicit command for poolbot, action it
         if self.command_for_poolbot(message):
             logging.debug("Message identified for %s", message)
-            stripped_text = message['text'].lstrip(self.bot_mention).strip(': ')
+            parsed = self.tokenizer.parse(message['text'])
 
-            for command in self.commands:
-                if command.match_request(stripped_text):
-                    handler = command
-                    message['text'] = stripped_text
-
-                    break
+            handler = self.command_registry.resolve(parsed.term)
+            if handler:
+                message['text'] = parsed.text
+                message['parsed'] = parsed
 
         # if not an explicit command, see if any of the reaction handlers
         # are interested in the message
         else:
-            for reaction in self.reactions:
+            channel_id = self.get_event_channel(message)
+            for reaction in self.event_router.route(message, channel_id):
                 if reaction.match_request(message):
                     handler = reaction
                     break
@@ -132,36 +373,53 @@ class PoolBot(object):
             self.execute_handler(handler, message)
 
     def execute_handler(self, handler, message):
-        """Execute a handler and all its callbacks."""
-        if handler:
-            reply, callbacks = handler.process_request(message)
-        else:
-            reply, callbacks = (None, [])
-
-        if reply:
-            channel = self.get_channel(message['channel'])
-            channel.send_message(reply)
-
-        callback_replies = self.execute_callback_replies(callbacks, message)
+        """Execute a handler and all its callbacks, queueing their replies
+        to be sent to the channel together."""
+        try:
+            replies = self.collect_replies(handler, message)
+        except (ConnectionError, Timeout):
+            # this includes the ServerBusyException raised while the circuit
+            # breaker is open, so the reply is sent without delay
+            logging.warning('The poolbot server is unavailable', exc_info=True)
+            replies = [self.SERVER_BUSY_MESSAGE]
+        if replies:
+            self.outbox.put(message['channel'], replies)
+
+    def collect_replies(self, handler, message):
+        """Return the replies generated by a handler and all its callbacks."""
+        reply, callbacks = handler.process_request(message)
+        replies = [reply] if reply else []
+        replies.extend(self.execute_callback_replies(callbacks, message))
+        return replies
 
     def execute_callback_replies(self, callbacks, message):
         """Match any callback strings with their handlers and execute."""
+        replies = []
         for callback in callbacks:
-            message['text'] = callback
-            for command in self.commands:
-                if command.match_request(callback):
-                    handler = command
-                    self.execute_handler(handler, message)
+            parsed = self.tokenizer.parse(callback)
+            message['text'] = parsed.text
+            message['parsed'] = parsed
+            handler = self.command_registry.resolve(parsed.term)
+            if handler:
+                replies.extend(self.collect_replies(handler, message))
+        return replies
+
+    def send_message(self, channel_id, text):
+        """Post a message to a channel via the RTM websocket."""
+        self.client.rtm_send_message(channel_id, text)
 
     def command_for_poolbot(self, message):
         """Determine if the message contains a command for poolbot."""
+        if message.get('type') != 'message':
+            return False
+
         # if the message has a subtype it will refer to an action
         # outside of a normal message - for example a user leaving
         if 'subtype' in message:
             return False
 
         # check if message comes from a NFC bot
-        if message.get('bot_id') in self.config['nfc_bots']:
+        if message.get('bot_id') in self.config.get('nfc_bots', ()):
             return True
 
         # check poolbot was explicitly mentioned
@@ -171,62 +429,230 @@ class PoolBot(object):
         return True
 
     def get_channel(self, channel_id):
-        """Retrieve the channel instance based on the ID provided."""
-        channels = self.client.server.channels
-        bot_channel_ids = [channel.id for channel in channels]
-        index = bot_channel_ids.index(channel_id)
-        return self.client.server.channels[index]
-
-    def store_poolbot_channels(self):
-        """Store all the channels where poolbot is an existing member."""
-        all_channels = self.client.api_call('channels.list')
-        self.poolbot_channels = {
-            channel['id']: channel for
-            channel in all_channels['channels'] if
-            channel['is_member']
-        }
+        """Retrieve the details of a channel poolbot is a member of."""
+        return self.poolbot_channels.get(channel_id)
+
+    def load_poolbot_channels(self):
+        """Load all the channels where poolbot is an existing member. The
+        registry is kept up to date by the ChannelRegistryReaction."""
+        channels = ChannelRegistry()
+        channels.load(self.client)
+        return channels
+
+    def startup(self):
+        """Load the channels poolbot is in, the player profiles and the slack
+        users from scratch, then cache them in memory."""
+        start = time()
+
+        self.poolbot_channels, self.users = self.fetch_team_state()
+        self.save_snapshot()
+
+        logging.info('Startup completed in %.2fs', time() - start)
+
+    def warm_start(self):
+        """Restore the users and channels from the snapshot on disk, then
+        reconcile them with slack and the poolbot server in the background.
+        Returns False if there is no usable snapshot."""
+        if not self.snapshot_path:
+            return False
 
-    def store_users(self):
-        """Store details of all team members in persistent server side
-        storage, and cache the user objects in memory for later reference."""
-        # get all users currently stored in the datastore
-        player_api_url = self.generate_url('api/player/')
-        response = self.session.get(player_api_url)
-
-        # we want to cache the players profile returned from the API so we
-        # have quick local access to the elo score and total win/loss count
-        player_profiles = {
-            player['slack_id']: player for player in response.json()
-        }
+        snapshot = load_snapshot(self.snapshot_path)
+        if snapshot is None:
+            return False
 
-        self.users = {}
-        all_users = self.client.api_call('users.list')
-        if all_users['ok']:
-            for user in all_users['members']:
-                # annoying slackbot does not have is_bot set as True
-                if user['name'] == 'slackbot' or user.get('is_bot', False):
-                    continue
+        self.users, self.poolbot_channels, age = snapshot
+        self.metrics.gauge('snapshot.age_seconds', int(age))
+        logging.info('Warm started from a snapshot %ds old', age)
 
-                user_id = user['id']
+        thread = Thread(target=self.reconcile, name='poolbot-reconcile')
+        thread.daemon = True
+        thread.start()
+        return True
 
-                # cache all users in memory too with their player profile
-                # posting data to the server if it does not yet exist
+    def reconcile(self):
+        """Fetch the current users and channels, and apply any differences
+        to the caches restored from the snapshot."""
+        start = time()
+        restored = set(self.users)
+        try:
+            channels, users = self.fetch_team_state()
+        except Exception:
+            logging.exception('Unable to reconcile the snapshot')
+            return
+
+        for channel_id in list(self.poolbot_channels):
+            if channel_id not in channels:
+                self.poolbot_channels.remove(channel_id)
+        for channel_id in channels:
+            self.poolbot_channels.add(channels.get(channel_id))
+
+        # the cache is read by other threads, so the reconciled users are
+        # built in a new dictionary which replaces it in one assignment.
+        # Cached users are updated in place, and users who joined while the
+        # team was being fetched are kept
+        with self.users_lock:
+            for user_id, user in users.items():
                 try:
-                    player_profile = player_profiles[user_id]
+                    cached = self.users[user_id]
                 except KeyError:
-                    response = self.session.post(
-                        player_api_url,
-                        data={
-                            'name': user['name'],
-                            'slack_id': user_id,
-                        }
-                    )
-                    player_profile = response.json()
+                    continue
+                cached.update_from_dict(user.to_dict())
+                users[user_id] = cached
+            for user_id, user in self.users.iteritems():
+                if user_id not in restored and user_id not in users:
+                    users[user_id] = user
+            self.users = users
+        self.rebuild_leaderboards()
+
+        self.save_snapshot()
+        self.metrics.gauge('snapshot.age_seconds', 0)
+        logging.info('Reconciled the snapshot in %.2fs', time() - start)
+
+    def save_snapshot(self):
+        """Write the user and channel caches to disk for the next start."""
+        if not self.snapshot_path:
+            return
+
+        with self.snapshot_lock:
+            with self.users_lock:
+                users = list(self.users.values())
+            channels = self.poolbot_channels.all()
+            try:
+                save_snapshot(self.snapshot_path, users, channels)
+            except (IOError, OSError):
+                logging.exception('Unable to save the snapshot')
+
+    def fetch_team_state(self):
+        """Load the channels poolbot is in, the player profiles and the slack
+        users concurrently, as none of them depend on each other. Then build
+        the users, registering any new players with the server.
+
+        Slack users are streamed a page at a time, with at most two pages
+        held in memory, rather than loading the whole team at once."""
+        channels = self.request_pool.apply_async(
+            self.run_startup_phase, ('channels', self.load_poolbot_channels)
+        )
+        player_profiles = self.request_pool.apply_async(
+            self.run_startup_phase, ('players', self.fetch_player_profiles)
+        )
+        slack_members = iterate_in_background(
+            self.iter_slack_members(), buffer_size=self.USERS_PAGE_SIZE * 2
+        )
+
+        # get() re-raises any exception from the phase in this thread
+        users = self.run_startup_phase(
+            'users', self.build_users, slack_members, player_profiles.get()
+        )
+        return channels.get(), users
+
+    def run_startup_phase(self, name, func, *args):
+        """Run one step of the startup, recording how long it took."""
+        start = time()
+        result = func(*args)
+        duration = time() - start
+
+        self.metrics.timing('startup.{}'.format(name), duration)
+        logging.info('Startup phase %s took %.2fs', name, duration)
+        return result
+
+    def fetch_player_profiles(self):
+        """Get all player profiles currently stored in the datastore. We
+        cache these so we have quick local access to the elo score and total
+        win/loss count."""
+        response = self.session.get(self.generate_url('api/player/'))
+        return {player['slack_id']: player for player in response.json()}
+
+    def iter_slack_members(self):
+        """Yield each slack user excluding bots, paging through `users.list`
+        with a cursor."""
+        params = {'limit': self.USERS_PAGE_SIZE}
+        while True:
+            response = self.client.api_call('users.list', **params)
+            if not response['ok']:
+                return
+
+            for user in response['members']:
+                # annoying slackbot does not have is_bot set as True
+                if self.is_player(user):
+                    yield user
 
-                # cache all users in memory too with their player profile
-                user_profile = flatten_nested_dict(user)
-                user_profile.update(player_profile)
-                self.users[user_id] = User(**user_profile)
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                return
+            params['cursor'] = cursor
+
+    def is_player(self, member):
+        """Determine if a slack user could be a player, rather than a bot."""
+        return member['name'] != 'slackbot' and not member.get('is_bot', False)
+
+    def build_users(self, members, player_profiles):
+        """Store details of all team members in persistent server side
+        storage, and return user objects to cache for later reference."""
+        users = {}
+        unregistered_members = []
+        for member in members:
+            try:
+                player_profile = player_profiles[member['id']]
+            except KeyError:
+                # post data to the server for users who do not have a profile
+                # yet, in batches so they are not all held in memory
+                unregistered_members.append(member)
+                if len(unregistered_members) == self.REGISTRATION_BATCH_SIZE:
+                    users.update(self.register_players(unregistered_members))
+                    unregistered_members = []
+            else:
+                users[member['id']] = User.from_slack(member, player_profile)
+
+        if unregistered_members:
+            users.update(self.register_players(unregistered_members))
+        return users
+
+    def register_players(self, members):
+        """Create player profiles for the slack users on the server, sending
+        at most `request_threads` requests at once, and return their users.
+        The server has no bulk create endpoint, so each player is still
+        created by its own request."""
+        profiles = self.request_pool.map(self.register_player, members)
+        return {
+            member['id']: User.from_slack(member, profile) for
+            member, profile in zip(members, profiles)
+        }
+
+    def register_player(self, user):
+        """Create a player profile on the server for a slack user. If the
+        server already has a profile for them, that is returned instead."""
+        response = self.session.post(
+            self.generate_url('api/player/'),
+            data={
+                'name': user['name'],
+                'slack_id': user['id'],
+            }
+        )
+        if response.status_code != 201:
+            response = self.session.get(
+                self.generate_url('api/player/{}/'.format(user['id']))
+            )
+        return response.json()
+
+    def add_slack_user(self, member):
+        """Cache a slack user who has just joined the team, registering them
+        as a player on the server."""
+        user = User.from_slack(member, self.register_player(member))
+        with self.users_lock:
+            self.users[user.slack_id] = user
+        self.index_user(user)
+        return user
+
+    def update_slack_user(self, member):
+        """Update the cached slack details of a user, such as their name."""
+        try:
+            user = self.users[member['id']]
+        except KeyError:
+            return self.add_slack_user(member)
+
+        user.update_from_dict(dict(User.slack_fields(member), name=member['name']))
+        self.index_user(user)
+        return user
 
     def get_username(self, user_id, capitalize=True):
         """Fetch the user name for a slack user given their ID from the in
@@ -242,13 +668,178 @@ class PoolBot(object):
         """Set the cache player profile, capitalizing the name for messages."""
         user = self.users[user_id]
         user.update_from_dict(data)
+        self.index_user(user)
+
+    def index_user(self, user):
+        """Move the user to their current position in each leaderboard, and
+        update their odds against other players."""
+        for leaderboard in self.leaderboards.itervalues():
+            leaderboard.update(user)
+        self.odds.update(user)
+
+    def rebuild_leaderboards(self):
+        """Index all the cached users from scratch."""
+        for leaderboard in self.leaderboards.itervalues():
+            leaderboard.rebuild(self.users.values())
+        self.odds.rebuild(self.users.values())
+
+    def match_recorded(self, match):
+        """Update the local match store and in memory indexes after a match
+        has been recorded. The elo of both players is updated separately,
+        via set_player_profile.
+
+        A sync may already have fetched the match and rebuilt the indexes
+        from the store, in which case the match is not applied again."""
+        self.seasons.invalidate_active()
+        with self.match_lock:
+            # without the date assigned by the server the match can neither
+            # be ordered in the indexes nor matched up with the copy fetched
+            # by the next sync, so it is left for that sync to apply
+            if 'date' not in match or not self.matches.add(match):
+                return
+            self.form.record(match)
+            self.head_to_head.record(match)
+            self.odds.refresh_pair(match['winner'], match['loser'])
+
+    def sync_matches(self):
+        """Fetch the matches recorded since the last sync. The first sync
+        backfills every match ever recorded instead."""
+        start = time()
+        backfill = not self.matches.backfilled
+        if backfill:
+            matches = self.backfill_matches()
+        else:
+            cursor = self.matches.cursor
+            matches = self.fetch_matches({'date__gte': cursor} if cursor else {})
+
+        cursor = max([match['date'] for match in matches] or [self.matches.cursor])
+        added = self.matches.add_many(matches, cursor=cursor, backfilled=True)
+
+        self.metrics.timing(
+            'matches.backfill' if backfill else 'matches.sync', time() - start
+        )
+        self.metrics.gauge('matches.count', len(self.matches))
+        if added:
+            logging.info('Synced %d new matches', added)
+            self.seasons.invalidate_active()
+
+        # matches recorded by poolbot are already in the indexes, so they
+        # only need rebuilding if the sync found others
+        if added or not self.form.ready:
+            self.rebuild_match_indexes()
+
+    def rebuild_match_indexes(self):
+        """Build the form and head-to-head indexes from every match in the
+        store, then recalculate the odds which depend on them. The match
+        lock is held, so a match recorded meanwhile is either in the store
+        when it is read, or applied to the indexes after they are rebuilt.
+
+        The seasons.refresh job keeps the season catalog current, so it is
+        only fetched here if it has never been loaded. Failing to fetch it
+        must not stop the matches already synced reaching the indexes."""
+        if not self.seasons.ready:
+            try:
+                self.refresh_seasons()
+            except RequestException:
+                logging.exception('Unable to fetch the seasons, rebuilding without them')
+        active_season = self.seasons.active
+        season_start = active_season['start_date'][:10] if active_season else None
+
+        with self.match_lock, self.metrics.timer('matches.rebuild_indexes'):
+            matches = self.matches.all_matches()
+            self.form.rebuild(matches, season_start)
+            self.head_to_head.rebuild(matches)
+            self.odds.rebuild(self.users.values())
+
+    def backfill_matches(self):
+        """Fetch every match since the first season started, splitting the
+        history into date ranges which are fetched concurrently."""
+        start = self.fetch_first_season_start()
+        if start is None:
+            return self.fetch_matches({})
+
+        end = date.today() + timedelta(days=1)
+        ranges = []
+        while start < end:
+            range_end = min(start + timedelta(days=self.MATCH_BACKFILL_CHUNK_DAYS), end)
+            ranges.append({
+                'date__gte': start.isoformat(),
+                'date__lt': range_end.isoformat(),
+            })
+            start = range_end
+
+        chunks = self.request_pool.map(self.fetch_matches, ranges)
+        return [match for chunk in chunks for match in chunk]
+
+    def fetch_first_season_start(self):
+        """Return the date the first season started, or None if there are no
+        seasons."""
+        seasons = self.refresh_seasons()
+        if not seasons:
+            return None
+        return datetime.strptime(seasons[0]['start_date'][:10], '%Y-%m-%d').date()
+
+    def refresh_seasons(self):
+        """Fetch every season and load them into the season catalog."""
+        seasons = self.fetch_seasons()
+        self.seasons.load(seasons)
+        return seasons
+
+    def fetch_seasons(self):
+        """Fetch every season from the server, oldest first."""
+        response = self.session.get(
+            self.generate_url('api/season/'),
+            params={'ordering': 'start_date'}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_matches(self, params):
+        """Fetch the matches matching the filters from the server."""
+        response = self.session.get(
+            self.generate_url('api/match/'),
+            params=params
+        )
+        response.raise_for_status()
+        return response.json()
 
     def generate_url(self, path):
         """Join the host portion of the URL with the provided path."""
         return urljoin(self.server_host, path)
 
     def prepare_requests_session(self):
+        """
+        Create a session shared by all handlers, with a connection pool large
+        enough for every thread to keep a connection alive.
+
+        Responses are cached by the adapter for the TTLs in the
+        `http_cache_ttls` setting, which maps URL path patterns to seconds.
+        Every request has a (connect, read) timeout, idempotent requests are
+        retried, and a circuit breaker stops requests being sent while the
+        server is failing - see the http settings in example_config.yaml.
+        """
         self.session = Session()
+        pool_size = self.config.get('http_pool_size') or (
+            self.config.get('worker_threads', self.DEFAULT_WORKER_THREADS) +
+            self.config.get('request_threads', self.DEFAULT_REQUEST_THREADS)
+        )
+        ttls = self.config.get('http_cache_ttls')
+        timeouts = self.config.get('http_timeouts')
+        adapter = CachingAdapter(
+            ttls=DEFAULT_CACHE_TTLS if ttls is None else ttls.items(),
+            metrics=self.metrics,
+            timeouts=DEFAULT_TIMEOUTS if timeouts is None else timeouts.items(),
+            default_timeout=self.config.get('http_timeout', DEFAULT_TIMEOUT),
+            retries=self.config.get('http_retries', 2),
+            breaker=CircuitBreaker(
+                failure_threshold=self.config.get('http_circuit_failure_threshold', 5),
+                reset_timeout=self.config.get('http_circuit_reset_timeout', 30),
+            ),
+            pool_connections=pool_size,
+            pool_maxsize=pool_size
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update(
             {'Authorization': 'Token {token}'.format(token=self.server_token)}
         )
@@ -260,26 +851,23 @@ class PoolBot(object):
         By default this uses the season based elo total, but the overall
         elo count can be used instead by passing season=False.
         """
-        elo_field = 'season_elo' if season else 'total_elo'
-        all_users_elo = {
-            user.slack_id: getattr(user, elo_field) for
-            user_id, user in self.users.iteritems() if
-            user.included_in_leaderboard
-        }
-
-        return sorted(all_users_elo, key=all_users_elo.get, reverse=True)
+        return self.leaderboards['season' if season else 'total'].top()
 
-    def get_leaderboard_position(self, player):
-        """Retrieves position for given player"""
-        try:
-            return self._get_leaderboard().index(player) + 1
-        except ValueError:
-            # this probably means that the user ID was not returned in the 
-            # ordered list of leaderboard players because they are have played
-            # a game yet...
-            return None
+    def get_leaderboard_position(self, player, season=True):
+        """Retrieves position for given player. This will be None if the
+        player is not in the leaderboard, because they have not played a
+        game yet or are inactive."""
+        return self.leaderboards['season' if season else 'total'].position(player)
 
 
 if __name__ == '__main__':
-    bot = PoolBot()
+    parser = ArgumentParser(description=PoolBot.__doc__)
+    parser.add_argument(
+        '--cold-start',
+        action='store_true',
+        help='ignore any snapshot and load all users and channels from scratch'
+    )
+    args = parser.parse_args()
+
+    bot = PoolBot(cold_start=args.cold_start)
     bot.listen()
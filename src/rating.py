@@ -0,0 +1,71 @@
+"""Elo rating calculations, mirroring those made by poolbot-server so the
+points at stake in a match can be worked out without asking it."""
+
+
+class EloEngine(object):
+    """
+    Calculates the elo points won and lost by players.
+
+    The expected score of player A against player B is
+    `1 / (1 + 10 ** ((elo_b - elo_a) / 400))`, and a player gains
+    `k * (1 - expected)` points for a win or loses `k * expected` points for a
+    loss. Players who have played fewer than `provisional_matches` games use
+    the larger `provisional_k_factor`, so their rating settles quickly.
+    """
+
+    def __init__(self, k_factor=32, provisional_k_factor=None, provisional_matches=0):
+        self.k_factor = k_factor
+        self.provisional_k_factor = provisional_k_factor or k_factor
+        self.provisional_matches = provisional_matches
+
+    def get_k_factor(self, match_count=None):
+        """Return the K-factor for a player who has played `match_count`
+        games. If the match count is unknown, the standard K-factor is used."""
+        if match_count is not None and match_count < self.provisional_matches:
+            return self.provisional_k_factor
+        return self.k_factor
+
+    def expected_score(self, elo, opponent_elo):
+        """Return the probability of a player beating their opponent."""
+        return 1.0 / (1 + 10 ** ((opponent_elo - elo) / 400.0))
+
+    def stakes(self, elo, opponent_elo, match_count=None):
+        """Return the points a player would win or lose against an opponent,
+        and the elo score they would be left with."""
+        k_factor = self.get_k_factor(match_count)
+        expected = self.expected_score(elo, opponent_elo)
+        points_win = int(round(k_factor * (1 - expected)))
+        points_lose = int(round(k_factor * expected))
+        return {
+            'points_win': points_win,
+            'points_lose': points_lose,
+            'elo_win': elo + points_win,
+            'elo_lose': elo - points_lose,
+        }
+
+    def expected_score_matrix(self, elos):
+        """
+        Return the expected score of every player against every other player,
+        as a list of rows where `matrix[i][j]` is player i's chance of
+        beating player j.
+
+        Rather than calling expected_score() for each pair, each player's
+        rating is converted once to `q = 10 ** (elo / 400)`, after which each
+        pair only needs `q_i / (q_i + q_j)`.
+        """
+        q = [10 ** (elo / 400.0) for elo in elos]
+        return [[q_i / (q_i + q_j) for q_j in q] for q_i in q]
+
+    def points_win_matrix(self, elos, match_counts=None):
+        """Return the points each player would win against every other
+        player, as rows of a matrix like expected_score_matrix()."""
+        if match_counts is None:
+            match_counts = [None] * len(elos)
+
+        return [
+            [int(round(k_factor * (1 - expected))) for expected in row] for
+            k_factor, row in zip(
+                [self.get_k_factor(count) for count in match_counts],
+                self.expected_score_matrix(elos)
+            )
+        ]
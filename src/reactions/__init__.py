@@ -1,2 +1,14 @@
-from channel_join import ChannelJoinReaction
-from channel_leave import ChannelLeaveReaction
+"""
+Poolbot reactions. Unlike commands these are all loaded when poolbot
+starts, as they must subscribe to the events they react to.
+"""
+
+from registry import PluginSpec
+
+
+REACTIONS = (
+    PluginSpec('reactions.channel_join.ChannelJoinReaction'),
+    PluginSpec('reactions.channel_leave.ChannelLeaveReaction'),
+    PluginSpec('reactions.channel_registry.ChannelRegistryReaction'),
+    PluginSpec('reactions.team_member.TeamMemberReaction'),
+)
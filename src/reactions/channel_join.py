@@ -5,7 +5,8 @@ from utils import get_ordinal_extension
 class ChannelJoinReaction(Handler):
     """Welcome new users to the channel with poolbot monitoring messages."""
 
-    url_path = 'api/player/'
+    event_types = ('message',)
+    event_subtypes = ('channel_join',)
 
     def match_request(self, message):
         """Look for a message to represent a player joining the channel."""
@@ -16,23 +17,13 @@ class ChannelJoinReaction(Handler):
         registered and return a welcome message."""
         user_id = message['user']
 
-        # add the user to the users list if not already saved
+        # add the user to the users list if not already saved - this is
+        # usually done when they join the team via the TeamMemberReaction
         if user_id not in self.poolbot.users:
-            response = self.poolbot.session.post(
-                self._generate_url(),
-                data={
-                    'name': message['user_profile']['name'],
-                    'slack_id': user_id
-                }
+            self.poolbot.add_slack_user(
+                dict(message['user_profile'], id=user_id)
             )
 
-            # create a local version of the user in the cache
-            player_profile = response.json()
-            
-            user_profile = flatten_nested_dict(message['user_profile'])
-            user_profile.update(player_profile)
-            self.poolbot.users[user_id] = User(**user_profile)
-
             # generate our reply for the new user
             return self.reply(
                 'Welcome to the baze {name}! :wave:'.format(
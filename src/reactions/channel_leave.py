@@ -5,6 +5,9 @@ from utils import get_ordinal_extension
 class ChannelLeaveReaction(Handler):
     """Say goodbye to users when they leave the room."""
 
+    event_types = ('message',)
+    event_subtypes = ('channel_leave',)
+
     def match_request(self, message):
         return message.get('subtype') == 'channel_leave'
 
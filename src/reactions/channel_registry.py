@@ -0,0 +1,33 @@
+from handler import Handler
+
+
+class ChannelRegistryReaction(Handler):
+    """Keep the registry of channels poolbot is a member of up to date."""
+
+    event_types = (
+        'channel_created',
+        'channel_joined',
+        'channel_left',
+        'channel_rename',
+    )
+
+    def match_request(self, message):
+        return True
+
+    def process_request(self, message):
+        """Apply the channel change to the registry. No reply is needed."""
+        channels = self.poolbot.poolbot_channels
+        event_type = message['type']
+
+        if event_type == 'channel_joined':
+            channels.add(message['channel'])
+        elif event_type == 'channel_created':
+            # the creator of a channel is its only member to begin with
+            if message['channel'].get('creator') == self.poolbot.bot_id:
+                channels.add(message['channel'])
+        elif event_type == 'channel_left':
+            channels.remove(message['channel'])
+        elif event_type == 'channel_rename':
+            channels.rename(message['channel'])
+
+        return self.reply(None)
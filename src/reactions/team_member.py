@@ -0,0 +1,20 @@
+from handler import Handler
+
+
+class TeamMemberReaction(Handler):
+    """Keep the cached users up to date as people join the team or change
+    their slack profile."""
+
+    event_types = ('team_join', 'user_change')
+
+    def match_request(self, message):
+        return self.poolbot.is_player(message['user'])
+
+    def process_request(self, message):
+        """Add or update the cached user. No reply is needed."""
+        if message['type'] == 'team_join':
+            self.poolbot.add_slack_user(message['user'])
+        else:
+            self.poolbot.update_slack_user(message['user'])
+
+        return self.reply(None)
@@ -0,0 +1,190 @@
+"""Lookup tables used to dispatch messages and events to their handlers."""
+
+from threading import Lock
+
+
+class PrefixTrie(object):
+    """A character trie which records how many terms pass through each node,
+    so we can tell whether a prefix identifies exactly one term."""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, term, value):
+        node = self.root
+        for char in term:
+            node = node.setdefault(char, {})
+            node.setdefault(None, set()).add(value)
+
+    def unique_value(self, prefix):
+        """Return the value for the only term starting with the prefix, or
+        None if there is no such term or the prefix is ambiguous."""
+        node = self.root
+        for char in prefix:
+            try:
+                node = node[char]
+            except KeyError:
+                return None
+
+        values = node.get(None, ())
+        if len(values) == 1:
+            return next(iter(values))
+
+
+class PluginSpec(object):
+    """Declares a handler class by its dotted path, along with the terms it
+    responds to, so it can be registered without importing its module.
+    Commands which schedule jobs are `eager`, and loaded at startup."""
+
+    def __init__(self, path, command_term=None, aliases=(), eager=False):
+        self.path = path
+        self.module, self.class_name = path.rsplit('.', 1)
+        self.command_term = command_term
+        self.aliases = tuple(aliases)
+        self.eager = eager
+
+    def __repr__(self):
+        return '<PluginSpec {}>'.format(self.path)
+
+
+class CommandRegistry(object):
+    """
+    Maps command terms, aliases and unambiguous prefixes to command handlers.
+
+    Exact terms and aliases are resolved with a single dictionary lookup, so
+    the cost of dispatching a message does not grow with the number of
+    commands installed. Prefixes are only consulted if no exact term matches.
+
+    Commands can be declared with a PluginSpec instead of an instance, in
+    which case the `loader` is called to import and create the handler the
+    first time one of its terms is used.
+    """
+
+    min_prefix_length = 3
+
+    def __init__(self, loader=None):
+        self.loader = loader
+        self.handlers = {}
+        self.prefixes = PrefixTrie()
+        self.loaded = {}
+        self.lock = Lock()
+
+    def register(self, handler):
+        """Add a command handler, or the PluginSpec of one, under its command
+        term and any aliases."""
+        for term in (handler.command_term,) + tuple(handler.aliases):
+            if term is None:
+                continue
+            if term in self.handlers:
+                raise ValueError(
+                    'The command term {} is used by {} and {}.'.format(
+                        term,
+                        self._name(self.handlers[term]),
+                        self._name(handler)
+                    )
+                )
+            self.handlers[term] = handler
+            self.prefixes.insert(term, handler)
+
+    def resolve(self, term):
+        """Return the handler for a command term, if any."""
+        if not term:
+            return None
+
+        try:
+            handler = self.handlers[term]
+        except KeyError:
+            if len(term) < self.min_prefix_length:
+                return None
+            handler = self.prefixes.unique_value(term)
+
+        if isinstance(handler, PluginSpec):
+            return self._load(handler)
+        return handler
+
+    def terms(self):
+        """Return the primary term of every command, without loading them."""
+        return set(
+            handler.command_term for handler in self.handlers.itervalues() if
+            handler.command_term is not None
+        )
+
+    def load_eager(self):
+        """Load every command declared by an eager PluginSpec."""
+        specs = set(
+            handler for handler in self.handlers.itervalues() if
+            isinstance(handler, PluginSpec) and handler.eager
+        )
+        return [self._load(spec) for spec in sorted(specs, key=lambda spec: spec.path)]
+
+    def _load(self, spec):
+        """Return the handler for the spec, creating it on first use. Several
+        threads may resolve the same term at once, so this is locked."""
+        try:
+            return self.loaded[spec]
+        except KeyError:
+            pass
+
+        with self.lock:
+            if spec not in self.loaded:
+                handler = self.loader(spec)
+                self._check_terms(spec, handler)
+                self.loaded[spec] = handler
+            return self.loaded[spec]
+
+    def _check_terms(self, spec, handler):
+        """The terms of a command are declared by both its spec and its
+        class. The class is the source of truth, so make sure the spec it
+        was registered under has not drifted from it."""
+        declared = (spec.command_term, tuple(spec.aliases))
+        actual = (handler.command_term, tuple(handler.aliases))
+        if declared != actual:
+            raise ValueError(
+                'The spec of {} declares the terms {} but the command '
+                'responds to {}.'.format(spec.path, declared, actual)
+            )
+
+    def _name(self, handler):
+        if isinstance(handler, PluginSpec):
+            return handler.path
+        return handler.__class__.__name__
+
+
+class EventRouter(object):
+    """
+    Maps RTM event types and subtypes to the reaction handlers subscribed to
+    them.
+
+    Handlers declare the `event_types` and `event_subtypes` they care about,
+    and optionally the `channels` they are restricted to. Events which no
+    handler is subscribed to (typing notifications, presence changes etc)
+    resolve to an empty list with a single dictionary lookup, and can be
+    discarded before any handler specific work is done.
+    """
+
+    ANY_SUBTYPE = '*'
+
+    def __init__(self):
+        self.routes = {}
+
+    def subscribe(self, handler):
+        """Route events of the types declared by the handler to it. If the
+        handler does not declare any subtypes, it receives all of them."""
+        subtypes = handler.event_subtypes or (self.ANY_SUBTYPE,)
+        for event_type in handler.event_types:
+            for subtype in subtypes:
+                self.routes.setdefault((event_type, subtype), []).append(handler)
+
+    def route(self, event, channel_id=None):
+        """Return the handlers subscribed to the event, in the order they
+        were registered."""
+        event_type = event.get('type')
+        handlers = self.routes.get((event_type, event.get('subtype')), [])
+        wildcard_handlers = self.routes.get((event_type, self.ANY_SUBTYPE))
+        if wildcard_handlers:
+            handlers = handlers + wildcard_handlers
+
+        return [
+            handler for handler in handlers if
+            handler.channels is None or channel_id in handler.channels
+        ]
@@ -0,0 +1,195 @@
+"""Runs periodic jobs, such as syncs and digests, from the RTM loop."""
+
+import heapq
+import logging
+from datetime import datetime, timedelta
+from itertools import count
+from threading import Lock, Thread
+from time import mktime, time
+
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+
+def parse_time(at):
+    """Parse a `HH:MM` time of day into an (hour, minute) tuple."""
+    hour, minute = str(at).split(':')
+    return int(hour), int(minute)
+
+
+def parse_weekdays(days):
+    """Return the numbers of the named days of the week, or None for every
+    day. Accepts a single name, or a list of them."""
+    if not days:
+        return None
+    if isinstance(days, basestring):
+        days = [days]
+    return [WEEKDAYS.index(day.lower()) for day in days]
+
+
+class Interval(object):
+    """Runs a job every `seconds` seconds."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def next_after(self, timestamp):
+        return timestamp + self.seconds
+
+    def runs_between(self, start, end):
+        """Return how many runs are due after `start`, up to `end`."""
+        return int((end - start) // self.seconds)
+
+
+class Once(object):
+    """Runs a job a single time."""
+
+    def next_after(self, timestamp):
+        return None
+
+    def runs_between(self, start, end):
+        return 0
+
+
+class Daily(object):
+    """Runs a job at a local time of day, optionally only on some days of the
+    week (numbered from monday as 0)."""
+
+    def __init__(self, at, weekdays=None):
+        self.hour, self.minute = parse_time(at)
+        self.weekdays = frozenset(weekdays) if weekdays else None
+
+    def next_after(self, timestamp):
+        moment = datetime.fromtimestamp(timestamp)
+        run = moment.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        while run <= moment or (self.weekdays and run.weekday() not in self.weekdays):
+            run += timedelta(days=1)
+        return mktime(run.timetuple())
+
+    def runs_between(self, start, end):
+        runs = 0
+        run = self.next_after(start)
+        while run <= end:
+            runs += 1
+            run = self.next_after(run)
+        return runs
+
+
+class Job(object):
+    """A function run by the scheduler, and when it should next run."""
+
+    def __init__(self, name, func, schedule):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.next_run = None
+        self.running = False
+
+
+class Scheduler(object):
+    """
+    Keeps jobs in a heap ordered by the time they next run, so checking for
+    due jobs is a single comparison with the top of the heap.
+
+    Poolbot calls run_pending() on every pass of the RTM loop, and each due
+    job is run on its own daemon thread so a slow job never holds up message
+    handling. A job is not started again while its previous run is still
+    going, and if runs were missed - because poolbot was busy, or the
+    machine was asleep - only one catch up run is made. Run times, errors,
+    skipped and missed runs are recorded in `metrics`.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.jobs = {}
+        self.queue = []
+        self.counter = count()
+        self.lock = Lock()
+
+    def every(self, name, seconds, func, delay=None):
+        """Run the function every `seconds` seconds, first after `delay`
+        seconds (defaults to a full interval)."""
+        schedule = Interval(seconds)
+        first_run = time() + (seconds if delay is None else delay)
+        return self.add(Job(name, func, schedule), first_run)
+
+    def once(self, name, delay, func):
+        """Run the function once, after `delay` seconds."""
+        return self.add(Job(name, func, Once()), time() + delay)
+
+    def daily(self, name, at, func, weekdays=None):
+        """Run the function each day at the `HH:MM` local time, optionally
+        only on the given days of the week."""
+        schedule = Daily(at, weekdays)
+        return self.add(Job(name, func, schedule), schedule.next_after(time()))
+
+    def add(self, job, first_run):
+        """Schedule a job, replacing any other job with the same name."""
+        with self.lock:
+            self.jobs[job.name] = job
+            self._push(job, first_run)
+        return job
+
+    def cancel(self, name):
+        """Remove a job, returning whether it was scheduled."""
+        with self.lock:
+            return self.jobs.pop(name, None) is not None
+
+    def run_pending(self, now=None):
+        """Start every job which is due, returning the jobs started."""
+        now = time() if now is None else now
+        started = []
+        with self.lock:
+            while self.queue and self.queue[0][0] <= now:
+                next_run, _, job = heapq.heappop(self.queue)
+
+                # entries for cancelled or rescheduled jobs are left in the
+                # heap, and skipped when they reach the top
+                if self.jobs.get(job.name) is not job or job.next_run != next_run:
+                    continue
+
+                missed = job.schedule.runs_between(next_run, now)
+                if missed:
+                    logging.warning('Missed %d runs of the %s job', missed, job.name)
+                    self._incr('scheduler.missed.{}'.format(job.name), missed)
+                next_run = job.schedule.next_after(now)
+                if next_run is None:
+                    del self.jobs[job.name]
+                else:
+                    self._push(job, next_run)
+
+                if job.running:
+                    logging.warning('The %s job is still running, skipping', job.name)
+                    self._incr('scheduler.skipped.{}'.format(job.name))
+                    continue
+
+                job.running = True
+                started.append(job)
+
+        for job in started:
+            thread = Thread(
+                target=self._run, args=(job,), name='poolbot-job-{}'.format(job.name)
+            )
+            thread.daemon = True
+            thread.start()
+        return started
+
+    def _push(self, job, next_run):
+        job.next_run = next_run
+        heapq.heappush(self.queue, (next_run, next(self.counter), job))
+
+    def _run(self, job):
+        start = time()
+        try:
+            job.func()
+        except Exception:
+            logging.exception('The %s job failed', job.name)
+            self._incr('scheduler.errors.{}'.format(job.name))
+        finally:
+            if self.metrics is not None:
+                self.metrics.timing('scheduler.{}'.format(job.name), time() - start)
+            job.running = False
+
+    def _incr(self, name, value=1):
+        if self.metrics is not None:
+            self.metrics.incr(name, value)
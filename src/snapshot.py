@@ -0,0 +1,67 @@
+"""Snapshot of poolbot's user and channel caches, used for warm starts."""
+
+import json
+import logging
+import os
+from time import time
+
+from models import ChannelRegistry, User
+
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(path, users, channels):
+    """Write a list of users and a list of channels to disk. Users are stored
+    as rows of values, with the attribute names listed once, to keep the file
+    compact. The file is replaced atomically so a crash never leaves half a
+    snapshot, but callers must not write the same path concurrently.
+    """
+    attrs = User.USER_ATTRS + User.PLAYER_ATTRS
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'created': time(),
+        'user_attrs': attrs,
+        'users': [
+            [getattr(user, attr) for attr in attrs] for
+            user in users
+        ],
+        'channels': channels,
+    }
+
+    temp_path = '{}.tmp'.format(path)
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.rename(temp_path, path)
+
+
+def load_snapshot(path):
+    """
+    Return a tuple of the users, channels and the age of the snapshot in
+    seconds. None is returned if there is no usable snapshot, for example
+    if it was written by a different version of poolbot.
+    """
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except IOError:
+        return None
+    except ValueError:
+        logging.warning('Ignoring corrupt snapshot %s', path)
+        return None
+
+    if data.get('version') != SNAPSHOT_VERSION:
+        logging.info('Ignoring snapshot %s from an old version', path)
+        return None
+
+    attrs = data['user_attrs']
+    users = {}
+    for values in data['users']:
+        user = User(**dict(zip(attrs, values)))
+        users[user.slack_id] = user
+
+    channels = ChannelRegistry()
+    for channel in data['channels']:
+        channels.add(channel)
+
+    return users, channels, time() - data['created']
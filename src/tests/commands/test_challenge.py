@@ -0,0 +1,145 @@
+from time import sleep, time
+
+import mock
+
+from commands.challenge import ChallengeCommand
+from models import Challenge
+from scheduler import Scheduler
+from tests.data.poolbot_api import player
+from tests.mock import MockedResponse
+from .base import BaseCommandTestCase
+
+
+CHANNEL = 'C2147483705'
+
+
+class ChallengeCommandTestCase(BaseCommandTestCase):
+    """Tests for the ChallengeCommand class."""
+
+    challenges = [{'id': 1, 'channel': CHANNEL, 'initiator': '', 'challenger': ''}]
+
+    def setUp(self):
+        """Load the challenges through a mocked session, recording every
+        request the command makes."""
+        super(ChallengeCommandTestCase, self).setUp()
+        self.poolbot.outbox = mock.Mock()
+
+        session = self.poolbot.session
+        patchers = [
+            mock.patch.object(
+                session, 'get', return_value=MockedResponse(self.challenges)
+            ),
+            mock.patch.object(session, 'post', return_value=MockedResponse({}, 201)),
+            mock.patch.object(session, 'patch', return_value=MockedResponse({})),
+        ]
+        self.get, self.post, self.patch = [patcher.start() for patcher in patchers]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+        self.challenge_cmd = ChallengeCommand(poolbot=self.poolbot)
+        self.challenge_cmd.setup()
+        self.scheduler = Scheduler()
+        self.challenge_cmd.schedule_jobs(self.scheduler)
+
+    def run_jobs(self, now=None):
+        """Run the jobs which are due, returning their names once they have
+        finished."""
+        jobs = self.scheduler.run_pending(now)
+        deadline = time() + 1
+        while any(job.running for job in jobs) and time() < deadline:
+            sleep(0.001)
+        return [job.name for job in jobs]
+
+    def send(self, user, text):
+        """Process a command, returning the reply and the number of writes
+        made to the server."""
+        self.post.reset_mock()
+        self.patch.reset_mock()
+        reply, callbacks = self.challenge_cmd.process_request({
+            'channel': CHANNEL,
+            'user': user,
+            'text': text,
+        })
+        return reply, self.post.call_count + self.patch.call_count
+
+    def test_loaded_at_startup(self):
+        """Assert the challenges are loaded once, by a job run at startup."""
+        self.assertEqual(self.run_jobs(), ['challenge.load'])
+        self.assertTrue(self.challenge_cmd.challenges.ready)
+        self.challenge_cmd._load_challenges()
+        self.assertEqual(self.get.call_count, 1)
+
+    def test_open_and_accept(self):
+        """Assert opening and accepting a challenge each write to the server
+        once, without fetching the challenges again."""
+        self.run_jobs()
+        self.get.reset_mock()
+        initiator = player.PLAYER_1['slack_id']
+        challenger = player.PLAYER_2['slack_id']
+
+        reply, writes = self.send(initiator, 'challenge')
+        self.assertEqual(writes, 1)
+        self.assertIn('New challenge created', reply)
+        self.assertEqual(self.challenge_cmd.challenges.get(CHANNEL).state, Challenge.OPEN)
+
+        reply, writes = self.send(initiator, 'challenge')
+        self.assertEqual(writes, 0)
+        self.assertIn('has already challenged everyone', reply)
+
+        reply, writes = self.send(challenger, 'challenge accept')
+        self.assertEqual(writes, 1)
+        self.assertIn('To the baize!', reply)
+        self.assertEqual(
+            self.patch.call_args[1]['data'], {'challenger': challenger}
+        )
+        self.assertEqual(
+            self.challenge_cmd.challenges.get(CHANNEL).state, Challenge.ACCEPTED
+        )
+        self.assertFalse(self.get.called)
+
+    def test_expiry(self):
+        """Assert the expiry timer clears an unanswered challenge, and tells
+        the channel."""
+        self.run_jobs()
+        self.challenge_cmd.timeout = 0
+        self.send(player.PLAYER_1['slack_id'], 'challenge')
+        challenge = self.challenge_cmd.challenges.get(CHANNEL)
+        self.patch.reset_mock()
+
+        self.assertEqual(
+            self.run_jobs(time() + 1), ['challenge.expire.{}'.format(CHANNEL)]
+        )
+        self.assertEqual(challenge.state, Challenge.EXPIRED)
+        self.assertIsNone(challenge.initiator)
+        self.assertEqual(
+            self.patch.call_args[1]['data'], {'initiator': '', 'challenger': ''}
+        )
+        self.assertEqual(self.poolbot.outbox.put.call_count, 1)
+
+    def test_stale_challenge_expired_on_load(self):
+        """Assert a challenge the server last changed over a timeout ago is
+        expired as soon as it is loaded."""
+        self.get.return_value = MockedResponse([dict(
+            self.challenges[0],
+            initiator=player.PLAYER_1['slack_id'],
+            last_updated='2017-01-01T12:00:00.000000Z',
+        )])
+        self.run_jobs()
+        challenge = self.challenge_cmd.challenges.get(CHANNEL)
+        self.assertEqual(challenge.state, Challenge.OPEN)
+
+        self.assertEqual(self.run_jobs(), ['challenge.expire.{}'.format(CHANNEL)])
+        self.assertEqual(challenge.state, Challenge.EXPIRED)
+        self.assertEqual(self.poolbot.outbox.put.call_count, 1)
+
+    def test_load_failure(self):
+        """Assert the user is told the server is busy if the challenges can
+        not be loaded, and the startup job tries again later."""
+        self.get.return_value = MockedResponse({}, 503)
+        self.run_jobs()
+        self.assertFalse(self.challenge_cmd.challenges.ready)
+        self.assertIn('challenge.load', self.scheduler.jobs)
+
+        reply, writes = self.send(player.PLAYER_1['slack_id'], 'challenge')
+        self.assertEqual(reply, self.poolbot.SERVER_BUSY_MESSAGE)
+        self.assertEqual(writes, 0)
@@ -0,0 +1,63 @@
+import mock
+
+from commands.elo import EloCommand
+from tests.data.poolbot_api import player
+from .base import BaseCommandTestCase
+
+
+class EloCommandTestCase(BaseCommandTestCase):
+    """Tests for the EloCommand class."""
+
+    def setUp(self):
+        super(EloCommandTestCase, self).setUp()
+        self.elo_cmd = EloCommand(poolbot=self.poolbot)
+        self.elo_cmd.setup()
+        self.players = (player.PLAYER_1['slack_id'], player.PLAYER_2['slack_id'])
+
+    def test_sample_pairs(self):
+        """Assert verification pairs are spread across the leaderboard."""
+        players = list('ABCDEFGHIJK')
+        self.assertEqual(
+            self.elo_cmd._sample_pairs(players, 5),
+            [('A', 'C'), ('C', 'E'), ('E', 'G'), ('G', 'I'), ('I', 'K')]
+        )
+        self.assertEqual(
+            self.elo_cmd._sample_pairs(players[:3], 5), [('A', 'B'), ('B', 'C')]
+        )
+        self.assertEqual(self.elo_cmd._sample_pairs(players[:1], 5), [])
+
+    def test_mismatch_falls_back_to_server(self):
+        """Assert requests are answered by the server after a verification
+        finds the local calculation disagrees with it, until it agrees again."""
+        server_data = self.elo_cmd._calculate_stakes(*self.players)
+        server_data[0] = dict(server_data[0], points_win=99)
+        message = {
+            'channel': 'C2147483705',
+            'user': self.players[0],
+            'text': 'elo <@{}>'.format(self.players[1]),
+        }
+
+        with mock.patch.object(
+            EloCommand, '_fetch_stakes', return_value=server_data
+        ) as fetch_stakes:
+            self.elo_cmd.verify_engine()
+            self.assertFalse(self.elo_cmd.verified)
+            self.assertEqual(
+                self.poolbot.metrics.get_counter('elo.verify.mismatch'), 1
+            )
+
+            reply, callbacks = self.elo_cmd.process_request(message)
+            self.assertIn('worth 99 points', reply)
+            fetch_stakes.assert_called_with(*self.players)
+
+        with mock.patch.object(
+            EloCommand, '_fetch_stakes',
+            side_effect=lambda *players: self.elo_cmd._calculate_stakes(*players)
+        ) as fetch_stakes:
+            self.elo_cmd.verify_engine()
+            self.assertTrue(self.elo_cmd.verified)
+
+            fetch_stakes.reset_mock()
+            reply, callbacks = self.elo_cmd.process_request(message)
+            self.assertNotIn('worth 99 points', reply)
+            self.assertFalse(fetch_stakes.called)
@@ -2,8 +2,10 @@ import unittest
 import os
 
 import mock
+from requests import HTTPError
 
-from commands import RecordCommand
+from commands.head_to_head import HeadToHeadCommand
+from commands.record import RecordCommand
 from tests.data.poolbot_api import player
 from .base import BaseCommandTestCase
 
@@ -60,17 +62,17 @@ class RecordCommandTestCase(BaseCommandTestCase):
             term=self.record_cmd.command_term,
             user='<@USERID>'
         )
-        value = self.record_cmd._find_defeated_player(text)
+        value = self.record_cmd._find_defeated_player({'text': text})
         self.assertEqual(value, 'USERID')
 
         # assert no user ID is found
         text = '{term} beat toby'.format(term=self.record_cmd.command_term)
-        value = self.record_cmd._find_defeated_player(text)
+        value = self.record_cmd._find_defeated_player({'text': text})
         self.assertIsNone(value)
 
         # assert no user mention at all
         text = '{term} beat'.format(term=self.record_cmd.command_term)
-        value = self.record_cmd._find_defeated_player(text)
+        value = self.record_cmd._find_defeated_player({'text': text})
         self.assertIsNone(value)
 
     def test_post_data(self):
@@ -104,12 +106,73 @@ class RecordCommandTestCase(BaseCommandTestCase):
                 winner_total=player.PLAYER_1['elo'],
                 loser_total=player.PLAYER_2['elo'],
                 emoji=self.record_cmd._get_emojis(),
-                position_winner=1,
-                position_loser=2,
+                position_winner='1st',
+                position_loser='2nd',
                 delta_position_winner=0,
                 delta_position_loser=0,
+                winner_emoji=':left_right_arrow:',
+                loser_emoji=':left_right_arrow:',
             ),
         )
 
         # the recording off a win should lead to the spree command being called
         self.assertItemsEqual(callbacks, ['spree'])
+
+    def test_match_already_synced(self):
+        """Assert a match fetched by a sync before it was recorded is not
+        applied to the indexes a second time."""
+        match = {
+            'date': '2017-01-01T12:00:00.000000Z',
+            'winner': player.PLAYER_1['slack_id'],
+            'loser': player.PLAYER_2['slack_id'],
+        }
+        self.poolbot.matches.add(match)
+        self.poolbot.match_recorded(dict(match))
+        self.assertEqual(self.poolbot.form.form(match['winner']), [])
+        self.assertEqual(
+            self.poolbot.head_to_head.head_to_head(match['winner'], match['loser']),
+            (0, 0)
+        )
+
+        self.poolbot.match_recorded(dict(match, date='2017-01-02T12:00:00.000000Z'))
+        self.assertEqual(self.poolbot.form.form(match['winner']), ['W'])
+        self.assertEqual(
+            self.poolbot.head_to_head.head_to_head(match['winner'], match['loser']),
+            (1, 0)
+        )
+
+    def test_match_without_date(self):
+        """Assert a recorded match without a date is left for the next sync,
+        so the head-to-head command can still order the indexed matches."""
+        self.poolbot.head_to_head.rebuild([])
+        winner = player.PLAYER_1['slack_id']
+        loser = player.PLAYER_2['slack_id']
+        self.poolbot.match_recorded({'winner': winner, 'loser': loser})
+        self.assertEqual(self.poolbot.head_to_head.head_to_head(winner, loser), (0, 0))
+        self.assertEqual(len(self.poolbot.matches), 0)
+
+        self.poolbot.match_recorded({
+            'date': '2017-01-02T12:00:00.000000Z',
+            'winner': winner,
+            'loser': loser,
+        })
+        reply, callbacks = HeadToHeadCommand(poolbot=self.poolbot).process_request({
+            'channel': 'C2147483705',
+            'user': winner,
+            'text': 'head-to-head <@{}>'.format(loser),
+        })
+        self.assertIn('The last 1 results were', reply)
+        self.assertIn('02 Jan 2017', reply)
+
+    def test_rebuild_without_seasons(self):
+        """Assert synced matches still reach the indexes if the seasons can
+        not be fetched."""
+        self.poolbot.matches.add({
+            'date': '2017-01-01T12:00:00.000000Z',
+            'winner': player.PLAYER_1['slack_id'],
+            'loser': player.PLAYER_2['slack_id'],
+        })
+        with mock.patch.object(self.poolbot, 'fetch_seasons', side_effect=HTTPError):
+            self.poolbot.rebuild_match_indexes()
+        self.assertEqual(self.poolbot.form.form(player.PLAYER_1['slack_id']), ['W'])
+        self.assertTrue(self.poolbot.head_to_head.ready)
@@ -13,6 +13,13 @@ PLAYER_1 = {
     "total_grannies_given_count": 1,
     "total_grannies_taken_count": 2,
     "elo": 1400,
+    "total_elo": 1400,
+    "season_elo": 1400,
+    "season_win_count": 5,
+    "season_loss_count": 5,
+    "season_match_count": 10,
+    "season_grannies_given_count": 0,
+    "season_grannies_taken_count": 1,
     "active": True,
 }
 
@@ -29,6 +36,13 @@ PLAYER_2 = {
     "total_grannies_given_count": 3,
     "total_grannies_taken_count": 0,
     "elo": 1200,
+    "total_elo": 1200,
+    "season_elo": 1200,
+    "season_win_count": 2,
+    "season_loss_count": 5,
+    "season_match_count": 7,
+    "season_grannies_given_count": 1,
+    "season_grannies_taken_count": 0,
     "active": True,
 }
 
@@ -45,6 +59,13 @@ PLAYER_3 = {
     "total_grannies_given_count": 0,
     "total_grannies_taken_count": 0,
     "elo": 1100,
+    "total_elo": 1100,
+    "season_elo": 1100,
+    "season_win_count": 0,
+    "season_loss_count": 0,
+    "season_match_count": 0,
+    "season_grannies_given_count": 0,
+    "season_grannies_taken_count": 0,
     "active": False,
 }
 
@@ -61,6 +82,13 @@ PLAYER_4 = {
     "total_grannies_given_count": 0,
     "total_grannies_taken_count": 0,
     "elo": 1000,
+    "total_elo": 1000,
+    "season_elo": 1000,
+    "season_win_count": 0,
+    "season_loss_count": 0,
+    "season_match_count": 0,
+    "season_grannies_given_count": 0,
+    "season_grannies_taken_count": 0,
     "active": True,
 }
 
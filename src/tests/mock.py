@@ -1,5 +1,7 @@
 """Some mock objects and methods to fake third party APIs."""
 
+from requests import HTTPError
+
 from tests.data.slack_api import channels, users
 from tests.data.poolbot_api import player as player_data
 
@@ -14,6 +16,22 @@ class MockedResponse(object):
         """Mock the `.json()` method on the requests lib response object."""
         return self.json_data
 
+    def raise_for_status(self):
+        """Mock the `.raise_for_status()` method, raising for error codes."""
+        if self.status_code >= 400:
+            raise HTTPError('{} Error'.format(self.status_code), response=self)
+
+
+class MockedPlayer(object):
+    """The attributes of a cached User used by the leaderboard, odds and
+    suggestion indexes."""
+
+    def __init__(self, slack_id, season_elo, season_match_count=1, active=True):
+        self.slack_id = slack_id
+        self.season_elo = season_elo
+        self.season_match_count = season_match_count
+        self.active = active
+
 
 def mocked_get_api(url):
     """Based off the URL return some data to mock the `api/` endpoint."""
@@ -38,7 +56,7 @@ def mocked_post_api(url, data):
     return MockedResponse(json=data, status_code=201)
 
 
-def mocked_slack_client(method):
+def mocked_slack_client(method, **kwargs):
     """Mocked response from the slack client to avoid HTTP requests."""
     return {
         'channels.list': channels.CHANNEL_LIST,
@@ -0,0 +1,48 @@
+import unittest
+
+from models import Challenge, ChallengeBoard
+from utils import InvalidChallengeStateException
+
+
+class ChallengeTestCase(unittest.TestCase):
+    """Tests for the Challenge and ChallengeBoard classes."""
+
+    def test_state_from_api(self):
+        """Assert the state of a challenge is derived from its players."""
+        board = ChallengeBoard()
+        board.load([
+            {'id': 1, 'channel': 'C1', 'initiator': None, 'challenger': None},
+            {'id': 2, 'channel': 'C2', 'initiator': 'A', 'challenger': None},
+            {'id': 3, 'channel': 'C3', 'initiator': 'A', 'challenger': 'B'},
+        ])
+        self.assertEqual(board.get('C1').state, Challenge.EXPIRED)
+        self.assertEqual(board.get('C2').state, Challenge.OPEN)
+        self.assertEqual(board.get('C3').state, Challenge.ACCEPTED)
+        self.assertEqual([c.pk for c in board.in_state(Challenge.OPEN)], [2])
+
+    def test_transitions(self):
+        """Assert a challenge moves between states in the allowed order."""
+        challenge = Challenge(1, 'C1')
+        with self.assertRaises(InvalidChallengeStateException):
+            challenge.accept('B')
+
+        challenge.open('A', expires_at=100)
+        self.assertFalse(challenge.can_become(Challenge.OPEN))
+        with self.assertRaises(InvalidChallengeStateException):
+            challenge.accept('A')
+
+        challenge.accept('B', expires_at=200)
+        self.assertEqual(
+            (challenge.state, challenge.challenger, challenge.expires_at),
+            (Challenge.ACCEPTED, 'B', 200)
+        )
+
+        # a new challenge can be opened once the last one was accepted
+        challenge.open('C')
+        self.assertIsNone(challenge.challenger)
+
+        challenge.expire()
+        self.assertEqual(challenge.state, Challenge.EXPIRED)
+        self.assertIsNone(challenge.initiator)
+        with self.assertRaises(InvalidChallengeStateException):
+            challenge.expire()
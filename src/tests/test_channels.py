@@ -0,0 +1,53 @@
+import unittest
+
+from models import ChannelRegistry
+
+
+class PagedSlackClient(object):
+    """Returns `channels.list` results split over two pages."""
+
+    def __init__(self):
+        self.calls = []
+
+    def api_call(self, method, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get('cursor') is None:
+            return {
+                'ok': True,
+                'channels': [
+                    {'id': 'C1', 'name': 'pool', 'is_member': True},
+                    {'id': 'C2', 'name': 'random', 'is_member': False},
+                ],
+                'response_metadata': {'next_cursor': 'page2'},
+            }
+        return {
+            'ok': True,
+            'channels': [{'id': 'C3', 'name': 'general', 'is_member': True}],
+            'response_metadata': {'next_cursor': ''},
+        }
+
+
+class ChannelRegistryTestCase(unittest.TestCase):
+    """Tests for the ChannelRegistry class."""
+
+    def test_load_member_channels(self):
+        """Assert every page is loaded, keeping only member channels."""
+        client = PagedSlackClient()
+        registry = ChannelRegistry()
+        registry.load(client)
+
+        self.assertEqual(len(client.calls), 2)
+        self.assertEqual(sorted(registry), ['C1', 'C3'])
+        self.assertEqual(registry.get('C1')['name'], 'pool')
+
+    def test_membership_updates(self):
+        """Assert channels can be joined, renamed and left."""
+        registry = ChannelRegistry()
+        registry.add({'id': 'C1', 'name': 'pool'})
+        registry.rename({'id': 'C1', 'name': 'snooker'})
+        registry.rename({'id': 'C2', 'name': 'unknown'})
+        self.assertEqual(registry.get('C1')['name'], 'snooker')
+        self.assertNotIn('C2', registry)
+
+        registry.remove('C1')
+        self.assertNotIn('C1', registry)
@@ -0,0 +1,56 @@
+import threading
+import time
+import unittest
+
+from dispatcher import ChannelDispatcher
+
+
+class ChannelDispatcherTestCase(unittest.TestCase):
+    """Tests for the ChannelDispatcher class."""
+
+    def test_channel_order_preserved(self):
+        """Assert events from the same channel are processed in order, even
+        when an earlier event is slower than a later one."""
+        processed = []
+        done = threading.Event()
+
+        def callback(event):
+            channel, index = event
+            if index == 0:
+                time.sleep(0.05)
+            processed.append(event)
+            if len(processed) == 6:
+                done.set()
+
+        dispatcher = ChannelDispatcher(callback, workers=3)
+        for index in xrange(3):
+            dispatcher.submit('C1', ('C1', index))
+            dispatcher.submit('C2', ('C2', index))
+
+        self.assertTrue(done.wait(2))
+        for channel in ('C1', 'C2'):
+            self.assertEqual(
+                [index for chan, index in processed if chan == channel],
+                [0, 1, 2]
+            )
+
+    def test_channels_processed_concurrently(self):
+        """Assert a blocked channel does not stop other channels."""
+        release = threading.Event()
+        released = threading.Event()
+        processed = threading.Event()
+
+        def callback(event):
+            if event == 'slow':
+                release.wait(2)
+                released.set()
+            else:
+                processed.set()
+
+        dispatcher = ChannelDispatcher(callback, workers=2)
+        dispatcher.submit('C1', 'slow')
+        dispatcher.submit('C2', 'fast')
+
+        self.assertTrue(processed.wait(1))
+        release.set()
+        self.assertTrue(released.wait(1))
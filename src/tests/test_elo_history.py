@@ -0,0 +1,51 @@
+import unittest
+from calendar import timegm
+from datetime import datetime
+
+from models import EloHistory
+
+
+def entry(date, elo_score, season):
+    return {
+        'date': '{}T12:00:00.000000Z'.format(date),
+        'elo_score': elo_score,
+        'season': season,
+    }
+
+
+def timestamp(year, month, day):
+    return timegm(datetime(year, month, day).utctimetuple())
+
+
+class EloHistoryTestCase(unittest.TestCase):
+    """Tests for the EloHistory class."""
+
+    def setUp(self):
+        self.history = EloHistory(default_elo=1000)
+        self.history.extend([
+            entry('2016-12-30', 1030, 1),
+            entry('2016-12-29', 1020, 1),
+            entry('2017-01-01', 1010, 2),
+            entry('2017-01-02', 995, 2),
+            entry('2017-01-02', 995, 2),
+        ])
+
+    def test_extend(self):
+        """Assert entries are sorted, and only newer entries are added."""
+        self.assertEqual(len(self.history), 4)
+        self.assertEqual(self.history.last_date, '2017-01-02T12:00:00.000000Z')
+        self.assertEqual(
+            self.history.extend([entry('2017-01-01', 1010, 2), entry('2017-01-03', 1005, 2)]),
+            1
+        )
+        self.assertEqual(self.history.highest, (1030, '2016-12-30T12:00:00.000000Z'))
+        self.assertEqual(self.history.lowest, (995, '2017-01-02T12:00:00.000000Z'))
+
+    def test_net_since(self):
+        """Assert net points count the first match of a season from the
+        default elo."""
+        self.assertEqual(self.history.net_since(timestamp(2017, 1, 2)), -15)
+        self.assertEqual(self.history.net_since(timestamp(2017, 1, 1)), -5)
+        self.assertEqual(self.history.net_since(timestamp(2016, 12, 1)), 25)
+        self.assertEqual(self.history.net_since(timestamp(2016, 12, 1), season=2), -5)
+        self.assertEqual(self.history.net_since(timestamp(2017, 2, 1)), 0)
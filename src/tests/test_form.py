@@ -0,0 +1,39 @@
+import unittest
+
+from models import FormIndex
+
+
+def match(date, winner, loser):
+    return {'date': date, 'winner': winner, 'loser': loser}
+
+
+class FormIndexTestCase(unittest.TestCase):
+    """Tests for the FormIndex class."""
+
+    def setUp(self):
+        self.index = FormIndex(size=4)
+        self.index.rebuild([
+            match('2016-12-01T12:00:00.000000Z', 'A', 'B'),
+            match('2016-12-02T12:00:00.000000Z', 'A', 'C'),
+            match('2016-12-03T12:00:00.000000Z', 'A', 'B'),
+            match('2017-01-01T12:00:00.000000Z', 'A', 'C'),
+            match('2017-01-02T12:00:00.000000Z', 'B', 'A'),
+            match('2017-01-03T12:00:00.000000Z', 'A', 'B'),
+        ], season_start='2017-01-01')
+
+    def test_form(self):
+        """Assert only the most recent results are kept, newest first."""
+        self.assertTrue(self.index.ready)
+        self.assertEqual(self.index.form('A'), ['W', 'L', 'W', 'W'])
+        self.assertEqual(self.index.form('A', limit=2), ['W', 'L'])
+        self.assertEqual(self.index.form('B'), ['L', 'W', 'L', 'L'])
+        self.assertEqual(self.index.form('D'), [])
+
+    def test_streaks(self):
+        """Assert streaks which began last season count as this season's
+        only from the start of the season."""
+        self.assertEqual(self.index.streaks('A'), (1, 4, 1))
+        self.index.record(match('2017-01-04T12:00:00.000000Z', 'A', 'C'))
+        self.index.record(match('2017-01-05T12:00:00.000000Z', 'A', 'B'))
+        self.assertEqual(self.index.streaks('A'), (3, 4, 3))
+        self.assertEqual(self.index.streaks('B'), (0, 1, 1))
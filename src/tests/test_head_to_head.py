@@ -0,0 +1,49 @@
+import unittest
+
+from models import HeadToHeadIndex
+
+
+def match(date, winner, loser):
+    return {'date': date, 'winner': winner, 'loser': loser}
+
+
+class HeadToHeadIndexTestCase(unittest.TestCase):
+    """Tests for the HeadToHeadIndex class."""
+
+    def setUp(self):
+        self.index = HeadToHeadIndex(size=2)
+        self.index.rebuild([
+            match('2017-01-01', 'A', 'B'),
+            match('2017-01-02', 'B', 'A'),
+            match('2017-01-03', 'B', 'A'),
+            match('2017-01-04', 'A', 'C'),
+            match('2017-01-05', 'A', 'C'),
+            match('2017-01-06', 'D', 'A'),
+        ])
+
+    def test_head_to_head(self):
+        """Assert the record is returned from the point of view of the
+        player, with only the most recent matches kept."""
+        self.assertEqual(self.index.head_to_head('A', 'B'), (1, 2))
+        self.assertEqual(self.index.head_to_head('B', 'A'), (2, 1))
+        self.assertEqual(self.index.head_to_head('B', 'C'), (0, 0))
+        self.assertEqual(
+            [m['date'] for m in self.index.recent('B', 'A')],
+            ['2017-01-03', '2017-01-02']
+        )
+
+        self.index.record(match('2017-01-07', 'A', 'B'))
+        self.assertEqual(self.index.head_to_head('A', 'B'), (2, 2))
+        self.assertEqual(
+            [m['date'] for m in self.index.recent('A', 'B', limit=1)],
+            ['2017-01-07']
+        )
+
+    def test_nemesis_and_victim(self):
+        """Assert the worst and best records are found, ignoring opponents
+        played fewer than the minimum number of times."""
+        self.assertEqual(self.index.nemesis('A'), ('D', 0, 1))
+        self.assertEqual(self.index.nemesis('A', minimum_games=2), ('B', 1, 2))
+        self.assertEqual(self.index.victim('A', minimum_games=2), ('C', 2, 0))
+        self.assertIsNone(self.index.victim('C', minimum_games=2))
+        self.assertIsNone(self.index.nemesis('D'))
@@ -0,0 +1,61 @@
+import unittest
+
+from models import RankIndex
+from tests.mock import MockedPlayer
+
+
+class RankIndexTestCase(unittest.TestCase):
+    """Tests for the RankIndex class."""
+
+    def setUp(self):
+        self.players = {
+            'A': MockedPlayer('A', 1100),
+            'B': MockedPlayer('B', 1300),
+            'C': MockedPlayer('C', 1000),
+            'D': MockedPlayer('D', 1200),
+            'E': MockedPlayer('E', 1500, season_match_count=0),
+            'F': MockedPlayer('F', 1400, active=False),
+        }
+        self.index = RankIndex('season_elo', 'season_match_count')
+        self.index.rebuild(self.players.values())
+
+    def test_positions(self):
+        """Assert players are ranked by elo, excluding those who have not
+        played or are inactive."""
+        self.assertEqual(self.index.top(), ['B', 'D', 'A', 'C'])
+        self.assertEqual(self.index.top(2), ['B', 'D'])
+        self.assertEqual(self.index.position('A'), 3)
+        self.assertIsNone(self.index.position('E'))
+        self.assertIsNone(self.index.position('F'))
+
+    def test_update_in_place(self):
+        """Assert updating a player moves them, and new players are added."""
+        self.players['C'].season_elo = 1250
+        self.index.update(self.players['C'])
+        self.assertEqual(self.index.top(), ['B', 'C', 'D', 'A'])
+
+        self.players['E'].season_match_count = 1
+        self.index.update(self.players['E'])
+        self.assertEqual(self.index.position('E'), 1)
+        self.assertEqual(len(self.index), 5)
+
+    def test_around(self):
+        """Assert the players either side of a player are returned."""
+        self.assertEqual(
+            self.index.around('A', distance=1),
+            [(2, 'D'), (3, 'A'), (4, 'C')]
+        )
+        self.assertEqual(self.index.around('B', distance=1), [(1, 'B'), (2, 'D')])
+        self.assertEqual(self.index.around('E'), [])
+
+    def test_nearest(self):
+        """Assert the players with the closest elo are found, closest first."""
+        self.assertEqual(
+            self.index.nearest(1190, 3),
+            [('D', 1200), ('A', 1100), ('B', 1300)]
+        )
+        self.assertEqual(
+            self.index.nearest(1100, 2, exclude=('A',)),
+            [('D', 1200), ('C', 1000)]
+        )
+        self.assertEqual(len(self.index.nearest(900, 10)), 4)
@@ -0,0 +1,66 @@
+import unittest
+
+from models import MatchStore
+
+
+class MatchStoreTestCase(unittest.TestCase):
+    """Tests for the MatchStore class."""
+
+    def setUp(self):
+        self.store = MatchStore()
+        self.store.add_many([
+            {'date': '2017-01-01T12:00:00.000000Z', 'winner': 'A', 'loser': 'B', 'granny': False},
+            {'date': '2017-01-02T12:00:00.000000Z', 'winner': 'B', 'loser': 'A', 'granny': True},
+            {'date': '2017-01-03T12:00:00.000000Z', 'winner': 'A', 'loser': 'C', 'granny': False},
+        ], cursor='2017-01-03T12:00:00.000000Z')
+
+    def test_duplicates_ignored(self):
+        """Assert a match pushed locally is not duplicated by a sync."""
+        match = {'date': '2017-01-04T12:00:00.000000Z', 'winner': 'C', 'loser': 'B'}
+        self.assertTrue(self.store.add(match))
+        self.assertEqual(self.store.add_many([match, dict(match, channel='C1')]), 0)
+        self.assertEqual(len(self.store), 4)
+
+    def test_sync_state(self):
+        """Assert the cursor and backfilled flag are stored with matches."""
+        self.assertEqual(self.store.cursor, '2017-01-03T12:00:00.000000Z')
+        self.assertFalse(self.store.backfilled)
+        self.store.add_many([], backfilled=True)
+        self.assertTrue(self.store.backfilled)
+
+    def test_queries(self):
+        """Assert matches are returned newest first."""
+        self.assertEqual(
+            [match['loser'] for match in self.store.player_matches('A')],
+            ['C', 'A', 'B']
+        )
+        self.assertEqual(len(self.store.player_matches('A', limit=2)), 2)
+        self.assertEqual(
+            [match['winner'] for match in self.store.head_to_head('B', 'A')],
+            ['B', 'A']
+        )
+        self.assertEqual(
+            self.store.grannies('A'),
+            [{
+                'date': '2017-01-02T12:00:00.000000Z',
+                'winner': 'B',
+                'loser': 'A',
+                'channel': None,
+                'granny': True,
+            }]
+        )
+        self.assertEqual(
+            len(self.store.between('2017-01-02', '2017-01-03')), 1
+        )
+
+    def test_grannies_on(self):
+        """Assert grannies are found by the day of the year they were given."""
+        self.store.add({
+            'date': '2016-01-02T09:00:00.000000Z', 'winner': 'C', 'loser': 'A',
+            'granny': True,
+        })
+        self.assertEqual(
+            [match['date'][:4] for match in self.store.grannies_on(1, 2)],
+            ['2017', '2016']
+        )
+        self.assertEqual(self.store.grannies_on(1, 3), [])
@@ -0,0 +1,86 @@
+import unittest
+
+from models import HeadToHeadIndex, OddsMatrix
+from rating import EloEngine
+from tests.mock import MockedPlayer
+
+
+class OddsMatrixTestCase(unittest.TestCase):
+    """Tests for the OddsMatrix class."""
+
+    def setUp(self):
+        self.engine = EloEngine()
+        self.players = {
+            'A': MockedPlayer('A', 1000),
+            'B': MockedPlayer('B', 1200),
+            'C': MockedPlayer('C', 1100),
+            'D': MockedPlayer('D', 1300, active=False),
+        }
+        self.head_to_head = HeadToHeadIndex()
+        self.odds = OddsMatrix(self.engine, self.head_to_head, prior_games=10)
+        self.odds.rebuild(self.players.values())
+
+    def record_results(self, winner, loser, count=1):
+        for i in range(count):
+            self.head_to_head.record({'winner': winner, 'loser': loser})
+
+    def test_elo_odds(self):
+        """Assert odds match the expected score, excluding inactive players."""
+        self.assertAlmostEqual(
+            self.odds.probability('A', 'B'), self.engine.expected_score(1000, 1200)
+        )
+        self.assertAlmostEqual(
+            self.odds.probability('A', 'B') + self.odds.probability('B', 'A'), 1
+        )
+        self.assertIsNone(self.odds.probability('A', 'D'))
+
+    def test_head_to_head_adjustment(self):
+        """Assert the head-to-head record is blended with the elo odds."""
+        elo_odds = self.engine.expected_score(1000, 1200)
+        self.record_results('A', 'B', 4)
+        self.record_results('B', 'A')
+        self.odds.refresh_pair('A', 'B')
+        self.assertAlmostEqual(
+            self.odds.probability('A', 'B'), (10 * elo_odds + 4) / 15.0
+        )
+
+        self.record_results('B', 'A')
+        self.odds.refresh_pair('B', 'A')
+        self.assertAlmostEqual(
+            self.odds.probability('B', 'A'), 1 - (10 * elo_odds + 4) / 16.0
+        )
+
+    def test_update(self):
+        """Assert elo changes and new players update the matrix in place."""
+        self.record_results('A', 'C', 2)
+        self.odds.refresh_pair('A', 'C')
+        self.players['A'].season_elo = 1250
+        self.odds.update(self.players['A'])
+
+        rebuilt = OddsMatrix(self.engine, self.head_to_head, prior_games=10)
+        rebuilt.rebuild(self.players.values())
+        for player in 'ABC':
+            for opponent in 'ABC':
+                self.assertAlmostEqual(
+                    self.odds.probability(player, opponent),
+                    rebuilt.probability(player, opponent)
+                )
+
+        self.players['D'].active = True
+        self.odds.update(self.players['D'])
+        self.assertEqual(len(self.odds), 4)
+        self.assertEqual(
+            [opponent for opponent, probability in self.odds.field('D')],
+            ['C', 'B', 'A']
+        )
+
+    def test_unranked_players_excluded(self):
+        """Assert players yet to play a match are not added to the matrix."""
+        newcomer = MockedPlayer('E', 1000, season_match_count=0)
+        self.odds.update(newcomer)
+        self.assertNotIn('E', self.odds)
+        self.assertEqual(len(self.odds), 3)
+
+        newcomer.season_match_count = 1
+        self.odds.update(newcomer)
+        self.assertIn('E', self.odds)
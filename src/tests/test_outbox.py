@@ -0,0 +1,44 @@
+import threading
+import unittest
+
+from metrics import Metrics
+from outbox import Outbox
+
+
+class OutboxTestCase(unittest.TestCase):
+    """Tests for the Outbox class."""
+
+    def test_coalesce_replies(self):
+        """Assert replies are joined unless slack's length limit is hit."""
+        outbox = Outbox(lambda channel_id, text: None)
+        self.assertEqual(outbox.coalesce(['a', 'b']), ['a\nb'])
+
+        long_reply = 'x' * (outbox.max_message_length - 1)
+        self.assertEqual(
+            outbox.coalesce(['a', long_reply, 'b']),
+            ['a', long_reply, 'b']
+        )
+
+    def test_messages_sent_in_order(self):
+        """Assert queued messages are sent to each channel in order and the
+        send latency is recorded."""
+        sent = []
+        done = threading.Event()
+
+        def send(channel_id, text):
+            sent.append((channel_id, text))
+            if len(sent) == 3:
+                done.set()
+
+        metrics = Metrics()
+        outbox = Outbox(send, interval=0.01, metrics=metrics)
+        outbox.put('C1', ['first', 'callback'])
+        outbox.put('C2', ['other'])
+        outbox.put('C1', ['second'])
+
+        self.assertTrue(done.wait(1))
+        self.assertEqual(
+            [text for channel_id, text in sent if channel_id == 'C1'],
+            ['first\ncallback', 'second']
+        )
+        self.assertEqual(metrics.get_timing('outbox.send_latency')[0], 3)
@@ -0,0 +1,42 @@
+import unittest
+
+from parsing import CommandTokenizer
+
+
+class CommandTokenizerTestCase(unittest.TestCase):
+    """Tests for the CommandTokenizer class."""
+
+    def setUp(self):
+        self.tokenizer = CommandTokenizer('A34FD343A')
+
+    def test_parse_command(self):
+        """Assert the command term, mentions and args are all extracted."""
+        parsed = self.tokenizer.parse(
+            '<@A34FD343A>: head-to-head <@U1111111111> <@U2222222222> 20'
+        )
+        self.assertEqual(parsed.term, 'head-to-head')
+        self.assertEqual(parsed.mentions, ['U1111111111', 'U2222222222'])
+        self.assertEqual(parsed.tokens, ['<@U1111111111>', '<@U2222222222>', '20'])
+        self.assertEqual(parsed.args, ['20'])
+        self.assertEqual(parsed.int_args, [20])
+
+    def test_only_leading_mention_removed(self):
+        """Assert characters which also appear in the bot mention are not
+        stripped from the start of the command."""
+        parsed = self.tokenizer.parse('<@A34FD343A> A3 season')
+        self.assertEqual(parsed.text, 'A3 season')
+        self.assertEqual(parsed.term, 'A3')
+
+        parsed = self.tokenizer.parse('nfc-red: <@U1111111111> <@U2222222222>')
+        self.assertEqual(parsed.term, 'nfc-red:')
+
+    def test_poolbot_mentions_excluded(self):
+        """Assert poolbot is never returned as a mentioned user."""
+        parsed = self.tokenizer.parse('<@A34FD343A> elo <@A34FD343A> <@U1111111111>')
+        self.assertEqual(parsed.mentions, ['U1111111111'])
+
+    def test_empty_message(self):
+        """Assert a bare mention does not produce a command term."""
+        parsed = self.tokenizer.parse('<@A34FD343A>:')
+        self.assertIsNone(parsed.term)
+        self.assertEqual(parsed.args, [])
@@ -0,0 +1,47 @@
+import unittest
+
+from rating import EloEngine
+
+
+class EloEngineTestCase(unittest.TestCase):
+    """Tests for the EloEngine class."""
+
+    def setUp(self):
+        self.engine = EloEngine(k_factor=32)
+
+    def test_even_match(self):
+        """Assert equally rated players risk half the K-factor."""
+        stakes = self.engine.stakes(1000, 1000)
+        self.assertEqual(stakes, {
+            'points_win': 16,
+            'points_lose': 16,
+            'elo_win': 1016,
+            'elo_lose': 984,
+        })
+
+    def test_favourite(self):
+        """Assert a higher rated player wins fewer points than they risk."""
+        stakes = self.engine.stakes(1200, 1000)
+        self.assertEqual(stakes['points_win'], 8)
+        self.assertEqual(stakes['points_lose'], 24)
+
+    def test_provisional_k_factor(self):
+        """Assert new players use the provisional K-factor."""
+        engine = EloEngine(k_factor=32, provisional_k_factor=64, provisional_matches=10)
+        self.assertEqual(engine.stakes(1000, 1000, match_count=3)['points_win'], 32)
+        self.assertEqual(engine.stakes(1000, 1000, match_count=10)['points_win'], 16)
+
+    def test_matrix_matches_pairwise(self):
+        """Assert the batch calculation agrees with individual pairs."""
+        elos = [1000, 1150, 1320]
+        matrix = self.engine.expected_score_matrix(elos)
+        points = self.engine.points_win_matrix(elos)
+        for i, elo in enumerate(elos):
+            for j, opponent_elo in enumerate(elos):
+                self.assertAlmostEqual(
+                    matrix[i][j], self.engine.expected_score(elo, opponent_elo)
+                )
+                self.assertEqual(
+                    points[i][j],
+                    self.engine.stakes(elo, opponent_elo)['points_win']
+                )
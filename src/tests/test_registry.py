@@ -0,0 +1,138 @@
+from __future__ import absolute_import
+
+import importlib
+import unittest
+
+from commands import COMMANDS
+from registry import CommandRegistry, EventRouter, PluginSpec
+
+
+class FakeCommand(object):
+
+    def __init__(self, command_term, aliases=()):
+        self.command_term = command_term
+        self.aliases = aliases
+
+
+class FakeReaction(object):
+
+    def __init__(self, event_types, event_subtypes=(), channels=None):
+        self.event_types = event_types
+        self.event_subtypes = event_subtypes
+        self.channels = channels
+
+
+class CommandRegistryTestCase(unittest.TestCase):
+    """Tests for the CommandRegistry class."""
+
+    def setUp(self):
+        self.registry = CommandRegistry()
+        self.elo = FakeCommand('elo')
+        self.elo_history = FakeCommand('elo-history')
+        self.head_to_head = FakeCommand('head-to-head', aliases=('h2h',))
+        self.help = FakeCommand('help')
+        for command in (self.elo, self.elo_history, self.head_to_head, self.help):
+            self.registry.register(command)
+
+    def test_exact_terms_and_aliases(self):
+        """Assert terms and aliases resolve to their command."""
+        self.assertIs(self.registry.resolve('elo'), self.elo)
+        self.assertIs(self.registry.resolve('elo-history'), self.elo_history)
+        self.assertIs(self.registry.resolve('h2h'), self.head_to_head)
+        self.assertIsNone(self.registry.resolve('unknown'))
+        self.assertIsNone(self.registry.resolve(None))
+
+    def test_unique_prefixes(self):
+        """Assert only unambiguous prefixes of a minimum length resolve."""
+        self.assertIs(self.registry.resolve('elo-h'), self.elo_history)
+        self.assertIs(self.registry.resolve('head'), self.head_to_head)
+        self.assertIsNone(self.registry.resolve('he'))
+        self.assertIsNone(self.registry.resolve('el'))
+
+    def test_plugins_loaded_on_first_use(self):
+        """Assert declared plugins are only loaded once, when first used."""
+        loaded = []
+
+        def loader(spec):
+            loaded.append(spec)
+            return FakeCommand(spec.command_term)
+
+        registry = CommandRegistry(loader=loader)
+        registry.register(PluginSpec('commands.record.RecordCommand', 'record'))
+        registry.register(PluginSpec('commands.stats.StatsCommand', 'stats'))
+        self.assertEqual(registry.terms(), set(['record', 'stats']))
+        self.assertEqual(loaded, [])
+
+        record = registry.resolve('record')
+        self.assertEqual(record.command_term, 'record')
+        self.assertIs(registry.resolve('rec'), record)
+        self.assertEqual([spec.command_term for spec in loaded], ['record'])
+
+    def test_eager_plugins(self):
+        """Assert eager plugins are loaded once by load_eager."""
+        loaded = []
+
+        def loader(spec):
+            loaded.append(spec)
+            return FakeCommand(spec.command_term)
+
+        registry = CommandRegistry(loader=loader)
+        registry.register(PluginSpec('commands.granny.GrannyCommand', 'grannies', eager=True))
+        registry.register(PluginSpec('commands.stats.StatsCommand', 'stats'))
+        grannies, = registry.load_eager()
+        self.assertIs(registry.resolve('grannies'), grannies)
+        self.assertEqual([spec.command_term for spec in loaded], ['grannies'])
+
+    def test_duplicate_terms(self):
+        """Assert two commands cannot claim the same term."""
+        with self.assertRaises(ValueError):
+            self.registry.register(FakeCommand('help'))
+
+
+    def test_spec_terms_checked(self):
+        """Assert a command whose terms differ from its spec is not loaded."""
+        registry = CommandRegistry(loader=lambda spec: FakeCommand('statistics'))
+        registry.register(PluginSpec('commands.stats.StatsCommand', 'stats'))
+        with self.assertRaises(ValueError):
+            registry.resolve('stats')
+
+    def test_command_specs_match_classes(self):
+        """Assert the terms declared for each command match its class."""
+        for spec in COMMANDS:
+            command = getattr(importlib.import_module(spec.module), spec.class_name)
+            self.assertEqual(
+                (spec.command_term, spec.aliases),
+                (command.command_term, tuple(command.aliases)),
+                spec.path
+            )
+
+
+class EventRouterTestCase(unittest.TestCase):
+    """Tests for the EventRouter class."""
+
+    def setUp(self):
+        self.router = EventRouter()
+        self.join = FakeReaction(('message',), ('channel_join',))
+        self.leave = FakeReaction(('message',), ('channel_leave',), channels=('C1',))
+        self.renamed = FakeReaction(('channel_rename',))
+        for reaction in (self.join, self.leave, self.renamed):
+            self.router.subscribe(reaction)
+
+    def test_routes_by_type_and_subtype(self):
+        """Assert events only reach the reactions subscribed to them."""
+        event = {'type': 'message', 'subtype': 'channel_join'}
+        self.assertEqual(self.router.route(event, 'C1'), [self.join])
+
+        event = {'type': 'channel_rename', 'channel': {'id': 'C1'}}
+        self.assertEqual(self.router.route(event, 'C1'), [self.renamed])
+
+    def test_unsubscribed_events_discarded(self):
+        """Assert events without subscribers resolve to no handlers."""
+        self.assertEqual(self.router.route({'type': 'user_typing'}, 'C1'), [])
+        self.assertEqual(self.router.route({'type': 'message'}, 'C1'), [])
+
+    def test_channel_restrictions(self):
+        """Assert reactions restricted to channels ignore other channels."""
+        event = {'type': 'message', 'subtype': 'channel_leave'}
+        self.assertEqual(self.router.route(event, 'C1'), [self.leave])
+        self.assertEqual(self.router.route(event, 'C2'), [])
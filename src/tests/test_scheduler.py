@@ -0,0 +1,101 @@
+import threading
+import unittest
+from datetime import datetime
+from time import mktime, sleep, time
+
+from metrics import Metrics
+from scheduler import Daily, Scheduler, parse_weekdays
+
+
+def timestamp(*args):
+    return mktime(datetime(*args).timetuple())
+
+
+class SchedulerTestCase(unittest.TestCase):
+    """Tests for the Scheduler class."""
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.scheduler = Scheduler(metrics=self.metrics)
+
+    def wait_for(self, jobs):
+        deadline = time() + 1
+        while any(job.running for job in jobs) and time() < deadline:
+            sleep(0.001)
+
+    def test_jobs_run_when_due(self):
+        """Assert jobs run once due, and are rescheduled."""
+        runs = []
+        first = self.scheduler.every('first', 10, lambda: runs.append('first'), delay=0)
+        self.scheduler.every('second', 10, lambda: runs.append('second'), delay=5)
+        now = first.next_run
+
+        self.assertEqual(self.scheduler.run_pending(now - 1), [])
+        self.wait_for(self.scheduler.run_pending(now + 6))
+        self.assertEqual(sorted(runs), ['first', 'second'])
+        self.assertEqual(first.next_run, now + 16)
+        self.assertEqual(self.metrics.get_timing('scheduler.first')[0], 1)
+
+    def test_missed_runs_coalesced(self):
+        """Assert a job which missed several runs only runs once."""
+        runs = []
+        job = self.scheduler.every('sync', 10, lambda: runs.append(1), delay=0)
+        self.wait_for(self.scheduler.run_pending(job.next_run + 35))
+        self.assertEqual(runs, [1])
+        self.assertEqual(self.metrics.get_counter('scheduler.missed.sync'), 3)
+
+    def test_running_job_skipped(self):
+        """Assert a job is not started while its last run is still going."""
+        release = threading.Event()
+        job = self.scheduler.every('slow', 10, release.wait, delay=0)
+        start = job.next_run
+        self.assertEqual(self.scheduler.run_pending(start), [job])
+        self.assertEqual(self.scheduler.run_pending(start + 10), [])
+        self.assertEqual(self.metrics.get_counter('scheduler.skipped.slow'), 1)
+        release.set()
+        self.wait_for([job])
+
+    def test_errors_recorded(self):
+        """Assert a failing job is counted and still rescheduled."""
+        job = self.scheduler.every('broken', 10, lambda: 1 / 0, delay=0)
+        start = job.next_run
+        self.wait_for(self.scheduler.run_pending(start))
+        self.assertEqual(self.metrics.get_counter('scheduler.errors.broken'), 1)
+        self.assertEqual(self.scheduler.run_pending(start + 10), [job])
+        self.wait_for([job])
+
+    def test_cancel(self):
+        """Assert cancelled jobs are never run."""
+        job = self.scheduler.every('cancelled', 10, lambda: None, delay=0)
+        self.assertTrue(self.scheduler.cancel('cancelled'))
+        self.assertFalse(self.scheduler.cancel('cancelled'))
+        self.assertEqual(self.scheduler.run_pending(job.next_run), [])
+
+    def test_once(self):
+        """Assert one off jobs run a single time, and can be replaced."""
+        runs = []
+        self.scheduler.once('timer', 10, lambda: runs.append('first'))
+        job = self.scheduler.once('timer', 20, lambda: runs.append('second'))
+        self.wait_for(self.scheduler.run_pending(job.next_run))
+        self.assertEqual(runs, ['second'])
+        self.assertEqual(self.scheduler.jobs, {})
+        self.assertEqual(self.scheduler.run_pending(job.next_run + 100), [])
+
+    def test_daily_schedule(self):
+        """Assert daily jobs run at the next matching time of day."""
+        weekly = Daily('09:30', weekdays=parse_weekdays('monday'))
+        # the 1st of may 2017 was a monday
+        self.assertEqual(
+            weekly.next_after(timestamp(2017, 5, 1, 9, 0)),
+            timestamp(2017, 5, 1, 9, 30)
+        )
+        self.assertEqual(
+            weekly.next_after(timestamp(2017, 5, 1, 9, 30)),
+            timestamp(2017, 5, 8, 9, 30)
+        )
+
+        daily = Daily('09:30')
+        self.assertEqual(
+            daily.runs_between(timestamp(2017, 5, 1, 9, 30), timestamp(2017, 5, 4, 10, 0)),
+            3
+        )
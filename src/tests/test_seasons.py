@@ -0,0 +1,48 @@
+import unittest
+
+from models import SeasonCatalog
+
+
+class SeasonCatalogTestCase(unittest.TestCase):
+    """Tests for the SeasonCatalog class."""
+
+    def setUp(self):
+        self.old = {'pk': 1, 'name': 'Summer 2016', 'active': False}
+        self.current = {'pk': 2, 'name': 'Winter 2017', 'active': True}
+        self.catalog = SeasonCatalog()
+        self.catalog.load([self.old, self.current])
+
+    def test_lookup_by_name(self):
+        """Assert seasons are found by name, ignoring case and spacing."""
+        self.assertIs(self.catalog.get('summer  2016'), self.old)
+        self.assertIs(self.catalog.get('WINTER 2017'), self.current)
+        self.assertIsNone(self.catalog.get('autumn 2017'))
+        self.assertIs(self.catalog.active, self.current)
+        self.assertEqual(self.catalog.newest_first(), [self.current, self.old])
+
+    def test_finished_leaderboards_kept(self):
+        """Assert only the active season's leaderboard is invalidated by a
+        match, and finished leaderboards survive a reload."""
+        self.catalog.set_leaderboard(self.old, ['old rows'])
+        self.catalog.set_leaderboard(self.current, ['current rows'])
+        self.catalog.invalidate_active()
+        self.assertEqual(self.catalog.leaderboard(self.old), ['old rows'])
+        self.assertIsNone(self.catalog.leaderboard(self.current))
+
+        self.catalog.load([self.old, self.current])
+        self.assertEqual(self.catalog.leaderboard(self.old), ['old rows'])
+
+    def test_stale_active_leaderboard_ignored(self):
+        """Assert a leaderboard fetched before a match is recorded is not
+        cached."""
+        generation = self.catalog.generation
+        self.catalog.invalidate_active()
+        self.catalog.set_leaderboard(self.current, ['stale rows'], generation)
+        self.assertIsNone(self.catalog.leaderboard(self.current))
+
+    def test_ended_season_refetched(self):
+        """Assert a leaderboard cached while its season was active is not
+        kept once the season ends."""
+        self.catalog.set_leaderboard(self.current, ['current rows'])
+        self.catalog.load([self.old, dict(self.current, active=False)])
+        self.assertIsNone(self.catalog.leaderboard(self.current))
@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from models import ChannelRegistry, User
+from snapshot import load_snapshot, save_snapshot
+from tests.data.poolbot_api import player
+
+
+class SnapshotTestCase(unittest.TestCase):
+    """Tests for saving and loading warm start snapshots."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'snapshot.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """Assert users and channels are restored as they were saved."""
+        profile = dict(player.PLAYER_1, real_name='Danny', is_bot=False)
+        users = {profile['slack_id']: User(**profile)}
+        channels = ChannelRegistry()
+        channels.add({'id': 'C1', 'name': 'pool'})
+
+        save_snapshot(self.path, users.values(), channels.all())
+        loaded_users, loaded_channels, age = load_snapshot(self.path)
+
+        self.assertEqual(
+            loaded_users[profile['slack_id']].to_dict(),
+            users[profile['slack_id']].to_dict()
+        )
+        self.assertEqual(loaded_channels.get('C1'), {'id': 'C1', 'name': 'pool'})
+        self.assertLess(age, 60)
+
+    def test_missing_or_corrupt_snapshot(self):
+        """Assert an unusable snapshot is ignored."""
+        self.assertIsNone(load_snapshot(self.path))
+
+        with open(self.path, 'w') as f:
+            f.write('{"version": 1, ')
+        self.assertIsNone(load_snapshot(self.path))
@@ -0,0 +1,70 @@
+import unittest
+
+from models import FormIndex, HeadToHeadIndex, OddsMatrix, OpponentSuggester, RankIndex
+from rating import EloEngine
+from tests.mock import MockedPlayer
+from utils import datetime_to_timestamp
+
+
+class OpponentSuggesterTestCase(unittest.TestCase):
+    """Tests for the OpponentSuggester class."""
+
+    def setUp(self):
+        players = [
+            MockedPlayer('A', 1000), MockedPlayer('B', 1010),
+            MockedPlayer('C', 1020), MockedPlayer('D', 1400),
+        ]
+        engine = EloEngine()
+        self.leaderboard = RankIndex('season_elo', 'season_match_count')
+        self.leaderboard.rebuild(players)
+        self.form = FormIndex()
+        self.head_to_head = HeadToHeadIndex()
+        self.odds = OddsMatrix(engine, self.head_to_head)
+        self.odds.rebuild(players)
+        self.suggester = OpponentSuggester(
+            self.leaderboard, self.odds, engine, self.form, self.head_to_head
+        )
+        self.now = datetime_to_timestamp('2017-02-01T12:00:00.000000Z')
+
+    def record(self, matches):
+        self.form.rebuild(matches)
+        self.head_to_head.rebuild(matches)
+
+    def test_prefers_close_active_and_fresh_pairings(self):
+        """Assert a close opponent who is active but yet to play the player
+        is suggested before one they played yesterday."""
+        self.record([
+            {'date': '2017-01-31T12:00:00.000000Z', 'winner': 'A', 'loser': 'B'},
+            {'date': '2017-01-31T13:00:00.000000Z', 'winner': 'C', 'loser': 'D'},
+        ])
+        suggestions = self.suggester.suggest('A', 1000, now=self.now)
+        self.assertEqual(
+            [opponent for opponent, score, probability, last_played in suggestions],
+            ['C', 'B', 'D']
+        )
+        self.assertIsNone(suggestions[0][3])
+        self.assertEqual(suggestions[1][3], '2017-01-31T12:00:00.000000Z')
+
+    def test_limit(self):
+        """Assert only the requested number of suggestions are returned, and
+        the player is never suggested."""
+        self.record([])
+        suggestions = self.suggester.suggest('A', 1000, limit=2, now=self.now)
+        self.assertEqual(len(suggestions), 2)
+        self.assertNotIn('A', [suggestion[0] for suggestion in suggestions])
+
+    def test_recorded_match_not_fresh(self):
+        """Assert a pair who just played, recorded after the indexes were
+        built, is not suggested as if they had never played."""
+        self.record([])
+        match = {'date': '2017-02-01T11:00:00.000000Z', 'winner': 'A', 'loser': 'C'}
+        self.form.record(match)
+        self.head_to_head.record(match)
+        suggestions = dict(
+            (opponent, (score, last_played)) for
+            opponent, score, probability, last_played in
+            self.suggester.suggest('A', 1000, now=self.now)
+        )
+        self.assertEqual(suggestions['C'][1], match['date'])
+        self.assertIsNone(suggestions['B'][1])
+        self.assertLess(self.suggester._freshness(suggestions['C'][1], self.now), 0.01)
@@ -0,0 +1,212 @@
+from __future__ import absolute_import
+
+import unittest
+from threading import Event, Thread
+
+import mock
+from requests import Request, Response
+from requests.exceptions import ChunkedEncodingError, ConnectionError
+from requests.adapters import HTTPAdapter
+
+from metrics import Metrics
+from transport import CachingAdapter, CircuitBreaker
+from utils import ServerBusyException
+
+
+def make_response(status_code=200, content='[]', headers=None):
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    return response
+
+
+class CachingAdapterTestCase(unittest.TestCase):
+    """Tests for the CachingAdapter class."""
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.adapter = CachingAdapter(
+            ttls=[(r'/api/player/', 30)],
+            invalidations=[(r'/api/match/', [r'/api/player/'])],
+            metrics=self.metrics,
+            timeouts=[(r'/api/match/$', (1, 20))],
+            default_timeout=(1, 5),
+            retries=2,
+            backoff=0,
+            breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30),
+        )
+        patcher = mock.patch.object(HTTPAdapter, 'send')
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, method='GET', url='http://test-server.com/api/player/'):
+        return self.adapter.send(Request(method, url).prepare())
+
+    def test_cache_hit(self):
+        """Assert fresh responses are served from the cache, as a copy."""
+        self.send.return_value = make_response(content='[1]')
+        first = self.request()
+        second = self.request()
+        self.assertEqual(self.send.call_count, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.json(), [1])
+        self.assertEqual(self.metrics.get_counter('http.cache.hit'), 1)
+        self.assertEqual(self.metrics.get_counter('http.cache.miss'), 1)
+
+    def test_uncached_urls(self):
+        """Assert URLs without a TTL and failed responses are not cached."""
+        self.send.return_value = make_response()
+        self.request(url='http://test-server.com/api/season/')
+        self.request(url='http://test-server.com/api/season/')
+        self.send.return_value = make_response(status_code=500)
+        self.request()
+        self.request()
+        self.assertEqual(self.send.call_count, 4)
+
+    def test_revalidation(self):
+        """Assert stale responses are revalidated with their ETag."""
+        self.send.return_value = make_response(content='[1]', headers={'ETag': '"v1"'})
+        self.request()
+        self.adapter.cache.values()[0].expires = 0
+
+        self.send.return_value = make_response(status_code=304)
+        response = self.request()
+        request = self.send.call_args[0][0]
+        self.assertEqual(request.headers['If-None-Match'], '"v1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [1])
+        self.assertEqual(self.metrics.get_counter('http.cache.revalidated'), 1)
+
+    def test_write_invalidates(self):
+        """Assert a write drops the cached responses it affects."""
+        self.send.return_value = make_response()
+        self.request()
+        self.request(method='POST', url='http://test-server.com/api/match/')
+        self.request()
+        self.assertEqual(self.send.call_count, 3)
+        self.assertEqual(self.metrics.get_counter('http.cache.invalidated'), 1)
+
+    def test_coalesced_requests(self):
+        """Assert identical requests in flight share one upstream request."""
+        sending = Event()
+        release = Event()
+
+        def send(request, **kwargs):
+            sending.set()
+            release.wait()
+            return make_response(content='[1]')
+        self.send.side_effect = send
+
+        responses = []
+        url = 'http://test-server.com/api/season/'
+        leader = Thread(target=lambda: responses.append(self.request(url=url)))
+        leader.start()
+        sending.wait()
+
+        follower = Thread(target=lambda: responses.append(self.request(url=url)))
+        follower.start()
+        # give the follower time to start waiting for the leader
+        follower.join(0.1)
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(self.send.call_count, 1)
+        self.assertEqual([response.json() for response in responses], [[1], [1]])
+        self.assertEqual(self.metrics.get_counter('http.coalesced'), 1)
+
+    def test_write_not_coalesced(self):
+        """Assert a request sent after a write does not share the response
+        of a request sent before it."""
+        sending = Event()
+        release = Event()
+        contents = iter(['[1]', '[2]'])
+
+        def send(request, **kwargs):
+            if request.method != 'GET':
+                return make_response(status_code=201)
+            content = next(contents)
+            if content == '[1]':
+                sending.set()
+                release.wait()
+            return make_response(content=content)
+        self.send.side_effect = send
+
+        responses = {}
+        url = 'http://test-server.com/api/player/'
+        leader = Thread(target=lambda: responses.setdefault('before', self.request(url=url)))
+        leader.start()
+        sending.wait()
+
+        self.request(method='POST', url='http://test-server.com/api/match/')
+        follower = Thread(target=lambda: responses.setdefault('after', self.request(url=url)))
+        follower.start()
+        # the follower must not wait for the leader to be released
+        follower.join(1)
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(responses['before'].json(), [1])
+        self.assertEqual(responses['after'].json(), [2])
+        self.assertEqual(self.metrics.get_counter('http.coalesced'), 0)
+
+    def test_timeouts(self):
+        """Assert the timeout for the URL is used unless one is passed."""
+        self.send.return_value = make_response()
+        self.request(method='POST', url='http://test-server.com/api/match/')
+        self.assertEqual(self.send.call_args[1]['timeout'], (1, 20))
+        self.request(url='http://test-server.com/api/season/')
+        self.assertEqual(self.send.call_args[1]['timeout'], (1, 5))
+
+    def test_retries(self):
+        """Assert only idempotent requests are retried, and the responses
+        which are retried are closed."""
+        failed = make_response(status_code=503)
+        failed.raw = mock.Mock()
+        self.send.side_effect = [failed, make_response()]
+        self.assertEqual(self.request().status_code, 200)
+        self.assertEqual(self.metrics.get_counter('http.retries'), 1)
+        self.assertTrue(failed.raw.close.called)
+        self.assertEqual(self.adapter.breaker.failures, 0)
+
+        self.send.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            self.request(method='POST', url='http://test-server.com/api/match/')
+        self.assertEqual(self.send.call_count, 3)
+
+    def test_circuit_breaker(self):
+        """Assert requests are refused while the server is failing, unless
+        a stale response is cached."""
+        self.send.return_value = make_response(content='[1]')
+        self.request()
+        self.adapter.cache.values()[0].expires = 0
+
+        # each request counts as one failure, however many times it was tried
+        self.send.return_value = None
+        self.send.side_effect = ConnectionError()
+        for i in range(3):
+            with self.assertRaises(ConnectionError):
+                self.request(url='http://test-server.com/api/season/')
+        self.assertEqual(self.send.call_count, 10)
+        self.assertEqual(self.adapter.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(ServerBusyException):
+            self.request(url='http://test-server.com/api/season/')
+        self.assertEqual(self.request().json(), [1])
+        self.assertEqual(self.send.call_count, 10)
+
+        # any error from a trial request opens the circuit again
+        self.adapter.breaker.opened_at = 0
+        self.send.side_effect = ChunkedEncodingError()
+        with self.assertRaises(ChunkedEncodingError):
+            self.request(url='http://test-server.com/api/season/')
+        self.assertEqual(self.adapter.breaker.state, CircuitBreaker.OPEN)
+
+        # a successful trial request after the reset timeout closes it
+        self.adapter.breaker.opened_at = 0
+        self.send.side_effect = None
+        self.send.return_value = make_response(content='[2]')
+        self.assertEqual(self.request().json(), [2])
+        self.assertEqual(self.adapter.breaker.state, CircuitBreaker.CLOSED)
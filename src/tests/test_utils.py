@@ -0,0 +1,22 @@
+import unittest
+
+from utils import iterate_in_background
+
+
+class IterateInBackgroundTestCase(unittest.TestCase):
+    """Tests for the iterate_in_background helper."""
+
+    def test_items_yielded_in_order(self):
+        """Assert every item is yielded in the order it was produced."""
+        items = iterate_in_background(iter(xrange(100)), buffer_size=5)
+        self.assertEqual(list(items), range(100))
+
+    def test_errors_reraised(self):
+        """Assert an exception in the iterable reaches the consumer."""
+        def failing():
+            yield 1
+            raise ValueError('page failed to load')
+
+        items = iterate_in_background(failing(), buffer_size=5)
+        self.assertEqual(next(items), 1)
+        self.assertRaises(ValueError, list, items)
@@ -0,0 +1,390 @@
+"""HTTP transport used by the requests session shared with the handlers."""
+
+import random
+import re
+from collections import OrderedDict
+from threading import Event, Lock
+from time import sleep, time
+from urlparse import urlparse
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from utils import ServerBusyException
+
+
+# seconds a response from each family of URLs is fresh for. Responses for
+# URLs which do not match any pattern are not cached
+DEFAULT_CACHE_TTLS = (
+    (r'/api/season/', 300),
+    (r'/api/season-player/', 60),
+    (r'/api/player/', 30),
+    (r'/api/elo-history/', 30),
+    (r'/api/match/head_to_head/', 30),
+)
+
+# (connect, read) timeouts in seconds for each family of URLs, and for any
+# URL which does not match a pattern
+DEFAULT_TIMEOUTS = (
+    (r'/api/match/$', (3.05, 20)),
+)
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# only requests which can safely be sent twice are retried
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+RETRY_STATUS_CODES = frozenset((502, 503, 504))
+
+# the families of cached URLs which a write to each family of URLs changes
+DEFAULT_CACHE_INVALIDATIONS = (
+    (r'/api/match/', (
+        r'/api/match/', r'/api/player/', r'/api/elo-history/', r'/api/season',
+    )),
+    (r'/api/player/', (r'/api/player/',)),
+    (r'/api/challenge/', (r'/api/challenge/',)),
+)
+
+
+class CircuitBreaker(object):
+    """
+    Stops requests being sent to a server which keeps failing.
+
+    After `failure_threshold` failures in a row the circuit opens, and
+    requests are refused straight away rather than waiting to time out.
+    After `reset_timeout` seconds a single trial request is let through -
+    if it succeeds the circuit closes again, otherwise it stays open for
+    another `reset_timeout` seconds.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.lock = Lock()
+
+    def allow(self):
+        """Return whether a request may be sent now."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time() >= self.opened_at + self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time()
+
+
+class CachedResponse(object):
+    """The parts of a response needed to rebuild it for each cache hit."""
+
+    __slots__ = (
+        'status_code', 'headers', 'content', 'encoding', 'reason', 'url',
+        'expires',
+    )
+
+    def __init__(self, response, expires):
+        self.status_code = response.status_code
+        self.headers = response.headers.copy()
+        self.content = response.content
+        self.encoding = response.encoding
+        self.reason = response.reason
+        self.url = response.url
+        self.expires = expires
+
+    @property
+    def validators(self):
+        """Return the headers of a conditional request for the response."""
+        headers = {}
+        if 'ETag' in self.headers:
+            headers['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def build(self, request):
+        """Return a new Response, so callers never share one instance."""
+        response = Response()
+        response.status_code = self.status_code
+        response.headers = self.headers.copy()
+        response._content = self.content
+        response.encoding = self.encoding
+        response.reason = self.reason
+        response.url = self.url
+        response.request = request
+        return response
+
+
+class InFlightRequest(object):
+    """A GET request being sent, which identical requests can wait for.
+    The cache generation when it was sent is kept, so requests sent after a
+    write never wait for a response the write may have made stale."""
+
+    __slots__ = ('done', 'response', 'error', 'generation')
+
+    def __init__(self, generation):
+        self.done = Event()
+        self.response = None
+        self.error = None
+        self.generation = generation
+
+
+class ResilientAdapter(HTTPAdapter):
+    """
+    A transport adapter which applies a timeout to every request, retries
+    idempotent requests which fail, and stops sending requests while the
+    server is failing.
+
+    Retries wait for a random time of up to `backoff` seconds, doubling for
+    each attempt, so requests which failed together are not retried at the
+    same moment. A request whose last attempt fails with a connection error,
+    a timeout or a 5xx response counts as one failure of the server for the
+    circuit breaker. While the circuit is open, a ServerBusyException is
+    raised instead of sending the request.
+    """
+
+    def __init__(self, timeouts=DEFAULT_TIMEOUTS, default_timeout=DEFAULT_TIMEOUT,
+                 retries=2, backoff=0.2, breaker=None, metrics=None, **kwargs):
+        super(ResilientAdapter, self).__init__(**kwargs)
+        self.timeouts = [
+            (re.compile(pattern), tuple(timeout)) for pattern, timeout in timeouts
+        ]
+        self.default_timeout = tuple(default_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.get_timeout(request.url)
+
+        attempts = 1
+        if request.method in IDEMPOTENT_METHODS:
+            attempts += self.retries
+
+        # the retries are part of the same request, so the breaker is only
+        # asked once, and counts at most one failure
+        if not self.breaker.allow():
+            self._incr('http.circuit_open')
+            raise ServerBusyException(
+                'Not sending {} while the server is failing'.format(request.url),
+                request=request
+            )
+
+        for attempt in xrange(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = super(ResilientAdapter, self).send(request, **kwargs)
+            except (ConnectionError, Timeout):
+                if last_attempt:
+                    self.breaker.record_failure()
+                    raise
+            except Exception:
+                # anything else still has to settle a trial request, or the
+                # breaker would never leave the half-open state
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+                if last_attempt or response.status_code not in RETRY_STATUS_CODES:
+                    self.breaker.record_failure()
+                    return response
+                # release the connection back to the pool before retrying
+                response.close()
+
+            self._incr('http.retries')
+            sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def get_timeout(self, url):
+        """Return the (connect, read) timeout for requests to the URL."""
+        path = urlparse(url).path
+        for pattern, timeout in self.timeouts:
+            if pattern.search(path):
+                return timeout
+        return self.default_timeout
+
+    def _incr(self, name, value=1):
+        if self.metrics is not None and value:
+            self.metrics.incr(name, value)
+
+
+class CachingAdapter(ResilientAdapter):
+    """
+    A transport adapter which caches successful GET responses in memory.
+
+    Each response is fresh for the TTL of the first pattern matching its
+    URL path. Once stale, the server is asked whether it has changed with a
+    conditional request (using the ETag or Last-Modified header it sent), and
+    a `304 Not Modified` reply renews the cached copy without downloading it
+    again. A write to a URL drops every cached response in the families of
+    URLs it affects, so for example recording a match is reflected in the
+    next request for a player profile.
+
+    Identical GET requests sent while one is already in flight do not go to
+    the server, unless a write has been sent since the first request was.
+    They wait for the first request to finish and each receive their own
+    copy of its response. The parsed JSON is not shared, as
+    handlers modify the data they are given.
+
+    If the server is failing and the circuit breaker refuses a request, a
+    cached response is returned even if it is stale.
+
+    Hits, misses, revalidations, invalidations and coalesced requests are
+    counted in `metrics`.
+    """
+
+    max_entries = 500
+
+    def __init__(self, ttls=DEFAULT_CACHE_TTLS, invalidations=DEFAULT_CACHE_INVALIDATIONS,
+                 metrics=None, **kwargs):
+        super(CachingAdapter, self).__init__(metrics=metrics, **kwargs)
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.invalidations = [
+            (re.compile(pattern), [re.compile(family) for family in families]) for
+            pattern, families in invalidations
+        ]
+        self.cache = OrderedDict()
+        # incremented by every write which invalidates cached responses
+        self.generation = 0
+        # GET requests currently being sent, keyed by URL
+        self.in_flight = {}
+        self.lock = Lock()
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            response = super(CachingAdapter, self).send(request, **kwargs)
+            self.invalidate(request.url)
+            return response
+
+        ttl = self.get_ttl(request.url)
+        if ttl:
+            with self.lock:
+                cached = self.cache.get(request.url)
+            if cached is not None and cached.expires > time():
+                self._incr('http.cache.hit')
+                return cached.build(request)
+
+        try:
+            return self._send_coalesced(request, ttl, **kwargs)
+        except ServerBusyException:
+            with self.lock:
+                cached = self.cache.get(request.url)
+            if cached is None:
+                raise
+            self._incr('http.cache.stale')
+            return cached.build(request)
+
+    def _send_coalesced(self, request, ttl, **kwargs):
+        """Send a GET request, unless an identical request is already in
+        flight, in which case wait for it and share its response."""
+        with self.lock:
+            flight = self.in_flight.get(request.url)
+            leader = flight is None or flight.generation != self.generation
+            if leader:
+                flight = self.in_flight[request.url] = InFlightRequest(self.generation)
+
+        if not leader:
+            flight.done.wait()
+            self._incr('http.coalesced')
+            if flight.error is not None:
+                raise flight.error
+            return flight.response.build(request)
+
+        try:
+            response = self._fetch(request, ttl, **kwargs)
+            flight.response = CachedResponse(response, expires=0)
+            return response
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self.lock:
+                # a newer request for the URL may have replaced this one
+                if self.in_flight.get(request.url) is flight:
+                    del self.in_flight[request.url]
+            flight.done.set()
+
+    def _fetch(self, request, ttl, **kwargs):
+        """Send a GET request, revalidating and storing the cached copy of
+        its response if it has a TTL."""
+        if not ttl:
+            return super(CachingAdapter, self).send(request, **kwargs)
+
+        with self.lock:
+            cached = self.cache.get(request.url)
+            generation = self.generation
+        if cached is not None and cached.validators:
+            request = request.copy()
+            request.headers.update(cached.validators)
+
+        response = super(CachingAdapter, self).send(request, **kwargs)
+
+        if cached is not None and response.status_code == 304:
+            self._incr('http.cache.revalidated')
+            cached.expires = time() + ttl
+            return cached.build(request)
+
+        self._incr('http.cache.miss')
+        if response.status_code == 200:
+            self._store(
+                request.url, CachedResponse(response, time() + ttl), generation
+            )
+        return response
+
+    def get_ttl(self, url):
+        """Return how long a response from the URL is fresh for."""
+        path = urlparse(url).path
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return 0
+
+    def invalidate(self, url):
+        """Drop the cached responses affected by a write to the URL."""
+        path = urlparse(url).path
+        families = [
+            family for pattern, families in self.invalidations if
+            pattern.search(path) for family in families
+        ]
+        if not families:
+            return
+
+        with self.lock:
+            stale_urls = [
+                cached_url for cached_url in self.cache if
+                any(family.search(urlparse(cached_url).path) for family in families)
+            ]
+            for cached_url in stale_urls:
+                del self.cache[cached_url]
+            self.generation += 1
+        self._incr('http.cache.invalidated', len(stale_urls))
+
+    def _store(self, url, cached, generation):
+        with self.lock:
+            # a write since the request was sent may have changed the data,
+            # so the response cannot be trusted for the full TTL
+            if generation != self.generation:
+                return
+            self.cache.pop(url, None)
+            self.cache[url] = cached
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
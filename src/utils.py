@@ -1,6 +1,15 @@
 """Custom utils and helpers for poolbot - including exceptions."""
 
+import sys
+from calendar import timegm
 from datetime import datetime
+from Queue import Queue
+from threading import Thread
+
+from requests.exceptions import ConnectionError
+
+
+API_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 
 
 class MissingConfigurationException(Exception):
@@ -8,29 +17,67 @@ class MissingConfigurationException(Exception):
     pass
 
 
+class InvalidChallengeStateException(Exception):
+    """Raised when a challenge is moved to a state it cannot reach from its
+    current state, for example accepting a challenge which has expired."""
+    pass
+
+
+class ServerBusyException(ConnectionError):
+    """Raised instead of sending a request while the poolbot server is
+    failing, to give it a chance to recover."""
+    pass
+
+
 def format_datetime_to_date(date, format_date=True):
     """Returns only the date representation of a datetime string."""
-    date = datetime.strptime(date, "%Y-%m-%dT%H:%M:%S.%fZ").date()
+    date = datetime.strptime(date, API_DATETIME_FORMAT).date()
     return date.strftime("%d %b %Y") if format_date else date
 
 
+def datetime_to_timestamp(date):
+    """Returns the UTC epoch seconds of a datetime string from the API."""
+    return timegm(datetime.strptime(date, API_DATETIME_FORMAT).utctimetuple())
+
+
 def get_ordinal_extension(number):
     """Returns the extension for a date - for example 1->1st, 5->5th."""
     return "%d%s" % (number, "tsnrhtdd"[(number/10%10!=1)*(number%10<4)*number%10::4])
 
 
-def flatten_nested_dict(nested_dict):
+def iterate_in_background(iterable, buffer_size):
     """
-    Expects a dictionary which includes nested dictionaries, and returns
-    a flat representation. This is a simplified solution which does not
-    cover all edge cases (for example it only works for nested values
-    1 level deep...)
+    Start consuming an iterable on a background thread, and return a
+    generator of its items. At most `buffer_size` items are held in memory
+    while waiting for the generator to be consumed. Any exception raised by
+    the iterable is re-raised by the generator.
     """
-    flat_dict = {}
-    for key, val in nested_dict.iteritems():
-        if isinstance(val, dict):
-            for k, v in val.iteritems():
-                flat_dict[k] = v
-        else:
-            flat_dict[key] = val
-    return flat_dict
+    items = Queue(maxsize=buffer_size)
+    finished = object()
+    errors = []
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+        except Exception:
+            errors.append(sys.exc_info())
+        finally:
+            items.put(finished)
+
+    thread = Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+
+    def consume():
+        while True:
+            item = items.get()
+            if item is finished:
+                break
+            yield item
+
+        if errors:
+            exc_type, exc_value, exc_traceback = errors[0]
+            raise exc_type, exc_value, exc_traceback
+
+    return consume()